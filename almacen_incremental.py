@@ -0,0 +1,146 @@
+import hashlib
+import json
+import os
+import time
+import uuid
+from contextlib import contextmanager
+
+import pandas as pd
+
+from cache_parseo import guardar_df, leer_df
+from rendimiento import medido
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+# --- ALMACÉN INCREMENTAL (PARQUET PARTICIONADO POR AGENCIA / AÑO / MES) ---
+# Cada export nuevo de BPro se parsea, se deduplica contra lo ya guardado en las particiones que toca
+# y solo se escriben las filas nuevas como un archivo más de la partición (append-only). Los cruces
+# leen el histórico completo de aquí, así el costo mensual depende del export nuevo y no de toda la historia.
+#   <ALMACEN_DIR>/<dataset>/AGENCIA=<agencia>/ANIO=<aaaa>/MES=<mm>/parte-<id>.parquet + parte-<id>.json
+# El .json se escribe al final: una parte sin su .json está a medio escribir y no se lee.
+ALMACEN_DIR = os.environ.get("LIMPIADOR_ALMACEN_DIR", os.path.join(os.path.dirname(os.path.abspath(__file__)), "almacen_bpro"))
+
+# Llave de cada registro: documento (factura / referencia) + número de parte. OCURRENCIA numera las líneas
+# repetidas de una misma llave dentro del export, así dos renglones iguales de una factura no se pierden.
+DATASETS = {
+    "compras": {"llave": ["FACTURA", "NP"], "fecha": "FECHA"},
+    "traspasos": {"llave": ["REFERENCIA", "NP"], "fecha": "FECHA_MOV"},
+    "compras_fifo": {"llave": ["FACTURA", "ID PART"], "fecha": "Fecha"},
+    "ventas_fifo": {"llave": ["REFERENCIA", "ID PART"], "fecha": "Fecha"},
+}
+
+def carpeta_dataset(nombre):
+    return os.path.join(ALMACEN_DIR, nombre)
+
+@contextmanager
+def candado(nombre):
+    """Serializa escrituras al mismo dataset entre sesiones (flock en POSIX)."""
+    os.makedirs(carpeta_dataset(nombre), exist_ok=True)
+    with open(os.path.join(carpeta_dataset(nombre), ".candado"), "w") as f:
+        if fcntl: fcntl.flock(f, fcntl.LOCK_EX)
+        try: yield
+        finally:
+            if fcntl: fcntl.flock(f, fcntl.LOCK_UN)
+
+def anio_mes(fechas):
+    """Año y mes de la partición; en texto se toma el dd/mm/aaaa que traiga la celda. Sin fecha -> 0000/00."""
+    if not pd.api.types.is_datetime64_any_dtype(fechas):
+        fechas = pd.to_datetime(fechas.astype(str).str.extract(r"(\d{2}/\d{2}/\d{4})", expand=False), format="%d/%m/%Y", errors="coerce")
+    return fechas.dt.year.fillna(0).astype(int), fechas.dt.month.fillna(0).astype(int)
+
+def con_ocurrencia(df, llave):
+    df = df.copy()
+    df["OCURRENCIA"] = df.groupby(llave, dropna=False, sort=False).cumcount()
+    return df
+
+def partes(carpeta):
+    """Sidecars .json de las partes completas de una partición, en orden de escritura."""
+    try: sidecars = [e.path for e in os.scandir(carpeta) if e.name.endswith(".json")]
+    except OSError: return []
+    metas = []
+    for ruta in sidecars:
+        with open(ruta, encoding="utf-8") as f: metas.append(json.load(f))
+    return sorted(metas, key=lambda m: m["creado"])
+
+def leer_particion(carpeta, columnas=None):
+    metas = partes(carpeta)
+    if not metas: return pd.DataFrame()
+    dfs = [leer_df(carpeta, m) for m in metas]
+    df = pd.concat(dfs, ignore_index=True) if len(dfs) > 1 else dfs[0]
+    return df[columnas] if columnas is not None else df
+
+def escribir_parte(carpeta, df):
+    os.makedirs(carpeta, exist_ok=True)
+    nombre = f"parte-{uuid.uuid4().hex}"
+    meta = {**guardar_df(df, carpeta, nombre), "filas": len(df), "creado": time.time_ns()}
+    tmp = os.path.join(carpeta, f".{nombre}.json.tmp")
+    with open(tmp, "w", encoding="utf-8") as f: json.dump(meta, f)
+    os.replace(tmp, os.path.join(carpeta, f"{nombre}.json"))
+
+def agregar(nombre, df, agencia):
+    """
+    Agrega al dataset las filas de `df` que aún no están guardadas. Solo lee las llaves de las
+    particiones (agencia, año, mes) que el export toca. Devuelve {'nuevas', 'duplicadas', 'particiones'}.
+    """
+    resumen = {"nuevas": 0, "duplicadas": 0, "particiones": 0}
+    if df is None or df.empty: return resumen
+    spec = DATASETS[nombre]
+    llave = spec["llave"] + ["OCURRENCIA"]
+    anios, meses = anio_mes(df[spec["fecha"]])
+    with candado(nombre):
+        for (anio, mes), idx in df.groupby([anios, meses], sort=True).groups.items():
+            carpeta = os.path.join(carpeta_dataset(nombre), f"AGENCIA={agencia}", f"ANIO={anio:04d}", f"MES={mes:02d}")
+            # Se numera dentro de la partición: dos exports que traen el mes completo lo numeran igual
+            lote = con_ocurrencia(df.loc[idx], spec["llave"])
+            guardadas = leer_particion(carpeta, llave)
+            if not guardadas.empty:
+                cruce = lote[llave].merge(guardadas.drop_duplicates(), on=llave, how="left", indicator=True)
+                lote = lote[(cruce["_merge"] == "left_only").to_numpy()]
+            resumen["duplicadas"] += len(idx) - len(lote)
+            if lote.empty: continue
+            escribir_parte(carpeta, lote.reset_index(drop=True))
+            resumen["nuevas"] += len(lote)
+            resumen["particiones"] += 1
+    return resumen
+
+def particiones(nombre, agencia=None):
+    """Carpetas de partición del dataset (de una agencia o de todas) en orden cronológico."""
+    base = carpeta_dataset(nombre)
+    agencias = [f"AGENCIA={agencia}"] if agencia is not None else sorted(d for d in os.listdir(base) if d.startswith("AGENCIA=")) if os.path.isdir(base) else []
+    rutas = []
+    for a in agencias:
+        for anio in sorted(os.listdir(os.path.join(base, a))) if os.path.isdir(os.path.join(base, a)) else []:
+            rutas += [os.path.join(base, a, anio, mes) for mes in sorted(os.listdir(os.path.join(base, a, anio)))]
+    return rutas
+
+def huella(nombre, agencia=None):
+    """
+    Versión de lo guardado (de una agencia o de todas): hash de los nombres de las partes completas. Cambia con
+    cada agregar() que escribe algo, en esta sesión o en cualquier otra; solo lista carpetas, no lee datos.
+    """
+    base, h = carpeta_dataset(nombre), hashlib.sha256()
+    for carpeta in particiones(nombre, agencia):
+        try: sidecars = sorted(e.name for e in os.scandir(carpeta) if e.name.endswith(".json"))
+        except OSError: continue
+        h.update(json.dumps([os.path.relpath(carpeta, base), sidecars]).encode("utf-8"))
+    return h.hexdigest()
+
+def leer(nombre, agencia=None):
+    """Histórico completo del dataset (de una agencia o de todas), sin la columna OCURRENCIA."""
+    dfs = [df for df in (leer_particion(c) for c in particiones(nombre, agencia)) if not df.empty]
+    if not dfs: return pd.DataFrame()
+    return pd.concat(dfs, ignore_index=True).drop(columns="OCURRENCIA")
+
+@medido()
+def acumular(nombre, df, agencia):
+    """
+    Agrega el export nuevo al histórico y devuelve (histórico completo de la agencia, resumen de agregar). El
+    resumen lleva la huella tomada antes de leer: si otra sesión agrega en medio, el histórico es más nuevo que
+    su huella y quien la use de llave solo vuelve a leer de más.
+    """
+    resumen = agregar(nombre, df, agencia)
+    resumen["huella"] = huella(nombre, agencia)
+    return leer(nombre, agencia), resumen
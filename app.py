@@ -1,140 +1,31 @@
 import streamlit as st
-import pandas as pd
-import io
+from exportar import FORMATOS, descarga, exportar
+from rendimiento import corrida, llamar, panel
 
-# --- FUNCIÓN 1: LIMPIEZA DE COMPRAS (BPRO) ---
-def procesar_compras(file, nombre_agencia):
-    """
-    Limpia el archivo de compras evitando filas basura o subtotales.
-    Procesa todas las hojas manteniendo la continuidad de los encabezados.
-    """
-    # sheet_name=None lee todas las hojas devolviendo un diccionario {nombre_hoja: dataframe}
-    dict_dfs = pd.read_excel(file, sheet_name=None, header=None)
-    datos = []
-    
-    # Variables de estado FUERA del bucle de hojas para asegurar la continuidad si se corta el reporte
-    factura, fecha, proveedor, comprador = None, None, None, None
-    
-    # Recorrer cada una de las hojas del archivo
-    for hoja, df in dict_dfs.items():
-        for _, row in df.iterrows():
-            val_a = str(row[0]).strip()
-            
-            # Detectar Encabezados
-            if "FACTURA:" in val_a:
-                try:
-                    factura = val_a.split("FACTURA:")[1].strip()
-                    
-                    if "FECHA FACT:" in str(row[2]):
-                        fecha = str(row[2]).split("FECHA FACT:")[1].strip()
-                    if "PROVEEDOR:" in str(row[3]):
-                        proveedor = str(row[3]).split("PROVEEDOR:")[1].strip()
-                    if "COMPRADOR:" in str(row[4]):
-                        comprador = str(row[4]).split("COMPRADOR:")[1].strip()
-                except:
-                    continue
+# pandas, los parsers y el almacén incremental se importan al primer clic en "Procesar" y no en el primer render:
+# la página se muestra sin esperar ~0.25 s de imports (ver benchmarks/bench_arranque.py).
 
-            # Detectar Ítems (CRCU / CRTU / o cualquier código de compra)
-            elif val_a.startswith("CR"): 
-                # --- CANDADO DE LIMPIEZA ---
-                descripcion = str(row[3]).strip() # Columna D
-                
-                # Si la descripción existe y no es 'nan' (vacía), guardamos la fila
-                if descripcion and descripcion.lower() != 'nan':
-                    datos.append({
-                        "AGENCIA": nombre_agencia,
-                        "FACTURA": factura,
-                        "FECHA": fecha,
-                        "PROVEEDOR": proveedor,
-                        "COMPRADOR": comprador,
-                        "NP": row[2],
-                        "DESCRIPCION": row[3],
-                        "CANTIDAD": row[4],
-                        "COSTO UNITARIO": row[5],
-                        "SUBTOTAL": row[7],
-                        "IVA": row[8],
-                        "TOTAL": row[9] 
-                    })
-                    
-    return pd.DataFrame(datos)
+# --- AVISOS EN PANTALLA ---
+def avisar_rechazados(rechazados, nombre_agencia):
+    if not rechazados.empty:
+        st.warning(f"{nombre_agencia}: {len(rechazados)} filas con CANTIDAD o COSTO no numérico se apartaron.")
+        with st.expander(f"Ver filas apartadas ({nombre_agencia})"):
+            st.dataframe(rechazados)
 
-# --- FUNCIÓN 2: LIMPIEZA DE TRASPASOS (BPRO) ---
-def procesar_traspasos(file, nombre_agencia):
-    """
-    Limpia traspasos abarcando todas las variantes de salidas y evita subtotales finales.
-    Procesa todas las hojas manteniendo la continuidad de los encabezados.
-    """
-    # sheet_name=None lee todas las hojas devolviendo un diccionario {nombre_hoja: dataframe}
-    dict_dfs = pd.read_excel(file, sheet_name=None, header=None)
-    datos = []
-    
-    # Variables de estado (Niveles jerárquicos) FUERA del bucle de hojas para mantener continuidad
-    destino_actual = None
-    referencia, fecha_mov, usuario = None, None, None
-    
-    # Recorrer cada una de las hojas del archivo
-    for hoja, df in dict_dfs.items():
-        for _, row in df.iterrows():
-            val_a = str(row[0]).strip().upper()
-            
-            # --- NIVEL 1: DETECTAR DESTINO (SALIDA...) ---
-            if val_a.startswith("SALIDA"):
-                # CASO A: Tiene un destino explícito con la palabra "HACIA"
-                if "HACIA" in val_a:
-                    try:
-                        destino_sucio = val_a.split("HACIA")[1] 
-                        destino_actual = destino_sucio.strip()
-                    except:
-                        continue
-                # CASO B: Es una salida por traspaso genérica (sin "HACIA")
-                elif "SALIDA DE ALMACEN POR TRASPASO" in val_a:
-                    destino_actual = f"SALIDA DE ALMACEN POR TRASPASO {nombre_agencia}"
-
-            # --- NIVEL 2: DETECTAR CABECERA (REFERENCIA / FECHA / USUARIO) ---
-            elif "REFERENCIA:" in val_a:
-                try:
-                    referencia = val_a.split("REFERENCIA:")[1].strip()
-                    
-                    if "FECHA MOV:" in str(row[2]).upper():
-                        fecha_mov = str(row[2]).upper().split("FECHA MOV:")[1].strip()
-                    
-                    if "USUARIO:" in str(row[3]).upper():
-                        usuario = str(row[3]).upper().split("USUARIO:")[1].strip()
-                except:
-                    continue
-                    
-            # --- NIVEL 3: DETECTAR ÍTEMS (TRAS...) ---
-            elif val_a.startswith("TRAS"):
-                if destino_actual:
-                    try:
-                        # --- CANDADO DE LIMPIEZA ---
-                        descripcion = str(row[3]).strip()
-                        
-                        if descripcion and descripcion.lower() != 'nan':
-                            cantidad = float(row[4]) 
-                            costo = float(row[5])    
-                            
-                            datos.append({
-                                "AGENCIA": nombre_agencia,    
-                                "DESTINO": destino_actual,    
-                                "REFERENCIA": referencia,
-                                "FECHA_MOV": fecha_mov,
-                                "USUARIO": usuario,
-                                "NP": row[2],                 
-                                "DESCRIPCION": row[3],        
-                                "CANTIDAD": abs(cantidad),    
-                                "COSTO_UNIT": costo,          
-                                "TOTAL_COSTO": abs(cantidad) * costo 
-                            })
-                    except:
-                        continue
-
-    return pd.DataFrame(datos)
+def con_historico(nombre, df, nombre_agencia):
+    """Agrega al almacén incremental solo los registros nuevos y devuelve el histórico completo de la agencia."""
+    from almacen_incremental import acumular
+    historico, resumen = acumular(nombre, df, nombre_agencia)
+    st.info(f"{nombre_agencia}: {resumen['nuevas']} registros nuevos agregados al histórico ({resumen['duplicadas']} ya estaban).")
+    return historico
 
 # --- INTERFAZ STREAMLIT ---
 st.set_page_config(page_title="Limpiador BPro", layout="wide")
 st.title("🛠️ Limpiador de Reportes BPro - Compras y Traspasos")
 
+usar_historico = st.checkbox("🗄️ Acumular en el histórico local y descargar la base completa (sube solo el export nuevo)")
+formato_descarga = st.radio("Formato de descarga", list(FORMATOS), horizontal=True, help="Parquet y CSV.gz cargan mucho más rápido en Power BI.")
+
 tab1, tab2 = st.tabs(["📦 Módulo de COMPRAS", "🚚 Módulo de TRASPASOS"])
 
 # --- PESTAÑA 1: COMPRAS ---
@@ -148,25 +39,25 @@ with tab1:
         file_compras_tulti = st.file_uploader("Subir Compras TULTITLÁN", type=["xls", "xlsx"], key="ct")
         
     if st.button("Procesar Compras", type="primary"):
-        dfs_compras = []
+        with corrida("Procesar Compras") as mediciones:
+            from unificacion import procesar_compras, unir_bases
+            dfs_compras = []
         
-        if file_compras_cuauti:
-            dfs_compras.append(procesar_compras(file_compras_cuauti, "CUAUTITLAN"))
-        if file_compras_tulti:
-            dfs_compras.append(procesar_compras(file_compras_tulti, "TULTITLAN"))
+            for file_compras, agencia in [(file_compras_cuauti, "CUAUTITLAN"), (file_compras_tulti, "TULTITLAN")]:
+                if file_compras:
+                    df = llamar(f"Compras {agencia}", procesar_compras, file_compras, agencia)
+                    dfs_compras.append(con_historico("compras", df, agencia) if usar_historico else df)
             
-        if dfs_compras:
-            df_final_compras = pd.concat(dfs_compras, ignore_index=True)
-            st.success(f"¡Base Generada! {len(df_final_compras)} registros encontrados.")
-            st.dataframe(df_final_compras.head())
+            if dfs_compras:
+                df_final_compras = unir_bases(dfs_compras)
+                st.success(f"¡Base Generada! {len(df_final_compras)} registros encontrados.")
+                st.dataframe(df_final_compras.head())
             
-            buffer = io.BytesIO()
-            with pd.ExcelWriter(buffer, engine='xlsxwriter') as writer:
-                df_final_compras.to_excel(writer, index=False)
-            
-            st.download_button("⬇️ Descargar Base Unificada COMPRAS", buffer, "Master_Compras.xlsx")
-        else:
-            st.warning("Sube al menos un archivo de compras.")
+                ruta, nombre, mime = exportar({"Sheet1": df_final_compras}, formato_descarga, "Master_Compras")
+                st.download_button("⬇️ Descargar Base Unificada COMPRAS", descarga(ruta), nombre, mime, on_click="ignore")
+            else:
+                st.warning("Sube al menos un archivo de compras.")
+        panel(mediciones)
 
 # --- PESTAÑA 2: TRASPASOS ---
 with tab2:
@@ -179,22 +70,23 @@ with tab2:
         file_trasp_tulti = st.file_uploader("Subir Traspasos TULTITLÁN", type=["xls", "xlsx"], key="tt")
         
     if st.button("Procesar Traspasos", type="primary"):
-        dfs_trasp = []
+        with corrida("Procesar Traspasos") as mediciones:
+            from unificacion import procesar_traspasos, unir_bases
+            dfs_trasp = []
         
-        if file_trasp_cuauti:
-            dfs_trasp.append(procesar_traspasos(file_trasp_cuauti, "CUAUTITLAN"))
-        if file_trasp_tulti:
-            dfs_trasp.append(procesar_traspasos(file_trasp_tulti, "TULTITLAN"))
-            
-        if dfs_trasp:
-            df_final_trasp = pd.concat(dfs_trasp, ignore_index=True)
-            st.success(f"¡Base Generada! {len(df_final_trasp)} movimientos encontrados.")
-            st.dataframe(df_final_trasp.head())
+            for file_trasp, agencia in [(file_trasp_cuauti, "CUAUTITLAN"), (file_trasp_tulti, "TULTITLAN")]:
+                if file_trasp:
+                    datos, rechazados = llamar(f"Traspasos {agencia}", procesar_traspasos, file_trasp, agencia)
+                    avisar_rechazados(rechazados, agencia)
+                    dfs_trasp.append(con_historico("traspasos", datos, agencia) if usar_historico else datos)
             
-            buffer2 = io.BytesIO()
-            with pd.ExcelWriter(buffer2, engine='xlsxwriter') as writer:
-                df_final_trasp.to_excel(writer, index=False)
+            if dfs_trasp:
+                df_final_trasp = unir_bases(dfs_trasp)
+                st.success(f"¡Base Generada! {len(df_final_trasp)} movimientos encontrados.")
+                st.dataframe(df_final_trasp.head())
             
-            st.download_button("⬇️ Descargar Base Unificada TRASPASOS", buffer2, "Master_Traspasos.xlsx")
-        else:
-            st.warning("Sube al menos un archivo de traspasos.")
+                ruta, nombre, mime = exportar({"Sheet1": df_final_trasp}, formato_descarga, "Master_Traspasos")
+                st.download_button("⬇️ Descargar Base Unificada TRASPASOS", descarga(ruta), nombre, mime, on_click="ignore")
+            else:
+                st.warning("Sube al menos un archivo de traspasos.")
+        panel(mediciones)
@@ -0,0 +1,75 @@
+"""
+Almacén incremental (almacen_incremental.py): agregar solo el export nuevo vs re-procesar toda la historia.
+
+Uso: python benchmarks/bench_almacen.py [filas]   (por defecto 400000 filas de compras, ~12 meses)
+1. Exports que se traslapan (ene-jun y luego abr-dic) dejan en el almacén exactamente la historia completa,
+   sin duplicar y sin perder renglones repetidos de una misma factura; volver a subir un export no agrega nada.
+2. Un NP con tipos mezclados (int / str) sobrevive la ida y vuelta.
+3. Parsear el export de toda la historia vs parsear solo un mes + agregarlo + leer la historia del almacén
+   (sin contar la lectura del Excel, que también escala con el tamaño del export).
+"""
+import os
+import sys
+import tempfile
+import time
+
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(__file__))
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+import almacen_incremental as almacen  # noqa: E402
+from generador_bpro import generar_compras  # noqa: E402
+from parsers_bpro import parsear_compras_bpro  # noqa: E402
+
+
+def ordenado(df):
+    df = df.astype(str)
+    return df.sort_values(list(df.columns)).reset_index(drop=True)
+
+
+def meses(df, desde, hasta):
+    mes = pd.to_datetime(df["FECHA"], format="%d/%m/%Y").dt.month
+    return df[mes.between(desde, hasta).to_numpy()].reset_index(drop=True)
+
+
+if __name__ == "__main__":
+    filas = int(sys.argv[1]) if len(sys.argv) > 1 else 400_000
+    historia = parsear_compras_bpro(generar_compras(filas), "CUAUTITLAN")
+    with tempfile.TemporaryDirectory() as carpeta:
+        almacen.ALMACEN_DIR = carpeta
+        r1 = almacen.agregar("compras", meses(historia, 1, 6), "CUAUTITLAN")
+        r2 = almacen.agregar("compras", meses(historia, 4, 12), "CUAUTITLAN")
+        r3 = almacen.agregar("compras", historia, "CUAUTITLAN")
+        guardada = almacen.leer("compras", "CUAUTITLAN")
+        pd.testing.assert_frame_equal(ordenado(guardada[historia.columns]), ordenado(historia))
+        assert r3["nuevas"] == 0 and r1["nuevas"] + r2["nuevas"] == len(historia), (r1, r2, r3)
+        print(f"Traslape y re-subida OK: {r1['nuevas']} + {r2['nuevas']} nuevas ({r2['duplicadas']} repetidas), re-subida {r3['nuevas']}")
+
+        mezcla = historia.head(50).assign(NP=[i if i % 2 else f"NP{i}" for i in range(50)])
+        almacen.agregar("compras", mezcla, "MIXTO")
+        almacen.agregar("compras", mezcla, "MIXTO")
+        leida = almacen.leer("compras", "MIXTO")[mezcla.columns]
+        por_np = lambda df: df.iloc[df["NP"].astype(str).argsort()].reset_index(drop=True)  # noqa: E731
+        pd.testing.assert_frame_equal(por_np(leida), por_np(mezcla))
+        print("NP con tipos mezclados OK")
+
+    with tempfile.TemporaryDirectory() as carpeta:
+        almacen.ALMACEN_DIR = carpeta
+        almacen.agregar("compras", meses(historia, 1, 11), "CUAUTITLAN")
+        nuevo_mes = meses(historia, 12, 12)
+        inicio = time.perf_counter()
+        almacen.agregar("compras", nuevo_mes, "CUAUTITLAN")
+        t_agregar = time.perf_counter() - inicio
+        inicio = time.perf_counter()
+        almacen.leer("compras", "CUAUTITLAN")
+        t_leer = time.perf_counter() - inicio
+        hojas_historia, hojas_mes = generar_compras(filas), generar_compras(filas // 12)
+        inicio = time.perf_counter()
+        parsear_compras_bpro(hojas_historia, "CUAUTITLAN")
+        t_historia = time.perf_counter() - inicio
+        inicio = time.perf_counter()
+        parsear_compras_bpro(hojas_mes, "CUAUTITLAN")
+        t_mes = time.perf_counter() - inicio
+        print(f"{len(historia)} registros en el almacén, mes nuevo de {len(nuevo_mes)}")
+        print(f"re-subir la historia: parseo {t_historia:.2f}s")
+        print(f"export de un mes: parseo {t_mes:.2f}s + agregar {t_agregar:.2f}s + leer la historia {t_leer:.2f}s")
@@ -0,0 +1,96 @@
+"""
+Arranque en frío: cuánto tarda cada punto de entrada en importarse en un proceso nuevo, y en qué paquetes se va
+ese tiempo (python -X importtime).
+
+Uso: python benchmarks/bench_arranque.py [repeticiones] [--historial arranque.jsonl]   (por defecto 7 repeticiones)
+1. El primer render de app.py no carga pandas, numpy, pyarrow, babel ni los motores de Excel; reportes_fifo no
+   carga babel y la tabla MESES da los mismos nombres que babel (si está instalado).
+2. Mediana de cada punto de entrada en procesos nuevos (streamlit ya importado, como en el servidor) y los
+   paquetes que más tiempo propio suman. Con --historial se agrega una línea JSON por corrida para seguir la
+   tendencia entre versiones.
+"""
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+
+RAIZ = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+PESADOS = ("pandas", "numpy", "pyarrow", "babel", "xlsxwriter", "openpyxl", "python_calamine")
+# nombre -> (lo que ya está cargado en el servidor, lo que se mide)
+ENTRADAS = {
+    "streamlit": ("pass", "import streamlit"),
+    "pandas": ("pass", "import pandas"),
+    "app.py (primer render)": ("import streamlit", "runpy.run_path('app.py')"),
+    "app.py (primer clic)": ("import streamlit; runpy.run_path('app.py')", "import unificacion, almacen_incremental"),
+    "limpiador_01": ("import streamlit", "import limpiador_01"),
+    "limpiador_ventasdrive": ("import streamlit", "import limpiador_ventasdrive"),
+    "limpiador_cli": ("pass", "import limpiador_cli"),
+}
+MARCA = "--- medir ---"
+CODIGO = ("import json, runpy, sys, time\n{preparar}\nsys.stderr.write({marca!r} + '\\n')\ninicio = time.perf_counter()\n{medir}\n"
+          "print(json.dumps([time.perf_counter() - inicio, [m for m in {pesados!r} if m in sys.modules]]))")
+
+
+def correr(preparar, medir, importtime=False):
+    codigo = CODIGO.format(preparar=preparar, medir=medir, marca=MARCA, pesados=PESADOS)
+    entorno = {**os.environ, "STREAMLIT_LOGGER_LEVEL": "error"}
+    salida = subprocess.run([sys.executable] + (["-X", "importtime"] if importtime else []) + ["-c", codigo],
+                            cwd=RAIZ, env=entorno, capture_output=True, text=True, check=True)
+    segundos, cargados = json.loads(salida.stdout.strip().splitlines()[-1])
+    return segundos, cargados, salida.stderr
+
+
+def por_paquete(stderr):
+    """Microsegundos propios (sin hijos) de cada paquete de primer nivel importado en la parte medida, de mayor a menor."""
+    suma = {}
+    for linea in stderr.split(MARCA)[-1].splitlines():
+        if not linea.startswith("import time:") or "self [us]" in linea: continue
+        propio, _, nombre = linea[len("import time:"):].split("|")
+        paquete = nombre.strip().split(".")[0]
+        suma[paquete] = suma.get(paquete, 0) + int(propio)
+    return sorted(suma.items(), key=lambda x: -x[1])
+
+
+def verificar():
+    _, cargados, _ = correr("import streamlit", "runpy.run_path('app.py')")
+    assert not cargados, f"el primer render de app.py cargó {cargados}"
+    _, cargados, _ = correr("pass", "import exportar")
+    assert not cargados, f"exportar cargó {cargados}"
+    _, cargados, _ = correr("pass", "import reportes_fifo")
+    assert "babel" not in cargados
+    sys.path.insert(0, RAIZ)
+    from reportes_fifo import MESES
+    try:
+        from babel.dates import get_month_names
+        assert MESES[1:] == [get_month_names('wide', locale='es_ES')[m].capitalize() for m in range(1, 13)]
+        print("Primer render de app.py sin pandas ni motores de Excel; MESES igual a babel OK")
+    except ImportError:
+        print("Primer render de app.py sin pandas ni motores de Excel OK (babel no instalado, MESES sin comparar)")
+
+
+if __name__ == "__main__":
+    argumentos = sys.argv[1:]
+    historial = None
+    if "--historial" in argumentos:
+        i = argumentos.index("--historial")
+        historial = argumentos[i + 1]
+        del argumentos[i:i + 2]
+    repeticiones = int(argumentos[0]) if argumentos else 7
+    verificar()
+
+    resultados = {}
+    for nombre, (preparar, medir) in ENTRADAS.items():
+        tiempos = [correr(preparar, medir)[0] for _ in range(repeticiones)]
+        _, cargados, stderr = correr(preparar, medir, importtime=True)
+        resultados[nombre] = statistics.median(tiempos)
+        top = ", ".join(f"{p} {us / 1000:.0f}ms" for p, us in por_paquete(stderr)[:5])
+        print(f"{nombre:<24} {resultados[nombre] * 1000:7.1f} ms   pesados: {', '.join(cargados) or '-'}   [{top}]")
+
+    if historial:
+        with open(historial, "a", encoding="utf-8") as f:
+            f.write(json.dumps({"fecha": time.strftime("%Y-%m-%dT%H:%M:%S"), "python": platform.python_version(),
+                                "repeticiones": repeticiones, "ms": {k: round(v * 1000, 1) for k, v in resultados.items()}}) + "\n")
+        print(f"Agregado a {historial}")
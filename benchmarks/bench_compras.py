@@ -0,0 +1,59 @@
+"""
+Benchmark del parser de compras BPro: bucle iterrows original vs motor columnar.
+
+Uso: python benchmarks/bench_compras.py [filas ...]   (por defecto 10k, 100k y 1M)
+Antes de medir, verifica que ambos produzcan exactamente el mismo DataFrame.
+"""
+import os
+import sys
+import time
+
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(__file__))
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+from generador_bpro import generar_compras  # noqa: E402
+from parsers_bpro import ESQUEMA_COMPRAS, parsear_compras_bpro, tipar  # noqa: E402
+
+
+# --- REFERENCIA: BUCLE ORIGINAL DE app.py ---
+def procesar_compras_iterrows(dict_dfs, nombre_agencia):
+    datos = []
+    factura, fecha, proveedor, comprador = None, None, None, None
+    for hoja, df in dict_dfs.items():
+        for _, row in df.iterrows():
+            val_a = str(row[0]).strip()
+            if "FACTURA:" in val_a:
+                try:
+                    factura = val_a.split("FACTURA:")[1].strip()
+                    if "FECHA FACT:" in str(row[2]): fecha = str(row[2]).split("FECHA FACT:")[1].strip()
+                    if "PROVEEDOR:" in str(row[3]): proveedor = str(row[3]).split("PROVEEDOR:")[1].strip()
+                    if "COMPRADOR:" in str(row[4]): comprador = str(row[4]).split("COMPRADOR:")[1].strip()
+                except: continue
+            elif val_a.startswith("CR"):
+                descripcion = str(row[3]).strip()
+                if descripcion and descripcion.lower() != 'nan':
+                    datos.append({"AGENCIA": nombre_agencia, "FACTURA": factura, "FECHA": fecha, "PROVEEDOR": proveedor,
+                                  "COMPRADOR": comprador, "NP": row[2], "DESCRIPCION": row[3], "CANTIDAD": row[4],
+                                  "COSTO UNITARIO": row[5], "SUBTOTAL": row[7], "IVA": row[8], "TOTAL": row[9]})
+    return pd.DataFrame(datos)
+
+
+def medir(fn, *args):
+    inicio = time.perf_counter()
+    res = fn(*args)
+    return res, time.perf_counter() - inicio
+
+
+if __name__ == "__main__":
+    tamanos = [int(x) for x in sys.argv[1:]] or [10_000, 100_000, 1_000_000]
+    for semilla in range(5):
+        hojas = generar_compras(3_000, semilla=semilla)
+        pd.testing.assert_frame_equal(parsear_compras_bpro(hojas, "CUAUTITLAN"), tipar(procesar_compras_iterrows(hojas, "CUAUTITLAN"), ESQUEMA_COMPRAS))
+    print("Equivalencia OK")
+    print(f"{'filas':>10} {'iterrows (s)':>14} {'columnar (s)':>14} {'x':>8}")
+    for n in tamanos:
+        hojas = generar_compras(n)
+        _, t_nuevo = medir(parsear_compras_bpro, hojas, "CUAUTITLAN")
+        _, t_viejo = medir(procesar_compras_iterrows, hojas, "CUAUTITLAN")
+        print(f"{n:>10} {t_viejo:>14.3f} {t_nuevo:>14.3f} {t_viejo / t_nuevo:>8.1f}")
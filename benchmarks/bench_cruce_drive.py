@@ -0,0 +1,78 @@
+"""
+Benchmark del cruce Drive vs Ventas (hoja Drive_No_Vendido): escaneo por solicitud vs índice ordenado.
+
+Uso: python benchmarks/bench_cruce_drive.py [solicitudes ventas]   (por defecto 5000 500000)
+Antes de medir verifica que ambos caminos produzcan la misma hoja.
+"""
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+from cruce_drive import calcular_drive_no_vendido  # noqa: E402
+
+
+# --- REFERENCIA: BUCLE ORIGINAL DE LA FASE 5 ---
+def drive_no_vendido_iterrows(df_drive, df_ventas):
+    analisis = []
+    for _, row in df_drive.iterrows():
+        agencia, np_val, fecha_sol, cant_pedida = row['AGENCIA'], row['NP'], row['FECHA_SOLICITUD_DT'], row['CANTIDAD']
+        ventas_post = df_ventas[(df_ventas['AGENCIA'] == agencia) & (df_ventas['NP'] == np_val) & (df_ventas['FECHA'] >= fecha_sol)]
+        total_vendido = ventas_post['CANTIDAD'].sum()
+        if cant_pedida - total_vendido > 0:
+            fila = row.drop('FECHA_SOLICITUD_DT').to_dict()
+            fila['FECHA_SOLICITUD'] = fecha_sol.strftime('%d/%m/%Y')
+            fila['CANTIDAD_VENDIDA'] = total_vendido
+            fila['SOBRANTE'] = cant_pedida - total_vendido
+            analisis.append(fila)
+    hoja_drive = pd.DataFrame(analisis)
+    if not hoja_drive.empty:
+        hoja_drive = hoja_drive[['AGENCIA', 'FECHA_SOLICITUD', 'VENDEDOR', 'NP', 'DESCRIPCION', 'CANTIDAD', 'CANTIDAD_VENDIDA', 'SOBRANTE', 'ORDEN_COMPRA']]
+        hoja_drive = hoja_drive.sort_values(by='SOBRANTE', ascending=False)
+    return hoja_drive
+
+
+# --- DATOS SINTÉTICOS ---
+def generar_cruce(n_solicitudes, n_ventas, n_partes=20_000, semilla=0):
+    """Solicitudes de Drive ya limpias (Fase 3) y ventas 2026 ya filtradas (Fase 4)."""
+    rng = np.random.default_rng(semilla)
+    inicio = np.datetime64('2026-01-01')
+    agencias = np.array(['CUAUTITLAN', 'TULTITLAN'])
+    df_ventas = pd.DataFrame({
+        'AGENCIA': agencias[rng.integers(0, 2, n_ventas)],
+        'NP': [f"NP{i}" for i in rng.integers(0, n_partes, n_ventas)],
+        'FECHA': pd.to_datetime(inicio + rng.integers(0, 365, n_ventas).astype('timedelta64[D]')),
+        'CANTIDAD': rng.integers(1, 4, n_ventas).astype(float),
+    })
+    df_drive = pd.DataFrame({
+        'FECHA_SOLICITUD': 'x',
+        'VENDEDOR': [f"V{i}" for i in rng.integers(0, 30, n_solicitudes)],
+        'NP': [f"NP{i}" for i in rng.integers(0, n_partes, n_solicitudes)],
+        'DESCRIPCION': 'PIEZA',
+        'CANTIDAD': rng.integers(1, 40, n_solicitudes),
+        'ORDEN_COMPRA': 'OC',
+        'AGENCIA': agencias[rng.integers(0, 2, n_solicitudes)],
+        'FECHA_SOLICITUD_DT': pd.to_datetime(inicio + rng.integers(0, 365, n_solicitudes).astype('timedelta64[D]')),
+    })
+    return df_drive, df_ventas
+
+
+def medir(fn, *args):
+    inicio = time.perf_counter()
+    res = fn(*args)
+    return res, time.perf_counter() - inicio
+
+
+if __name__ == "__main__":
+    n_sol, n_ven = (int(sys.argv[1]), int(sys.argv[2])) if len(sys.argv) > 2 else (5_000, 500_000)
+    for semilla in range(3):
+        df_drive, df_ventas = generar_cruce(800, 20_000, n_partes=300, semilla=semilla)
+        pd.testing.assert_frame_equal(calcular_drive_no_vendido(df_drive, df_ventas), drive_no_vendido_iterrows(df_drive, df_ventas))
+    print("Equivalencia OK")
+    df_drive, df_ventas = generar_cruce(n_sol, n_ven)
+    _, t_nuevo = medir(calcular_drive_no_vendido, df_drive, df_ventas)
+    _, t_viejo = medir(drive_no_vendido_iterrows, df_drive, df_ventas)
+    print(f"{n_sol} solicitudes x {n_ven} ventas: escaneo {t_viejo:.2f}s, índice {t_nuevo:.3f}s ({t_viejo / t_nuevo:.0f}x)")
@@ -0,0 +1,85 @@
+"""
+Exportación de bases unificadas: pd.ExcelWriter + to_excel vs exportar.py (xlsxwriter constant_memory, Parquet, CSV.gz).
+
+Uso: python benchmarks/bench_exportar.py [filas ...]   (por defecto 100000 y 500000 filas de compras)
+1. El .xlsx de exportar.py se lee igual que el de to_excel (nulos, fechas, categorías, NP mezclados)
+   y Parquet / CSV.gz traen las mismas filas.
+2. Tiempo, pico de memoria de Python (tracemalloc) y tamaño del archivo por formato.
+"""
+import io
+import os
+import sys
+import time
+import tracemalloc
+import zipfile
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(__file__))
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+from generador_bpro import generar_compras  # noqa: E402
+from exportar import FORMATOS, exportar  # noqa: E402
+from parsers_bpro import parsear_compras_bpro  # noqa: E402
+
+
+def to_excel_original(hojas):
+    buffer = io.BytesIO()
+    with pd.ExcelWriter(buffer, engine="xlsxwriter") as writer:
+        for hoja, df in hojas.items(): df.to_excel(writer, sheet_name=hoja, index=False)
+    return buffer.getvalue()
+
+
+def base_compras(filas):
+    """Base unificada de las dos agencias, del tamaño pedido."""
+    hojas = generar_compras(int(filas * 2.7))
+    df = pd.concat([parsear_compras_bpro(hojas, "CUAUTITLAN"), parsear_compras_bpro(hojas, "TULTITLAN")], ignore_index=True)
+    return pd.concat([df] * (filas // len(df) + 1), ignore_index=True).head(filas)
+
+
+def verificar():
+    df = base_compras(3_000)
+    df.loc[::7, "NP"] = None
+    df.loc[::11, "CANTIDAD"] = np.nan
+    df.loc[::13, "FECHA"] = pd.NaT
+    mezcla = df.head(200).assign(NP=[i if i % 2 else f"NP{i}" for i in range(200)])
+    hojas = {"General": df, "Mezcla": mezcla, "Vacia": df.head(0)}
+    nuevo, nombre, _ = exportar(hojas, "Excel", "Base")
+    viejo = to_excel_original(hojas)
+    for hoja in hojas:
+        pd.testing.assert_frame_equal(pd.read_excel(nuevo, sheet_name=hoja), pd.read_excel(io.BytesIO(viejo), sheet_name=hoja))
+    par, nombre, _ = exportar({"General": df}, "Parquet", "Base")
+    assert nombre == "Base.parquet" and len(pd.read_parquet(par)) == len(df)
+    gz, nombre, _ = exportar({"General": df}, "CSV.gz", "Base")
+    assert nombre == "Base.csv.gz" and len(pd.read_csv(gz, compression="gzip")) == len(df)
+    zip_, nombre, _ = exportar(hojas, "Parquet", "Base")
+    with zipfile.ZipFile(zip_) as zf: assert nombre == "Base.zip" and zf.namelist() == [f"{h}.parquet" for h in hojas]
+    for ruta in (nuevo, par, gz, zip_): os.remove(ruta)
+    print("Excel igual a to_excel; Parquet, CSV.gz y zip multi-hoja OK")
+
+
+def medir(fn, *args):
+    """El tiempo se toma en una corrida sin tracemalloc (que vuelve varias veces más lento a xlsxwriter)."""
+    inicio = time.perf_counter()
+    res = fn(*args)
+    t = time.perf_counter() - inicio
+    tracemalloc.start()
+    otra = fn(*args)
+    pico = tracemalloc.get_traced_memory()[1] / 2**20
+    tracemalloc.stop()
+    if isinstance(otra, tuple): os.remove(otra[0])  # exportar deja un archivo por corrida
+    return res, t, pico
+
+
+if __name__ == "__main__":
+    tamanos = [int(x) for x in sys.argv[1:]] or [100_000, 500_000]
+    verificar()
+    print(f"{'filas':>8} {'formato':>18} {'tiempo (s)':>11} {'pico (MB)':>10} {'archivo (MB)':>13}")
+    for n in tamanos:
+        hojas = {"Sheet1": base_compras(n)}
+        datos, t, pico = medir(to_excel_original, hojas)
+        print(f"{n:>8} {'to_excel':>18} {t:>11.2f} {pico:>10.0f} {len(datos) / 2**20:>13.1f}")
+        for formato in FORMATOS:
+            (ruta, _, _), t, pico = medir(exportar, hojas, formato, "Master_Compras")
+            print(f"{n:>8} {formato:>18} {t:>11.2f} {pico:>10.0f} {os.path.getsize(ruta) / 2**20:>13.1f}")
+            os.remove(ruta)
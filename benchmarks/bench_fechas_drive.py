@@ -0,0 +1,57 @@
+"""
+Fechas de solicitudes del Drive: limpiar_fecha_robusta por celda (.apply) vs limpiar_fechas por columna.
+
+Uso: python benchmarks/bench_fechas_drive.py [filas]   (por defecto 50000 solicitudes)
+Columna grande con fechas repetidas: equivalencia y tiempos. El corpus de formatos vistos en los Drive de ambas
+agencias se compara contra la versión original (tests/referencias.py) en tests/test_fechas_drive.py.
+"""
+import os
+import sys
+import time
+import warnings
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "tests"))
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+from cruce_drive import limpiar_fechas  # noqa: E402
+from referencias import limpiar_fecha_robusta  # noqa: E402
+
+
+def comparar(col, es_tulti):
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore")
+        referencia = col.apply(lambda x: limpiar_fecha_robusta(x, es_tulti=es_tulti))
+        nueva = limpiar_fechas(col, es_tulti)
+    # Columna vacía: .apply devuelve object (y .dt fallaba); la versión por columna siempre es datetime
+    pd.testing.assert_series_equal(nueva, referencia, check_dtype=len(col) > 0)
+
+
+def columna_drive(filas, semilla=0):
+    rng = np.random.default_rng(semilla)
+    dias = pd.date_range("2025-06-01", "2026-12-31")
+    fechas = dias[rng.integers(0, len(dias), filas)]
+    estilos = rng.integers(0, 4, filas)
+    meses = ["enero", "febrero", "marzo", "abril", "mayo", "junio", "julio", "agosto", "septiembre", "octubre", "noviembre", "diciembre"]
+    semana = ["lunes", "martes", "miércoles", "jueves", "viernes", "sábado", "domingo"]
+    textos = [f"{semana[f.weekday()]}, {f.day} de {meses[f.month - 1]} de {f.year}" if e == 0 else
+              f"{f.day}/{f.month}/{f.year}" if e == 1 else
+              f"{f.day:02d}/{f.month:02d}/{f.year} 10:{f.day:02d}:00" if e == 2 else
+              rng.choice(["", "N/A", None]) for f, e in zip(fechas, estilos)]
+    return pd.Series(textos, dtype=object)
+
+
+if __name__ == "__main__":
+    filas = int(sys.argv[1]) if len(sys.argv) > 1 else 50_000
+    col = columna_drive(filas)
+    for es_tulti in (False, True): comparar(col, es_tulti)
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore")
+        inicio = time.perf_counter()
+        col.apply(lambda x: limpiar_fecha_robusta(x, es_tulti=False))
+        t_apply = time.perf_counter() - inicio
+        inicio = time.perf_counter()
+        limpiar_fechas(col, False)
+        t_columna = time.perf_counter() - inicio
+    print(f"{filas} solicitudes ({col.nunique()} textos distintos): apply {t_apply:.2f}s, por columna {t_columna:.3f}s")
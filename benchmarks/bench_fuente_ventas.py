@@ -0,0 +1,95 @@
+"""
+Origen de Ventas Master contra un servidor HTTP local que imita a Google Drive: descarga completa en cada corrida
+(pd.read_csv sobre la URL, como la Fase 4 original) vs ventas_master.leer_ventas_master (GET condicional con
+ETag / Last-Modified, hash de contenido y caché de parseo).
+
+Uso: python benchmarks/bench_fuente_ventas.py [renglones]   (por defecto 1000000)
+Descarga y parseo medidos por separado en la primera corrida y en las siguientes. Los casos de la fuente (archivo y
+carpeta locales, 304 con ETag, sin validadores, contenido nuevo, 503 reintentado y 404) están en
+tests/test_fuente_ventas.py, sobre este mismo Servidor.
+"""
+import hashlib
+import os
+import sys
+import tempfile
+import threading
+import time
+from email.utils import formatdate
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(__file__))
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+import cache_parseo  # noqa: E402
+import ventas_master  # noqa: E402
+from generador_bpro import escribir_ventas  # noqa: E402
+from ventas_master import leer_ventas_master  # noqa: E402
+
+
+# --- SERVIDOR LOCAL ---
+class Servidor:
+    """Sirve {ruta: bytes}; cuenta peticiones y bytes enviados. Con `validadores` manda ETag y Last-Modified."""
+
+    def __init__(self):
+        self.archivos, self.validadores, self.fallas, self.peticiones, self.enviados = {}, True, 0, [], 0
+        servidor = self
+
+        class Manejador(BaseHTTPRequestHandler):
+            def log_message(self, *args): pass
+
+            def do_GET(self):
+                datos = servidor.archivos.get(self.path)
+                if servidor.fallas:
+                    servidor.fallas -= 1
+                    servidor.peticiones.append(503)
+                    return self.send_error(503)
+                if datos is None:
+                    servidor.peticiones.append(404)
+                    return self.send_error(404)
+                etag = f'"{hashlib.sha256(datos).hexdigest()[:20]}"'
+                if servidor.validadores and self.headers.get("If-None-Match") == etag:
+                    servidor.peticiones.append(304)
+                    self.send_response(304)
+                    return self.end_headers()
+                servidor.peticiones.append(200)
+                self.send_response(200)
+                self.send_header("Content-Length", str(len(datos)))
+                if servidor.validadores:
+                    self.send_header("ETag", etag)
+                    self.send_header("Last-Modified", formatdate(usegmt=True))
+                self.end_headers()
+                self.wfile.write(datos)
+                servidor.enviados += len(datos)
+
+        self.http = ThreadingHTTPServer(("127.0.0.1", 0), Manejador)
+        threading.Thread(target=self.http.serve_forever, daemon=True).start()
+
+    def url(self, ruta):
+        return f"http://127.0.0.1:{self.http.server_port}{ruta}"
+
+
+def medir(fn, *args):
+    inicio = time.perf_counter()
+    res = fn(*args)
+    return res, time.perf_counter() - inicio
+
+
+if __name__ == "__main__":
+    renglones = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    ventas_master.ESPERA_REINTENTO = 0.05
+    servidor = Servidor()
+    with tempfile.TemporaryDirectory() as carpeta:
+        cache_parseo.CACHE_DIR = os.path.join(carpeta, "cache")
+        ruta = os.path.join(carpeta, "grande.csv")
+        escribir_ventas(ruta, renglones)
+        with open(ruta, "rb") as f: servidor.archivos["/grande"] = f.read()
+        url = servidor.url("/grande")
+        print(f"{renglones} renglones, {os.path.getsize(ruta) / 2**20:.0f} MB")
+        _, t = medir(lambda: pd.read_csv(url, encoding="latin1"))
+        print(f"original (read_csv sobre la URL, cada corrida): {t:.2f}s")
+        for corrida in ("primera", "segunda", "tercera"):
+            (_, informe), t = medir(leer_ventas_master, url)
+            print(f"{corrida:>8}: {informe['origen']:<18} descarga {informe['descarga_s']:.2f}s, parseo {informe['parseo_s']:.2f}s "
+                  f"({informe['bytes_descargados'] / 2**20:.0f} MB) total {t:.2f}s")
+    servidor.http.shutdown()
@@ -0,0 +1,60 @@
+"""
+Benchmark de la ingesta de Excel: pd.read_excel(sheet_name=None) completo vs lector_excel.leer_hojas.
+
+Uso: python benchmarks/bench_lectura_excel.py [filas] [--memoria]   (por defecto 200000 filas de compras en 3 hojas)
+Escribe un .xlsx sintético con columnas basura a la derecha (como los exports reales de BPro),
+verifica que el parser de compras dé el mismo resultado con cada motor y mide tiempo
+(y pico de memoria con --memoria, que corre aparte porque tracemalloc frena mucho la lectura).
+"""
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(__file__))
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+from generador_bpro import generar_compras  # noqa: E402
+from lector_excel import HAY_CALAMINE, leer_hojas  # noqa: E402
+from parsers_bpro import parsear_compras_bpro  # noqa: E402
+
+
+def escribir_libro(ruta, filas, columnas_extra=8):
+    with pd.ExcelWriter(ruta, engine="xlsxwriter") as writer:
+        for nombre, df in generar_compras(filas).items():
+            for i in range(columnas_extra): df[12 + i] = "OBSERVACION"
+            df.to_excel(writer, sheet_name=nombre, header=False, index=False)
+
+
+def medir(fn, *args, memoria=False, **kwargs):
+    if memoria: tracemalloc.start()
+    inicio = time.perf_counter()
+    res = fn(*args, **kwargs)
+    t = time.perf_counter() - inicio
+    pico = tracemalloc.get_traced_memory()[1] / 2**20 if memoria else float("nan")
+    if memoria: tracemalloc.stop()
+    return res, t, pico
+
+
+if __name__ == "__main__":
+    args = [a for a in sys.argv[1:] if not a.startswith("--")]
+    filas, memoria = int(args[0]) if args else 200_000, "--memoria" in sys.argv
+    with tempfile.TemporaryDirectory() as carpeta:
+        ruta = os.path.join(carpeta, "compras.xlsx")
+        escribir_libro(ruta, filas)
+        print(f"{filas} filas, {os.path.getsize(ruta) / 2**20:.1f} MB")
+        caminos = [("read_excel completo (openpyxl)", pd.read_excel, {"sheet_name": None, "header": None, "engine": "openpyxl"}),
+                   ("leer_hojas openpyxl streaming", leer_hojas, {"motor": "openpyxl"})]
+        if HAY_CALAMINE: caminos.append(("leer_hojas calamine", leer_hojas, {"motor": "calamine"}))
+        referencia = None
+        for nombre, fn, kwargs in caminos:
+            hojas, t, _ = medir(fn, ruta, **kwargs)
+            if memoria: _, _, pico = medir(fn, ruta, memoria=True, **kwargs)
+            else: pico = float("nan")
+            items = parsear_compras_bpro(hojas, "CUAUTITLAN")
+            if referencia is None: referencia = items
+            else: pd.testing.assert_frame_equal(items, referencia)
+            print(f"{nombre:<32} {t:>7.2f}s   pico {pico:>6.0f} MB")
+        print("Equivalencia OK")
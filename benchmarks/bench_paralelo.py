@@ -0,0 +1,89 @@
+"""
+Parseo en paralelo: hoja por hoja y archivo por archivo en el pool de procesos de ejecucion.py.
+
+Uso: python benchmarks/bench_paralelo.py [trabajadores filas]   (por defecto todos los núcleos, 120000 filas)
+1. Reconciliación: partir un reporte en hojas con cortes aleatorios (incluso hojas de 1 fila o sin
+   encabezados) y parsearlas aisladas + reconciliar_hojas da lo mismo que leerlo de corrido.
+2. Un libro de 8 hojas y 6 archivos independientes: secuencial vs pool, mismo resultado y tiempos.
+"""
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(__file__))
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+import ejecucion  # noqa: E402
+from bench_streaming import comparar  # noqa: E402
+from generador_bpro import escribir_libro, generar_compras, generar_traspasos, generar_ventas  # noqa: E402
+from parsers_bpro import (COLUMNAS_RECHAZADOS, ESQUEMA_COMPRAS, ESQUEMA_TRASPASOS, ESQUEMA_VENTAS_FIFO,  # noqa: E402
+                          compras_bloque, parsear_compras_bpro, parsear_hoja_aislada, parsear_traspasos_bpro,
+                          reconciliar_hojas, resultado_de_lotes, traspasos_bloque, ventas_fifo_bloque)
+
+
+def cortar(hojas, rng, n_cortes):
+    """Une las hojas y las vuelve a partir en posiciones aleatorias (algunas hojas quedan de 1-3 filas)."""
+    df = pd.concat(list(hojas.values()), ignore_index=True)
+    cortes = sorted(set(rng.integers(1, len(df), n_cortes)) | {c + 1 for c in rng.integers(1, len(df) - 2, 3)})
+    partes = np.split(np.arange(len(df)), cortes)
+    return {f"Hoja{i + 1}": df.iloc[idx].reset_index(drop=True) for i, idx in enumerate(partes) if len(idx)}
+
+
+def verificar_reconciliacion(casos=40):
+    for semilla in range(casos):
+        rng = np.random.default_rng(semilla)
+        for generar, parser_bloque, parser, columnas in [
+                (generar_compras, compras_bloque, lambda h: parsear_compras_bpro(h, "CUAUTITLAN"), [ESQUEMA_COMPRAS]),
+                (generar_traspasos, traspasos_bloque, lambda h: parsear_traspasos_bpro(h, "CUAUTITLAN"), [ESQUEMA_TRASPASOS, COLUMNAS_RECHAZADOS])]:
+            hojas = cortar(generar(int(rng.integers(50, 2_000)), semilla=semilla), rng, int(rng.integers(1, 12)))
+            aisladas = [parsear_hoja_aislada(df, parser_bloque, "CUAUTITLAN") for df in hojas.values()]
+            comparar(resultado_de_lotes(reconciliar_hojas(parser_bloque, aisladas, "CUAUTITLAN"), *columnas), parser(hojas))
+    print(f"Reconciliación en cortes de hoja OK ({casos} libros por parser)")
+
+
+def medir(fn, *args):
+    inicio = time.perf_counter()
+    res = fn(*args)
+    return res, time.perf_counter() - inicio
+
+
+def libro_completo(ruta):
+    return ejecucion.parsear_archivo(compras_bloque, ruta, ("CUAUTITLAN",), [ESQUEMA_COMPRAS], streaming=False)
+
+
+def seis_archivos(rutas):
+    trabajos = [(ejecucion.parsear_archivo, compras_bloque, rutas["compras"], ("CUAUTITLAN",), [ESQUEMA_COMPRAS], False),
+                (ejecucion.parsear_archivo, compras_bloque, rutas["compras"], ("TULTITLAN",), [ESQUEMA_COMPRAS], False),
+                (ejecucion.parsear_archivo, traspasos_bloque, rutas["traspasos"], ("CUAUTITLAN",), [ESQUEMA_TRASPASOS, COLUMNAS_RECHAZADOS], False),
+                (ejecucion.parsear_archivo, traspasos_bloque, rutas["traspasos"], ("TULTITLAN",), [ESQUEMA_TRASPASOS, COLUMNAS_RECHAZADOS], False),
+                (ejecucion.parsear_archivo, ventas_fifo_bloque, rutas["ventas"], (["VRCU"],), [ESQUEMA_VENTAS_FIFO], False, True),
+                (ejecucion.parsear_archivo, ventas_fifo_bloque, rutas["ventas"], (["VRTU"],), [ESQUEMA_VENTAS_FIFO], False, True)]
+    return ejecucion.ejecutar(trabajos)
+
+
+if __name__ == "__main__":
+    trabajadores = int(sys.argv[1]) if len(sys.argv) > 1 else ejecucion.TRABAJADORES
+    filas = int(sys.argv[2]) if len(sys.argv) > 2 else 120_000
+    verificar_reconciliacion()
+    with tempfile.TemporaryDirectory() as carpeta:
+        rutas = {n: os.path.join(carpeta, f"{n}.xlsx") for n in ("compras", "traspasos", "ventas")}
+        escribir_libro(rutas["compras"], generar_compras(filas, hojas=8))
+        escribir_libro(rutas["traspasos"], generar_traspasos(filas // 2, hojas=4))
+        escribir_libro(rutas["ventas"], generar_ventas(filas // 2, hojas=4))
+
+        ejecucion.TRABAJADORES = 1
+        sec_libro, t_sec_libro = medir(libro_completo, rutas["compras"])
+        sec_archivos, t_sec_archivos = medir(seis_archivos, rutas)
+        ejecucion.TRABAJADORES = trabajadores
+        list(ejecucion.obtener_pool().map(time.sleep, [0.2] * trabajadores))  # arranque de los procesos fuera de la medición
+        par_libro, t_par_libro = medir(libro_completo, rutas["compras"])
+        par_archivos, t_par_archivos = medir(seis_archivos, rutas)
+
+        comparar(par_libro, sec_libro)
+        for a, b in zip(par_archivos, sec_archivos): comparar(a, b)
+        print(f"Pool == secuencial OK ({trabajadores} procesos, {os.cpu_count()} núcleos)")
+        print(f"libro de 8 hojas ({filas} filas): secuencial {t_sec_libro:.2f}s, pool {t_par_libro:.2f}s")
+        print(f"6 archivos: secuencial {t_sec_archivos:.2f}s, pool {t_par_archivos:.2f}s")
@@ -0,0 +1,117 @@
+"""
+Catálogo de partes: groupby / merge sobre el NP o ID PART como texto vs sobre códigos int32 del catálogo de la corrida.
+
+Uso: python benchmarks/bench_partes.py [partes meses ventas]   (por defecto 20000 partes x 24 meses, 500000 ventas)
+1. 12345, 12345.0, "12345" y " 12345 " dan el mismo código; los nulos quedan en -1 y el catálogo sale ordenado.
+2. Con partes ya limpias (texto), los reportes FIFO (General, Mensual, Remanentes) y el cruce de la Fase 5
+   salen idénticos al camino sobre texto; con NP mezclados el cruce sobre texto pierde partes que el catálogo une.
+3. Tiempos de cada camino, con la codificación incluida.
+"""
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(__file__))
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+from bench_cruce_drive import generar_cruce  # noqa: E402
+from bench_reporte_mensual import escenario, reporte_general  # noqa: E402
+from catalogo_partes import codificar_partes, codificar_tablas, con_texto  # noqa: E402
+from cruce_drive import calcular_drive_no_vendido, cruzar_bases  # noqa: E402
+from reportes_fifo import generar_df_remanentes, generar_reportes_mensuales  # noqa: E402
+
+
+# --- REFERENCIA: FASE 5 SOBRE EL NP CRUDO ---
+def cruzar_bases_texto(df_compras, df_traspasos, df_ventas, df_drive):
+    agg_com = df_compras.groupby(['AGENCIA', 'NP'], observed=True).agg({'CANTIDAD': 'sum', 'DESCRIPCION': 'first', 'FECHA': 'max'}).reset_index().rename(columns={'CANTIDAD': 'COMPRADO', 'FECHA': 'ULT_COMPRA'})
+    agg_tra = df_traspasos.groupby(['AGENCIA', 'NP'], observed=True).agg({'CANTIDAD': 'sum'}).reset_index().rename(columns={'CANTIDAD': 'TRASPASADO'})
+    agg_ven = df_ventas.groupby(['AGENCIA', 'NP'], observed=True).agg({'CANTIDAD': 'sum', 'FECHA': 'max'}).reset_index().rename(columns={'CANTIDAD': 'VENDIDO', 'FECHA': 'ULT_VENTA'})
+    hoja_gral = pd.merge(agg_com, agg_tra, on=['AGENCIA', 'NP'], how='left')
+    hoja_gral = pd.merge(hoja_gral, agg_ven, on=['AGENCIA', 'NP'], how='left').fillna(0)
+    hoja_gral['ULT_COMPRA'] = hoja_gral['ULT_COMPRA'].dt.strftime('%d/%m/%Y').replace('NaT', 'Sin Fecha')
+    hoja_gral['ULT_VENTA'] = pd.to_datetime(hoja_gral['ULT_VENTA']).dt.strftime('%d/%m/%Y').replace('NaT', 'Sin Venta')
+    hoja_gral = hoja_gral[['AGENCIA', 'NP', 'DESCRIPCION', 'COMPRADO', 'TRASPASADO', 'VENDIDO', 'ULT_COMPRA', 'ULT_VENTA']]
+    return hoja_gral, calcular_drive_no_vendido(df_drive, df_ventas)
+
+
+# --- REPORTES FIFO CON EL CATÁLOGO (COMO EN reportes_fifo) ---
+def fifo_texto(cc, ct, tc, tt, vc, vt, vm, alm_cua, alm_tul):
+    general = reporte_general(cc, ct, tc, tt, vc, vt, vm, alm_cua, alm_tul)
+    mensual = list(generar_reportes_mensuales(cc, ct, tc, tt, vc, vt, vm, alm_cua, alm_tul))
+    remanentes = [generar_df_remanentes(cc, vc, tc, vm, alm_cua), generar_df_remanentes(ct, vt, tt, vm, alm_tul)]
+    return general, mensual, remanentes
+
+
+def fifo_codigos(cc, ct, tc, tt, vc, vt, vm, alm_cua, alm_tul):
+    catalogo, fuentes = codificar_tablas([cc, ct, tc, tt, vc, vt, vm], 'ID PART')
+    cc, ct, tc, tt, vc, vt, vm = fuentes
+    general = [con_texto(df, 'ID PART', catalogo) for df in reporte_general(*fuentes, alm_cua, alm_tul)]
+    mensual = [(h, con_texto(df, 'ID PART', catalogo)) for h, df in generar_reportes_mensuales(*fuentes, alm_cua, alm_tul)]
+    remanentes = [con_texto(generar_df_remanentes(cc, vc, tc, vm, alm_cua), 'ID PART', catalogo),
+                  con_texto(generar_df_remanentes(ct, vt, tt, vm, alm_tul), 'ID PART', catalogo)]
+    return general, mensual, remanentes
+
+
+# --- DATOS SINTÉTICOS DE LA FASE 5 ---
+def bases_cruce(n_ventas, n_partes, semilla=0):
+    """Compras y traspasos de BPro (ya en columnas_cruce) junto a las solicitudes y ventas de bench_cruce_drive."""
+    df_drive, df_ventas = generar_cruce(max(n_ventas // 100, 10), n_ventas, n_partes, semilla)
+    rng = np.random.default_rng(semilla)
+    agencias = pd.Categorical(['CUAUTITLAN', 'TULTITLAN'])
+
+    def movimientos(m):
+        return pd.DataFrame({'AGENCIA': agencias[rng.integers(0, 2, m)], 'NP': [f"NP{i}" for i in rng.integers(0, n_partes, m)],
+                             'CANTIDAD': rng.integers(1, 10, m).astype(float), 'DESCRIPCION': 'PIEZA',
+                             'FECHA': pd.Timestamp('2025-06-01') + pd.to_timedelta(rng.integers(0, 300, m), unit='D')})
+    return movimientos(n_ventas // 4), movimientos(n_ventas // 10).drop(columns=['DESCRIPCION', 'FECHA']), df_ventas, df_drive
+
+
+def mezclar_np(df, semilla):
+    """El mismo NP numérico como lo deja cada fuente: int, float o texto con espacios."""
+    rng = np.random.default_rng(semilla)
+    numero = df['NP'].str[2:].astype(int).to_numpy()
+    forma = rng.integers(0, 4, len(df))
+    return df.assign(NP=[n if f == 0 else float(n) if f == 1 else str(n) if f == 2 else f" {n} " for n, f in zip(numero, forma)])
+
+
+def verificar():
+    catalogo, (codigos, otros) = codificar_partes([pd.Series([12345, 12345.0, "12345", " 12345 ", None, "B-7", np.nan], dtype=object), pd.Series(["A1", "B-7", ""])])
+    assert list(catalogo) == ["12345", "A1", "B-7"], list(catalogo)
+    assert codigos.tolist() == [0, 0, 0, 0, -1, 2, -1] and otros.tolist() == [1, 2, -1] and codigos.dtype == np.int32
+
+    for semilla in range(3):
+        texto, codigos = fifo_texto(*escenario(300, 6, semilla)), fifo_codigos(*escenario(300, 6, semilla))
+        for a, b in zip(texto[0] + [df for _, df in texto[1]] + texto[2], codigos[0] + [df for _, df in codigos[1]] + codigos[2]):
+            pd.testing.assert_frame_equal(b, a)
+        assert [h for h, _ in texto[1]] == [h for h, _ in codigos[1]]
+
+        bases = bases_cruce(20_000, 300, semilla)
+        for a, b in zip(cruzar_bases_texto(*bases), cruzar_bases(*bases)): pd.testing.assert_frame_equal(b, a)
+    print("Reportes FIFO y cruce de la Fase 5 idénticos sobre texto y sobre códigos OK")
+
+    mezcladas = [mezclar_np(df, i) for i, df in enumerate(bases)]
+    limpio, _ = cruzar_bases_texto(*bases)
+    crudo, _ = cruzar_bases_texto(*mezcladas)
+    unido, _ = cruzar_bases(*mezcladas)
+    assert len(unido) == len(limpio) and (unido['VENDIDO'].to_numpy() == limpio['VENDIDO'].to_numpy()).all()
+    print(f"NP mezclados: sobre texto {len(crudo)} filas en General (vs {len(limpio)}), VENDIDO {crudo['VENDIDO'].sum():.0f} "
+          f"(vs {limpio['VENDIDO'].sum():.0f}); con catálogo {len(unido)} filas y VENDIDO {unido['VENDIDO'].sum():.0f}")
+
+
+def medir(fn, *args):
+    inicio = time.perf_counter()
+    fn(*args)
+    return time.perf_counter() - inicio
+
+
+if __name__ == "__main__":
+    partes, meses, ventas = (int(sys.argv[1]), int(sys.argv[2]), int(sys.argv[3])) if len(sys.argv) > 3 else (20_000, 24, 500_000)
+    verificar()
+    args = escenario(partes, meses)
+    print(f"FIFO ({partes} partes x {meses} meses): texto {medir(fifo_texto, *args):.2f}s, códigos {medir(fifo_codigos, *args):.2f}s")
+    bases = bases_cruce(ventas, partes)
+    print(f"Fase 5 ({ventas} ventas): texto {medir(cruzar_bases_texto, *bases):.2f}s, códigos {medir(cruzar_bases, *bases):.2f}s")
+    mezcladas = [mezclar_np(df, i) for i, df in enumerate(bases)]
+    print(f"Fase 5 con NP mezclados: texto {medir(cruzar_bases_texto, *mezcladas):.2f}s, códigos {medir(cruzar_bases, *mezcladas):.2f}s")
@@ -0,0 +1,31 @@
+"""
+Benchmark de generar_df_remanentes (Compras sin Venta Exitosa): bucle FIFO por registros vs cumsum agrupado.
+
+Uso: python benchmarks/bench_remanentes.py [partes meses]   (por defecto 5000 partes x 24 meses)
+Mide el volumen base y 10x / 100x ese volumen. La propiedad (cientos de historias aleatorias con devoluciones,
+partes sin salidas y almacenes con cada acción dan lo mismo que el bucle original) vive en tests/test_remanentes.py;
+el bucle original y el generador de historias, en tests/referencias.py.
+"""
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "tests"))
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+from referencias import generar_df_remanentes_bucle, generar_historia  # noqa: E402
+from reportes_fifo import generar_df_remanentes  # noqa: E402
+
+
+def medir(fn, *args):
+    inicio = time.perf_counter()
+    fn(*args)
+    return time.perf_counter() - inicio
+
+
+if __name__ == "__main__":
+    partes, meses = (int(sys.argv[1]), int(sys.argv[2])) if len(sys.argv) > 2 else (5_000, 24)
+    print(f"{'escala':>8} {'filas compra':>14} {'bucle (s)':>10} {'cumsum (s)':>11}")
+    for escala in (1, 10, 100):
+        args = generar_historia(partes * escala, meses)
+        t_bucle = medir(generar_df_remanentes_bucle, *args) if escala < 100 else float("nan")
+        print(f"{escala:>7}x {len(args[0]):>14} {t_bucle:>10.2f} {medir(generar_df_remanentes, *args):>11.2f}")
@@ -0,0 +1,105 @@
+"""
+Escritura de los reportes FIFO (General / Mensual / Remanentes): escribir_excel original (MultiIndex + to_excel)
+vs exportar.libro_reportes (encabezado de dos niveles con merge_range + write_row en constant_memory).
+
+Uso: python benchmarks/bench_reporte_excel.py [partes meses]   (por defecto 5000 partes x 24 meses)
+1. Mismas hojas, mismos datos celda por celda y el mismo par (almacén, dato) en cada columna.
+2. Tiempos: solo escritura (hojas ya calculadas) y cálculo + escritura del Reporte Mensual completo,
+   con el cálculo de la hoja siguiente en un hilo mientras se escribe la actual.
+"""
+import ast
+import io
+import os
+import sys
+import time
+
+import openpyxl
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(__file__))
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+from bench_reporte_mensual import escenario  # noqa: E402
+from exportar import libro_reportes  # noqa: E402
+from reportes_fifo import es_dataframe_valido, generar_reportes_mensuales, hoja_reporte  # noqa: E402
+
+
+# --- REFERENCIA: ESCRITURA ORIGINAL ---
+def escribir_excel(writer, df, hoja):
+    if not es_dataframe_valido(df): return
+    base = ['ID PART', 'DESCRIPTION', 'PRODUCT LINE', 'TOTAL COMPRADO', 'CANTIDAD COMPRADA', 'CANTIDAD VENDIDA', 'TOTAL TRASPASOS', 'TOTAL VENDIDO', 'Fecha Ult. Comp.']
+    for c in base:
+        if c not in df.columns: df[c] = 0
+    gral = sorted([c for c in df.columns if 'ALMACEN GENERAL' in c])
+    otros = sorted([c for c in df.columns if c not in base and c not in gral])
+    df = df.reindex(columns=base + gral + otros, fill_value=0)
+    df_main = df[base]
+    df_rest = df.drop(columns=base)
+    cols = []
+    if not df_rest.empty:
+        for c in df_rest.columns:
+            p = c.split('_')
+            cols.append(('_'.join(p[:-1]), p[-1]) if len(p) >= 2 else (c, ''))
+        df_rest.columns = pd.MultiIndex.from_tuples(cols)
+        pd.concat([df_main, df_rest], axis=1).to_excel(writer, sheet_name=hoja, index=False)
+    else: df_main.to_excel(writer, sheet_name=hoja, index=False)
+
+
+def libro_original(hojas):
+    out = io.BytesIO()
+    with pd.ExcelWriter(out, engine='xlsxwriter') as w:
+        for hoja, df in hojas: escribir_excel(w, df.copy(), hoja)
+    return out.getvalue()
+
+
+# --- COMPARACIÓN CELDA POR CELDA ---
+def encabezados_original(ws):
+    """El original escribe el par como texto "('almacén', 'dato')"; las columnas base como su nombre."""
+    return [ast.literal_eval(c.value) if str(c.value).startswith("(") else (c.value, '') for c in ws[1]]
+
+
+def encabezados_nuevo(ws):
+    """Sin celdas combinadas la hoja tiene una sola fila de encabezado (no hay columnas por almacén)."""
+    arriba = [c.value for c in ws[1]]
+    if not ws.merged_cells.ranges: return [(a, '') for a in arriba], 1
+    for rango in ws.merged_cells.ranges:
+        for j in range(rango.min_col, rango.max_col + 1): arriba[j - 1] = arriba[rango.min_col - 1]
+    return [(a, c.value or '') for a, c in zip(arriba, ws[2])], 2
+
+
+def comparar(nuevo, viejo):
+    a, b = openpyxl.load_workbook(nuevo), openpyxl.load_workbook(io.BytesIO(viejo))
+    assert a.sheetnames == b.sheetnames, (a.sheetnames, b.sheetnames)
+    for hoja in a.sheetnames:
+        wa, wb = a[hoja], b[hoja]
+        encabezado, filas_enc = encabezados_nuevo(wa)
+        assert encabezado == encabezados_original(wb), hoja
+        datos_a = list(wa.iter_rows(min_row=filas_enc + 1, values_only=True))
+        datos_b = list(wb.iter_rows(min_row=2, values_only=True))
+        assert datos_a == datos_b, hoja
+
+
+def medir(fn, *args):
+    inicio = time.perf_counter()
+    res = fn(*args)
+    return res, time.perf_counter() - inicio
+
+
+if __name__ == "__main__":
+    partes, meses = (int(sys.argv[1]), int(sys.argv[2])) if len(sys.argv) > 2 else (5_000, 24)
+    for semilla in range(2):
+        hojas = list(generar_reportes_mensuales(*escenario(300, 6, semilla)))
+        ruta = libro_reportes(hoja_reporte(h, df) for h, df in hojas)
+        comparar(ruta, libro_original(hojas))
+        os.remove(ruta)
+    print("Mismas hojas, encabezados y celdas que escribir_excel OK")
+
+    datos = escenario(partes, meses)
+    hojas, t_calculo = medir(lambda: list(generar_reportes_mensuales(*datos)))
+    _, t_viejo = medir(libro_original, hojas)
+    ruta, t_nuevo = medir(libro_reportes, [hoja_reporte(h, df) for h, df in hojas], False)
+    os.remove(ruta)
+    ruta, t_hilo = medir(lambda: libro_reportes(hoja_reporte(h, df) for h, df in generar_reportes_mensuales(*datos)))
+    os.remove(ruta)
+    print(f"{len(hojas)} hojas ({partes} partes x {meses} meses), cálculo {t_calculo:.2f}s")
+    print(f"solo escritura: to_excel {t_viejo:.2f}s, libro_reportes {t_nuevo:.2f}s")
+    print(f"cálculo + escritura: secuencial original {t_calculo + t_viejo:.2f}s, con hilo productor {t_hilo:.2f}s")
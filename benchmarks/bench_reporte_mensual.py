@@ -0,0 +1,70 @@
+"""
+Benchmark del Reporte Mensual: filtro por mes + agregación por mes vs agregación única por (Periodo, ID PART).
+
+Uso: python benchmarks/bench_reporte_mensual.py [partes meses]   (por defecto 5000 partes x 24 meses)
+Verifica que ambos caminos generen las mismas hojas y compara contra un Reporte General.
+"""
+import os
+import sys
+import time
+
+import pandas as pd
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "tests"))
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+from referencias import generar_historia  # noqa: E402
+from reportes_fifo import (agregar_compras, agregar_datos_simples, agregar_dict_datos, es_dataframe_valido,  # noqa: E402
+                          generar_reporte_agencia, generar_reportes_mensuales, nombre_mes)
+
+
+# --- REFERENCIA: BUCLE ORIGINAL (FILTRA CADA MES) ---
+def reportes_mensuales_por_filtro(cc_raw, ct_raw, tc_raw, tt_raw, vc_raw, vt_raw, vm_raw, alm_cua, alm_tul):
+    dates = []
+    if es_dataframe_valido(cc_raw): dates.append(cc_raw['Fecha'])
+    if es_dataframe_valido(ct_raw): dates.append(ct_raw['Fecha'])
+    for d in tc_raw.values(): dates.append(d['Fecha'])
+    for p in sorted(pd.concat(dates).dt.to_period('M').unique()):
+        name = nombre_mes(p)
+        cc = cc_raw[cc_raw['Fecha'].dt.to_period('M') == p] if es_dataframe_valido(cc_raw) else pd.DataFrame()
+        ct = ct_raw[ct_raw['Fecha'].dt.to_period('M') == p] if es_dataframe_valido(ct_raw) else pd.DataFrame()
+        tc = {k: v[v['Fecha'].dt.to_period('M') == p] for k, v in tc_raw.items()}
+        tt = {k: v[v['Fecha'].dt.to_period('M') == p] for k, v in tt_raw.items()}
+        vc = vc_raw[vc_raw['Fecha'].dt.to_period('M') == p] if es_dataframe_valido(vc_raw) else pd.DataFrame()
+        vt = vt_raw[vt_raw['Fecha'].dt.to_period('M') == p] if es_dataframe_valido(vt_raw) else pd.DataFrame()
+        vm = {k: v[v['Fecha'].dt.to_period('M') == p] for k, v in vm_raw.items()}
+        yield f"Cuautitlan_{name}", generar_reporte_agencia(agregar_compras(cc), agregar_dict_datos(tc, 'Cantidad Traspasada'), alm_cua, agregar_datos_simples(vc, 'Cantidad Vendida', 'Total Vendido'), agregar_dict_datos(vm, 'Cantidad Vendida', 'Total Vendido'))
+        yield f"Tultitlan_{name}", generar_reporte_agencia(agregar_compras(ct), agregar_dict_datos(tt, 'Cantidad Traspasada'), alm_tul, agregar_datos_simples(vt, 'Cantidad Vendida', 'Total Vendido'), agregar_dict_datos(vm, 'Cantidad Vendida', 'Total Vendido'))
+
+
+def reporte_general(cc_raw, ct_raw, tc_raw, tt_raw, vc_raw, vt_raw, vm_raw, alm_cua, alm_tul):
+    v_m = agregar_dict_datos(vm_raw, 'Cantidad Vendida', 'Total Vendido')
+    return [generar_reporte_agencia(agregar_compras(cc_raw), agregar_dict_datos(tc_raw, 'Cantidad Traspasada'), alm_cua, agregar_datos_simples(vc_raw, 'Cantidad Vendida', 'Total Vendido'), v_m),
+            generar_reporte_agencia(agregar_compras(ct_raw), agregar_dict_datos(tt_raw, 'Cantidad Traspasada'), alm_tul, agregar_datos_simples(vt_raw, 'Cantidad Vendida', 'Total Vendido'), v_m)]
+
+
+def escenario(partes, meses, semilla=0):
+    """Dos agencias con el mismo layout de historia y ventas manuales compartidas."""
+    cc, vc, tc, vm, alm_cua = generar_historia(partes, meses, semilla)
+    ct, vt, tt, _, alm_tul = generar_historia(partes, meses, semilla + 1)
+    return cc, ct, tc, tt, vc, vt, vm, alm_cua, alm_tul
+
+
+def medir(fn, *args):
+    inicio = time.perf_counter()
+    res = list(fn(*args))
+    return res, time.perf_counter() - inicio
+
+
+if __name__ == "__main__":
+    partes, meses = (int(sys.argv[1]), int(sys.argv[2])) if len(sys.argv) > 2 else (5_000, 24)
+    for semilla in range(3):
+        args = escenario(200, 6, semilla)
+        nuevo, viejo = list(generar_reportes_mensuales(*args)), list(reportes_mensuales_por_filtro(*args))
+        assert [h for h, _ in nuevo] == [h for h, _ in viejo]
+        for (_, a), (_, b) in zip(nuevo, viejo): pd.testing.assert_frame_equal(a, b)
+    print("Equivalencia OK")
+    args = escenario(partes, meses)
+    _, t_viejo = medir(reportes_mensuales_por_filtro, *args)
+    _, t_nuevo = medir(generar_reportes_mensuales, *args)
+    _, t_general = medir(reporte_general, *args)
+    print(f"{meses} meses: filtro por mes {t_viejo:.2f}s, una pasada {t_nuevo:.2f}s, reporte general {t_general:.2f}s")
@@ -0,0 +1,106 @@
+"""
+Modo streaming de los parsers: libro completo vs bloques de N filas leídos con openpyxl read-only.
+
+Uso: python benchmarks/bench_streaming.py [filas]   (por defecto 300000 filas de compras)
+1. Los parsers columnares de compras/ventas FIFO dan lo mismo que los bucles originales de limpiador_01.
+2. Cada parser da lo mismo leyendo el libro completo que en bloques chicos (el contexto cruza bloques y hojas).
+3. Pico de memoria (tracemalloc) de lectura + parseo completo vs streaming sobre un .xlsx grande.
+"""
+import os
+import re
+import sys
+import tempfile
+import time
+import tracemalloc
+
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(__file__))
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+from generador_bpro import escribir_libro, generar_compras, generar_traspasos, generar_ventas  # noqa: E402
+from lector_excel import iterar_bloques, leer_hojas  # noqa: E402
+from parsers_bpro import (ESQUEMA_COMPRAS_FIFO, ESQUEMA_VENTAS_FIFO, parsear_compras_bpro, parsear_compras_fifo,  # noqa: E402
+                          parsear_traspasos_bpro, parsear_ventas_fifo, tipar)
+
+
+# --- REFERENCIA: BUCLES ORIGINALES DE limpiador_01 ---
+def procesar_compras_bucle(hojas, nomenclatura):
+    compras_list = []
+    for df in hojas.values():
+        fecha_actual = pd.NaT
+        for row in df.itertuples(index=False, name=None):
+            celda_a = str(row[0] or '').strip().upper()
+            celda_c = str(row[2] or '').strip()
+            if "FACTURA:" in celda_a:
+                match = re.search(r'(\d{2}/\d{2}/\d{4})', celda_c)
+                if match: fecha_actual = pd.to_datetime(match.group(1), format='%d/%m/%Y', errors='coerce')
+                continue
+            if nomenclatura in celda_a:
+                id_part, cantidad, total = row[2], pd.to_numeric(row[4], errors='coerce'), pd.to_numeric(row[7], errors='coerce')
+                if pd.notna(id_part) and id_part != 0 and pd.notna(cantidad) and pd.notna(fecha_actual):
+                    compras_list.append({'ID PART': id_part, 'DESCRIPTION': row[3], 'PRODUCT LINE': row[11], 'CANTIDAD COMPRADA': cantidad, 'TOTAL COMPRADO': total, 'Fecha': fecha_actual})
+    return pd.DataFrame(compras_list).dropna(subset=['Fecha']) if compras_list else pd.DataFrame()
+
+
+def procesar_ventas_bucle(hojas, nomenclaturas):
+    ventas_list = []
+    for df in hojas.values():
+        fecha_actual = pd.NaT
+        for row in df.itertuples(index=False, name=None):
+            celda_a = str(row[0] or '').strip().upper()
+            celda_e = str(row[4] or '').strip()
+            if "FACTURA/REFERENCIA:" in celda_a:
+                match = re.search(r'(\d{2}/\d{2}/\d{4})', celda_e)
+                if match: fecha_actual = pd.to_datetime(match.group(1), format='%d/%m/%Y', errors='coerce')
+                continue
+            if any(nom in celda_a for nom in nomenclaturas):
+                id_part, cantidad, total = row[2], pd.to_numeric(row[4], errors='coerce'), pd.to_numeric(row[6], errors='coerce')
+                if pd.notna(id_part) and id_part != 0 and pd.notna(cantidad) and pd.notna(fecha_actual):
+                    ventas_list.append({'ID PART': id_part, 'Cantidad Vendida': cantidad, 'Total Vendido': total, 'Fecha': fecha_actual})
+    return pd.DataFrame(ventas_list).dropna(subset=['Fecha']) if ventas_list else pd.DataFrame()
+
+
+def comparar(a, b):
+    if isinstance(a, tuple):
+        for x, y in zip(a, b): pd.testing.assert_frame_equal(x, y)
+    else: pd.testing.assert_frame_equal(a, b)
+
+
+def pico_mb(fn, *args):
+    tracemalloc.start()
+    inicio = time.perf_counter()
+    fn(*args)
+    t = time.perf_counter() - inicio
+    pico = tracemalloc.get_traced_memory()[1] / 2**20
+    tracemalloc.stop()
+    return pico, t
+
+
+if __name__ == "__main__":
+    filas = int(sys.argv[1]) if len(sys.argv) > 1 else 300_000
+    for semilla in range(3):
+        hojas = generar_compras(4_000, semilla=semilla)
+        pd.testing.assert_frame_equal(parsear_compras_fifo(hojas, "CRCU").drop(columns="FACTURA"), tipar(procesar_compras_bucle(hojas, "CRCU"), ESQUEMA_COMPRAS_FIFO))
+        hojas = generar_ventas(4_000, semilla=semilla)
+        pd.testing.assert_frame_equal(parsear_ventas_fifo(hojas, ["VRCU", "VRTU"]).drop(columns="REFERENCIA"), tipar(procesar_ventas_bucle(hojas, ["VRCU", "VRTU"]), ESQUEMA_VENTAS_FIFO))
+    print("Equivalencia con los bucles de limpiador_01 OK")
+
+    casos = [("compras", generar_compras, lambda h: parsear_compras_bpro(h, "CUAUTITLAN")),
+             ("traspasos", generar_traspasos, lambda h: parsear_traspasos_bpro(h, "CUAUTITLAN")),
+             ("compras FIFO", generar_compras, lambda h: parsear_compras_fifo(h, "CRCU")),
+             ("ventas FIFO", generar_ventas, lambda h: parsear_ventas_fifo(h, ["VRCU", "VRTU"]))]
+    with tempfile.TemporaryDirectory() as carpeta:
+        ruta = os.path.join(carpeta, "libro.xlsx")
+        for nombre, generar, parser in casos:
+            escribir_libro(ruta, generar(6_000))
+            completo = parser(leer_hojas(ruta, motor="openpyxl"))
+            for filas_bloque in (1, 997, 50_000): comparar(parser(iterar_bloques(ruta, filas_bloque)), completo)
+        print("Streaming == libro completo OK (bloques de 1, 997 y 50000 filas)")
+
+        escribir_libro(ruta, generar_compras(filas))
+        print(f"{filas} filas, {os.path.getsize(ruta) / 2**20:.1f} MB")
+        pico, t = pico_mb(lambda: parsear_compras_bpro(leer_hojas(ruta, motor="openpyxl"), "CUAUTITLAN"))
+        print(f"libro completo: pico {pico:.0f} MB ({t:.1f}s con tracemalloc)")
+        for filas_bloque in (5_000, 20_000):
+            pico, t = pico_mb(lambda: parsear_compras_bpro(iterar_bloques(ruta, filas_bloque), "CUAUTITLAN"))
+            print(f"streaming {filas_bloque:>6} filas/bloque: pico {pico:.0f} MB ({t:.1f}s con tracemalloc)")
@@ -0,0 +1,216 @@
+"""
+Suite reproducible: cada parser y cada etapa de agregación sobre un escenario sintético de generador_bpro, con
+tiempo (mediana de N corridas) y pico de memoria de Python (tracemalloc, en una corrida aparte). El resultado
+se guarda como JSON para comparar entre commits.
+
+Uso: python benchmarks/bench_suite.py [--filas 50000] [--semilla 0] [--repeticiones 3] [--jobs 1]
+                                      [--salida resultados.json] [--comparar base.json] [--tolerancia 0.25]
+                                      [--datos carpeta] [--etapas texto]
+1. Los parsers dan lo mismo con y sin la basura de página (subtotales, encabezados repetidos, renglones vacíos)
+   y el generador es determinista.
+2. Una tabla por etapa; con --comparar, la razón contra la corrida base y código de salida 1 si alguna etapa es
+   más lenta que base x (1 + tolerancia) o cambió el número de filas.
+Los parsers se llaman sin la caché de parseo (__wrapped__) y con --jobs procesos (1 por omisión: sin ruido del pool).
+"""
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+import warnings
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(__file__))
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+import cruce_drive  # noqa: E402
+import ejecucion  # noqa: E402
+import reportes_fifo  # noqa: E402
+import unificacion  # noqa: E402
+from generador_bpro import (NOMENCLATURAS_ITEMS, con_basura, escenario_bpro, generar_compras, generar_traspasos,  # noqa: E402
+                            generar_traspasos_resumen, generar_ventas)
+from parsers_bpro import (parsear_compras_bpro, parsear_compras_fifo, parsear_traspasos_bpro,  # noqa: E402
+                          parsear_traspasos_por_destino, parsear_ventas_fifo)
+from ventas_master import parsear_ventas  # noqa: E402
+
+RAIZ = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+NOM = reportes_fifo.NOMENCLATURAS
+
+
+# --- VERIFICACIÓN ---
+def iguales(a, b):
+    if isinstance(a, tuple):
+        for x, y in zip(a, b): iguales(x, y)
+    elif isinstance(a, dict):
+        assert list(a) == list(b)
+        for k in a: iguales(a[k], b[k])
+    # Los rechazados guardan la celda cruda: su dtype depende de lo que traiga la columna, los valores no
+    else: pd.testing.assert_frame_equal(a.astype(object), b.astype(object))
+
+
+def verificar():
+    tu = NOMENCLATURAS_ITEMS["TULTITLAN"]
+    casos = [(generar_compras(4_000, semilla=1), lambda h: parsear_compras_bpro(h, "CUAUTITLAN")),
+             (generar_compras(4_000, semilla=2, prefijo="CRTU"), lambda h: parsear_compras_fifo(h, NOM["TULTITLAN"]["compras"])),
+             (generar_traspasos(4_000, semilla=3, items=tu["traspasos"]), lambda h: parsear_traspasos_bpro(h, "TULTITLAN")),
+             (generar_traspasos_resumen(4_000, semilla=4), lambda h: parsear_traspasos_por_destino(h, NOM["CUAUTITLAN"]["traspasos"])),
+             (generar_ventas(4_000, semilla=5), lambda h: parsear_ventas_fifo(h, NOM["TULTITLAN"]["ventas"]))]
+    for hojas, parser in casos:
+        limpio = parser(hojas)
+        for semilla in (8, 9): iguales(limpio, parser(con_basura(hojas, 0.05, semilla=semilla)))
+    iguales(generar_ventas(2_000, semilla=7), generar_ventas(2_000, semilla=7))
+    print("Mismos ítems con y sin basura de página (compras, traspasos en los dos layouts, ventas) y generador determinista OK")
+
+
+# --- ETAPAS ---
+def parseadas(rutas):
+    """Bases crudas de las dos agencias (sin medir): la entrada de las etapas de agregación."""
+    fifo = {}
+    for agencia, s in (("CUAUTITLAN", "cu"), ("TULTITLAN", "tu")):
+        fifo[f"compras_{s}"] = reportes_fifo.procesar_compras.__wrapped__(rutas[f"compras_{s}"], NOM[agencia]["compras"])
+        fifo[f"traspasos_{s}"] = reportes_fifo.parsear_traspasos_detallado.__wrapped__(rutas[f"traspasos_fifo_{s}"], NOM[agencia]["traspasos"])[0]
+        fifo[f"ventas_{s}"] = reportes_fifo.procesar_archivo_venta_individual.__wrapped__(rutas[f"ventas_{s}"], NOM[agencia]["ventas"])
+    fifo["ventas_manuales"] = {os.path.basename(k): reportes_fifo.procesar_archivo_venta_individual.__wrapped__(r, reportes_fifo.NOMENCLATURAS_MANUALES)
+                               for k, r in rutas.items() if k.startswith("manuales")}
+    fuentes = [fifo[n] for n in ("compras_cu", "compras_tu", "traspasos_cu", "traspasos_tu", "ventas_cu", "ventas_tu", "ventas_manuales")]
+    almacenes = [reportes_fifo.tabla_almacenes(fifo[f"traspasos_{s}"], {"ALMACEN VENTAS MOSTRADOR": "No Considerar"}) for s in ("cu", "tu")]
+
+    compras = {a: cruce_drive.procesar_compras.__wrapped__(rutas[f"compras_{s}"], a) for a, s in (("CUAUTITLAN", "cu"), ("TULTITLAN", "tu"))}
+    traspasos = [cruce_drive.procesar_traspasos.__wrapped__(rutas[f"traspasos_{s}"], a)[0] for a, s in (("CUAUTITLAN", "cu"), ("TULTITLAN", "tu"))]
+    drive = {a: cruce_drive.procesar_drive(rutas[f"drive_{s}"], a) for a, s in (("CUAUTITLAN", "cu"), ("TULTITLAN", "tu"))}
+    cruce = (cruce_drive.base_compras(compras), cruce_drive.base_traspasos(traspasos), parsear_ventas(rutas["ventas_master"], True, 2026),
+             cruce_drive.base_drive(drive, 2026))
+    return fuentes, almacenes, cruce
+
+
+def etapas(rutas):
+    """{nombre: (fn, args)}; las de agregación reciben las bases ya parseadas."""
+    fuentes, (alm_cua, alm_tul), cruce = parseadas(rutas)
+    _, codificadas = reportes_fifo.fuentes_codificadas(fuentes)
+    cc, ct, tc, tt, vc, vt, vm = codificadas
+
+    def reporte_agencia():
+        return reportes_fifo.generar_reporte_agencia(reportes_fifo.agregar_compras(cc), reportes_fifo.agregar_dict_datos(tc, 'Cantidad Traspasada'), alm_cua,
+                                                     reportes_fifo.agregar_datos_simples(vc, 'Cantidad Vendida', 'Total Vendido'),
+                                                     reportes_fifo.agregar_dict_datos(vm, 'Cantidad Vendida', 'Total Vendido'))
+    return {
+        "unificacion.procesar_compras": (unificacion.procesar_compras.__wrapped__, (rutas["compras_cu"], "CUAUTITLAN")),
+        "unificacion.procesar_traspasos": (unificacion.procesar_traspasos.__wrapped__, (rutas["traspasos_cu"], "CUAUTITLAN")),
+        "reportes_fifo.procesar_compras": (reportes_fifo.procesar_compras.__wrapped__, (rutas["compras_cu"], NOM["CUAUTITLAN"]["compras"])),
+        "reportes_fifo.parsear_traspasos_detallado": (reportes_fifo.parsear_traspasos_detallado.__wrapped__, (rutas["traspasos_fifo_cu"], NOM["CUAUTITLAN"]["traspasos"])),
+        "reportes_fifo.procesar_archivo_venta_individual": (reportes_fifo.procesar_archivo_venta_individual.__wrapped__, (rutas["ventas_cu"], NOM["CUAUTITLAN"]["ventas"])),
+        "cruce_drive.procesar_drive": (cruce_drive.procesar_drive, (rutas["drive_cu"], "CUAUTITLAN")),
+        "ventas_master.parsear_ventas": (parsear_ventas, (rutas["ventas_master"], True, 2026)),
+        "reportes_fifo.fuentes_codificadas": (reportes_fifo.fuentes_codificadas, (fuentes,)),
+        "reportes_fifo.generar_reporte_agencia": (reporte_agencia, ()),
+        "reportes_fifo.generar_df_remanentes": (reportes_fifo.generar_df_remanentes, (cc, vc, tc, vm, alm_cua)),
+        "reportes_fifo.generar_reportes_mensuales": (lambda: list(reportes_fifo.generar_reportes_mensuales(*codificadas, alm_cua, alm_tul)), ()),
+        "reportes_fifo.reporte_general": (reportes_fifo.reporte_general, (fuentes, alm_cua, alm_tul)),
+        "cruce_drive.cruzar_bases": (cruce_drive.cruzar_bases, cruce),
+    }
+
+
+def filas(resultado):
+    if isinstance(resultado, pd.DataFrame): return len(resultado)
+    if isinstance(resultado, dict): return sum(filas(v) for v in resultado.values())
+    if isinstance(resultado, (tuple, list)): return sum(filas(v) for v in resultado)
+    return 0
+
+
+def tamano_y_borrar(resultado):
+    """Bytes del archivo que escribió la etapa (exportar devuelve su ruta), que se borra; None si no es un archivo."""
+    if not (isinstance(resultado, str) and os.path.isfile(resultado)): return None
+    tamano = os.path.getsize(resultado)
+    os.remove(resultado)
+    return tamano
+
+
+def medir(fn, args, repeticiones):
+    tiempos = []
+    for _ in range(repeticiones):
+        inicio = time.perf_counter()
+        resultado = fn(*args)
+        tiempos.append(time.perf_counter() - inicio)
+        tamano = tamano_y_borrar(resultado)
+    tracemalloc.start()
+    tamano_y_borrar(fn(*args))
+    pico = tracemalloc.get_traced_memory()[1] / 2**20
+    tracemalloc.stop()
+    r = {"s": round(statistics.median(tiempos), 4), "s_min": round(min(tiempos), 4), "pico_mb": round(pico, 1), "filas": filas(resultado)}
+    if tamano is not None: r["bytes"] = tamano
+    return r
+
+
+# --- RESULTADOS ---
+def commit():
+    try:
+        rev = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=RAIZ, capture_output=True, text=True, check=True).stdout.strip()
+        sucio = subprocess.run(["git", "status", "--porcelain", "--untracked-files=no"], cwd=RAIZ, capture_output=True, text=True).stdout.strip()
+        return rev + ("+cambios" if sucio else "")
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def comparar(actual, base, tolerancia):
+    """Imprime la razón contra la base; devuelve las etapas con regresión."""
+    print(f"\nContra {base.get('commit')} ({base.get('fecha')}):")
+    regresiones = []
+    for nombre, r in actual["etapas"].items():
+        b = base["etapas"].get(nombre)
+        if not b: continue
+        razon = r["s"] / b["s"] if b["s"] else float("inf")
+        marca = ""
+        if razon > 1 + tolerancia: marca = "  <-- más lenta"
+        if r["filas"] != b["filas"]: marca += f"  <-- filas {b['filas']} -> {r['filas']}"
+        if marca: regresiones.append(nombre)
+        print(f"{nombre:<48} {b['s']:>8.3f}s -> {r['s']:>8.3f}s  x{razon:5.2f}   pico {b['pico_mb']:>6.0f} -> {r['pico_mb']:>6.0f} MB{marca}")
+    return regresiones
+
+
+def argumentos():
+    p = argparse.ArgumentParser(description="Tiempo y pico de memoria de cada parser y etapa de agregación sobre datos sintéticos.")
+    p.add_argument("--filas", type=int, default=50_000, help="filas de cada export de compras; los demás son proporcionales")
+    p.add_argument("--semilla", type=int, default=0)
+    p.add_argument("--repeticiones", type=int, default=3)
+    p.add_argument("--jobs", type=int, default=1, help="procesos del pool de ejecucion")
+    p.add_argument("--salida", help="archivo JSON con los resultados")
+    p.add_argument("--comparar", help="JSON de una corrida anterior")
+    p.add_argument("--tolerancia", type=float, default=0.25, help="fracción de tiempo extra tolerada contra la base")
+    p.add_argument("--datos", help="carpeta para los archivos generados (se reutiliza si ya tiene el escenario)")
+    p.add_argument("--etapas", default="", help="solo las etapas cuyo nombre contenga este texto")
+    return p.parse_args()
+
+
+if __name__ == "__main__":
+    args = argumentos()
+    warnings.filterwarnings("ignore", category=UserWarning)  # fechas libres del Drive: pd.to_datetime avisa del formato adivinado
+    ejecucion.TRABAJADORES = args.jobs
+    verificar()
+
+    with tempfile.TemporaryDirectory() as temporal:
+        carpeta = args.datos or temporal
+        inicio = time.perf_counter()
+        rutas = escenario_bpro(carpeta, args.filas, args.semilla)
+        print(f"Escenario de {args.filas} filas por export en {time.perf_counter() - inicio:.1f}s "
+              f"({sum(os.path.getsize(r) for r in rutas.values()) / 2**20:.0f} MB en {len(rutas)} archivos)")
+        resultados = {"fecha": time.strftime("%Y-%m-%dT%H:%M:%S"), "commit": commit(), "python": platform.python_version(),
+                      "pandas": pd.__version__, "numpy": np.__version__, "plataforma": platform.platform(),
+                      "filas": args.filas, "semilla": args.semilla, "repeticiones": args.repeticiones, "trabajadores": args.jobs, "etapas": {}}
+        for nombre, (fn, fn_args) in etapas(rutas).items():
+            if args.etapas not in nombre: continue
+            r = resultados["etapas"][nombre] = medir(fn, fn_args, args.repeticiones)
+            tamano = f"{r['bytes'] / 2**10:>9.0f} KB" if "bytes" in r else f"{r['filas']:>9} filas"
+            print(f"{nombre:<48} {r['s']:>8.3f}s (min {r['s_min']:.3f}s)  pico {r['pico_mb']:>6.0f} MB  {tamano}")
+
+    if args.salida:
+        with open(args.salida, "w", encoding="utf-8") as f: json.dump(resultados, f, indent=2, ensure_ascii=False)
+        print(f"Resultados en {args.salida}")
+    if args.comparar:
+        with open(args.comparar, encoding="utf-8") as f: base = json.load(f)
+        if comparar(resultados, base, args.tolerancia): sys.exit(1)
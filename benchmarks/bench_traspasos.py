@@ -0,0 +1,116 @@
+"""
+Benchmark de los parsers de traspasos BPro: bucles iterrows originales vs motor columnar.
+
+Uso: python benchmarks/bench_traspasos.py [filas ...]   (por defecto 10k, 100k y 1M)
+Cubre las dos variantes: la de app.py / limpiador_ventasdrive (SALIDA...HACIA) y la de
+limpiador_01 (destinos del resumen + nomenclaturas). Antes de medir verifica equivalencia.
+"""
+import os
+import re
+import sys
+import time
+
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(__file__))
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+from generador_bpro import generar_traspasos, generar_traspasos_resumen  # noqa: E402
+from parsers_bpro import ESQUEMA_TRASPASOS, como_texto, parsear_traspasos_bpro, parsear_traspasos_por_destino, tipar  # noqa: E402
+
+
+# --- REFERENCIA: BUCLES ORIGINALES ---
+def procesar_traspasos_iterrows(dict_dfs, nombre_agencia):
+    datos = []
+    destino_actual, referencia, fecha_mov, usuario = None, None, None, None
+    for hoja, df in dict_dfs.items():
+        for _, row in df.iterrows():
+            val_a = str(row[0]).strip().upper()
+            if val_a.startswith("SALIDA"):
+                if "HACIA" in val_a:
+                    try: destino_actual = val_a.split("HACIA")[1].strip()
+                    except: continue
+                elif "SALIDA DE ALMACEN POR TRASPASO" in val_a:
+                    destino_actual = f"SALIDA DE ALMACEN POR TRASPASO {nombre_agencia}"
+            elif "REFERENCIA:" in val_a:
+                try:
+                    referencia = val_a.split("REFERENCIA:")[1].strip()
+                    if "FECHA MOV:" in str(row[2]).upper(): fecha_mov = str(row[2]).upper().split("FECHA MOV:")[1].strip()
+                    if "USUARIO:" in str(row[3]).upper(): usuario = str(row[3]).upper().split("USUARIO:")[1].strip()
+                except: continue
+            elif val_a.startswith("TRAS") and destino_actual:
+                try:
+                    descripcion = str(row[3]).strip()
+                    if descripcion and descripcion.lower() != 'nan':
+                        cantidad = float(row[4])
+                        costo = float(row[5])
+                        datos.append({"AGENCIA": nombre_agencia, "DESTINO": destino_actual, "REFERENCIA": referencia,
+                                      "FECHA_MOV": fecha_mov, "USUARIO": usuario, "NP": row[2], "DESCRIPCION": row[3],
+                                      "CANTIDAD": abs(cantidad), "COSTO_UNIT": costo, "TOTAL_COSTO": abs(cantidad) * costo})
+                except: continue
+    return pd.DataFrame(datos)
+
+
+def parsear_traspasos_detallado_iterrows(dict_dfs, nomenclaturas_agencia):
+    traspasos_combinados = {}
+    for sheet_name, df_crudo in dict_dfs.items():
+        lista_destinos = []
+        for index in range(4, min(50, len(df_crudo))):
+            celda_a = str(df_crudo.iloc[index, 0]).strip()
+            if celda_a.upper() == "TOTALES": break
+            if celda_a: lista_destinos.append(celda_a)
+        if not lista_destinos: continue
+        destino_actual, nombre_limpio_destino, fecha_actual = None, None, pd.NaT
+        for index, row in df_crudo.iterrows():
+            celda_a = str(row.get(0, '')).strip()
+            celda_c = str(row.get(2, '')).strip()
+            if not celda_a: continue
+            if celda_a.upper().startswith("REFERENCIA:"):
+                match = re.search(r'(\d{2}/\d{2}/\d{4})', celda_c)
+                if match: fecha_actual = pd.to_datetime(match.group(1), format='%d/%m/%Y', errors='coerce')
+                continue
+            if celda_a in lista_destinos:
+                destino_actual = celda_a
+                nombre_limpio_destino = re.split(r'hacia', destino_actual, flags=re.IGNORECASE)[-1].strip() if "hacia" in destino_actual.lower() else destino_actual
+                continue
+            if destino_actual and any(nom in celda_a for nom in nomenclaturas_agencia):
+                id_part = row.get(2)
+                cant = pd.to_numeric(row.get(4), errors='coerce')
+                if pd.notna(id_part) and pd.notna(cant) and id_part != 0 and pd.notna(fecha_actual):
+                    traspasos_combinados.setdefault(nombre_limpio_destino, []).append({'ID PART': id_part, 'Cantidad Traspasada': abs(cant), 'Fecha': fecha_actual})
+    return {d: pd.DataFrame(r).dropna(subset=['Fecha']) for d, r in traspasos_combinados.items() if r}
+
+
+def medir(fn, *args):
+    inicio = time.perf_counter()
+    res = fn(*args)
+    return res, time.perf_counter() - inicio
+
+
+def verificar():
+    for semilla in range(5):
+        hojas = generar_traspasos(3_000, semilla=semilla)
+        nuevo, rechazados = parsear_traspasos_bpro(hojas, "CUAUTITLAN")
+        pd.testing.assert_frame_equal(nuevo, tipar(procesar_traspasos_iterrows(hojas, "CUAUTITLAN"), ESQUEMA_TRASPASOS))
+        assert len(rechazados) > 0
+
+        hojas = generar_traspasos_resumen(3_000, semilla=semilla)
+        nuevo, _ = parsear_traspasos_por_destino(hojas, ["TRASUCCU", "TRASAPROCU"])
+        viejo = parsear_traspasos_detallado_iterrows(hojas, ["TRASUCCU", "TRASAPROCU"])
+        assert list(nuevo) == list(viejo)
+        for destino in viejo: pd.testing.assert_frame_equal(nuevo[destino], tipar(viejo[destino], {"ID PART": como_texto}))
+    print("Equivalencia OK")
+
+
+if __name__ == "__main__":
+    tamanos = [int(x) for x in sys.argv[1:]] or [10_000, 100_000, 1_000_000]
+    verificar()
+    print(f"{'variante':>10} {'filas':>10} {'iterrows (s)':>14} {'columnar (s)':>14} {'x':>8}")
+    for n in tamanos:
+        hojas = generar_traspasos(n)
+        _, t_nuevo = medir(parsear_traspasos_bpro, hojas, "CUAUTITLAN")
+        _, t_viejo = medir(procesar_traspasos_iterrows, hojas, "CUAUTITLAN")
+        print(f"{'app':>10} {n:>10} {t_viejo:>14.3f} {t_nuevo:>14.3f} {t_viejo / t_nuevo:>8.1f}")
+        hojas = generar_traspasos_resumen(n)
+        _, t_nuevo = medir(parsear_traspasos_por_destino, hojas, ["TRASUCCU", "TRASAPROCU"])
+        _, t_viejo = medir(parsear_traspasos_detallado_iterrows, hojas, ["TRASUCCU", "TRASAPROCU"])
+        print(f"{'fifo':>10} {n:>10} {t_viejo:>14.3f} {t_nuevo:>14.3f} {t_viejo / t_nuevo:>8.1f}")
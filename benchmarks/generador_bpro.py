@@ -0,0 +1,230 @@
+"""
+Datos sintéticos con el layout de los exports de BPro, del Drive y del Ventas Master, para los benchmarks.
+
+- generar_compras / generar_traspasos / generar_traspasos_resumen / generar_ventas: {hoja: DataFrame} como lo
+  devuelve read_excel(sheet_name=None, header=None), con encabezados FACTURA / REFERENCIA / SALIDA...HACIA,
+  ítems CR* / TRAS* / VR*, renglones TOTAL y celdas basura, partidos en varias hojas.
+- con_basura: intercala subtotales, encabezados de página y renglones vacíos (lo que BPro repite en cada página).
+- escribir_libro / escribir_ventas / escribir_drive: los mismos datos como .xlsx y .csv en disco.
+- escenario_bpro: una carpeta completa (las dos agencias, ventas manuales, Drive y Ventas Master) y su
+  config.json para limpiador_cli.
+
+Con la misma semilla los datos son idénticos entre corridas: los resultados de bench_suite son comparables.
+"""
+import json
+import os
+
+import numpy as np
+import pandas as pd
+
+NOMENCLATURAS_ITEMS = {"CUAUTITLAN": {"compras": "CRCU", "traspasos": ("TRASUCCU 1", "TRASAPROCU 2", "TRASOTRO 3")},
+                       "TULTITLAN": {"compras": "CRTU", "traspasos": ("TRASUCTU 1", "TRASAPROTU 2", "TRASOTRO 3")}}
+
+
+# --- COMPRAS ---
+def generar_compras(filas, hojas=3, semilla=0, prefijo="CRCU"):
+    """Simula lo que devuelve read_excel(sheet_name=None, header=None) sobre un export de compras."""
+    rng = np.random.default_rng(semilla)
+    celdas = []
+    while len(celdas) < filas:
+        f = int(rng.integers(1, 10_000))
+        celdas.append([f"FACTURA: F{f}", None, f"FECHA FACT: {rng.integers(1, 29):02d}/{rng.integers(1, 13):02d}/2025",
+                       f"PROVEEDOR: PROV {f % 37}" if rng.random() > 0.05 else None, f"COMPRADOR: USR{f % 5}"] + [None] * 7)
+        for _ in range(int(rng.integers(1, 8))):
+            desc = rng.choice(["FILTRO ACEITE", "BALATA", "nan", "  ", None, 12345])
+            cant = float(rng.integers(1, 20))
+            costo = round(float(rng.random() * 900), 2)
+            celdas.append([prefijo + str(rng.integers(100, 999)), None, f"NP{rng.integers(0, 5000)}", desc, cant, costo,
+                           None, cant * costo, cant * costo * 0.16, cant * costo * 1.16, None, "LINEA"])
+        if rng.random() < 0.2: celdas.append(["TOTAL FACTURA", None, None, None, 10.0] + [None] * 7)
+    celdas = celdas[:filas]
+    return _a_hojas(celdas, hojas)
+
+
+# --- TRASPASOS ---
+DESTINOS = ["SALIDA POR TRASPASO HACIA TALLER NORTE", "SALIDA POR TRASPASO HACIA Hojalateria",
+            "SALIDA DE ALMACEN POR TRASPASO", "SALIDA POR TRASPASO HACIA SUCURSAL TULTITLAN"]
+
+
+def _a_hojas(celdas, hojas):
+    cortes = np.array_split(np.arange(len(celdas)), hojas)
+    # read_excel deja las celdas vacías como NaN, nunca como None
+    return {f"Hoja{i + 1}": pd.DataFrame([celdas[j] for j in idx]).fillna(np.nan) for i, idx in enumerate(cortes)}
+
+
+def _bloques(rng, filas, celdas, destinos, items):
+    while len(celdas) < filas:
+        celdas.append([rng.choice(destinos)] + [None] * 11)
+        for _ in range(int(rng.integers(1, 6))):
+            r = int(rng.integers(1, 99_999))
+            fecha = f"FECHA MOV: {rng.integers(1, 32):02d}/{rng.integers(1, 13):02d}/2025"
+            celdas.append([f"REFERENCIA: T{r}", None, fecha if rng.random() > 0.05 else None, f"USUARIO: usr{r % 7}"] + [None] * 8)
+            for _ in range(int(rng.integers(1, 6))):
+                cant = rng.choice([-float(rng.integers(1, 9)), int(rng.integers(1, 9)), "N/D"], p=[0.6, 0.38, 0.02])
+                desc = rng.choice(["BUJIA", "AMORTIGUADOR", "nan", None], p=[0.45, 0.45, 0.05, 0.05])
+                np_val = rng.choice([f"NP{rng.integers(0, 3000)}", int(rng.integers(1, 3000)), 0])
+                celdas.append([rng.choice(items), None, np_val, desc, cant, round(float(rng.random() * 500), 2)] + [None] * 6)
+            if rng.random() < 0.3: celdas.append([None] * 12)
+        if rng.random() < 0.1: celdas.append(["SALIDA SIN DESTINO"] + [None] * 11)
+    return celdas[:filas]
+
+
+def generar_traspasos(filas, hojas=3, semilla=0, items=NOMENCLATURAS_ITEMS["CUAUTITLAN"]["traspasos"]):
+    """Layout de app.py: SALIDA...HACIA / REFERENCIA / TRAS*, con continuidad entre hojas."""
+    rng = np.random.default_rng(semilla)
+    return _a_hojas(_bloques(rng, filas, [["REPORTE DE TRASPASOS"] + [None] * 11], DESTINOS, items), hojas)
+
+
+def generar_traspasos_resumen(filas, hojas=3, semilla=0, items=NOMENCLATURAS_ITEMS["CUAUTITLAN"]["traspasos"]):
+    """Layout de limpiador_01: cada hoja trae el resumen de destinos hasta TOTALES."""
+    rng = np.random.default_rng(semilla)
+    resultado = {}
+    for i in range(hojas):
+        destinos = [d for d in DESTINOS if "HACIA" in d] + ["ALMACEN VENTAS MOSTRADOR"]
+        celdas = [["REPORTE"] + [None] * 11] * 4 + [[d] + [None] * 11 for d in destinos] + [["TOTALES"] + [None] * 11]
+        resultado[f"Hoja{i + 1}"] = _a_hojas(_bloques(rng, filas // hojas, celdas, destinos, items), 1)["Hoja1"]
+    return resultado
+
+
+def destinos_resumen():
+    """Almacenes que limpiador_01 saca del resumen de generar_traspasos_resumen (lo que sigue a HACIA)."""
+    return [d.split("HACIA")[-1].strip() for d in DESTINOS if "HACIA" in d] + ["ALMACEN VENTAS MOSTRADOR"]
+
+
+# --- VENTAS FIFO ---
+def generar_ventas(filas, hojas=3, semilla=0):
+    """Reporte de ventas por factura: FACTURA/REFERENCIA: con fecha en la columna E e ítems VR*."""
+    rng = np.random.default_rng(semilla)
+    celdas = []
+    while len(celdas) < filas:
+        fecha = f"{rng.integers(1, 32):02d}/{rng.integers(1, 13):02d}/2025" if rng.random() > 0.05 else "SIN FECHA"
+        celdas.append([f"FACTURA/REFERENCIA: V{rng.integers(1, 99_999)}", None, None, None, fecha] + [None] * 7)
+        for _ in range(int(rng.integers(1, 6))):
+            cant = rng.choice([int(rng.integers(1, 9)), float(rng.integers(1, 9)), "N/D", 0], p=[0.5, 0.3, 0.1, 0.1])
+            celdas.append([rng.choice(["VRCU 1", "VRTU 2", "OTRO"]), None, rng.choice([f"NP{rng.integers(0, 3000)}", 0, None]),
+                           "PIEZA", cant, None, round(float(rng.random() * 900), 2)] + [None] * 5)
+    cortes = np.array_split(np.arange(filas), hojas)
+    return {f"Hoja{i + 1}": pd.DataFrame([celdas[j] for j in idx]).fillna(np.nan) for i, idx in enumerate(cortes)}
+
+
+# --- BASURA DE PÁGINA ---
+BASURA = [["SUBTOTAL", None, None, None, 123.0, None, None, 4567.8] + [None] * 4,
+          ["TOTAL GENERAL", None, None, None, 999.0] + [None] * 7,
+          ["Página 7 de 120", None, "GRUPO AUTOMOTRIZ"] + [None] * 9,
+          ["CLAVE", None, "NUMERO DE PARTE", "DESCRIPCION", "CANTIDAD", "COSTO"] + [None] * 6,
+          [None] * 12, ["   "] + [None] * 11]
+
+
+def con_basura(hojas, proporcion=0.02, semilla=0, desde=20):
+    """
+    Intercala renglones de BASURA en cada hoja (a partir del renglón `desde`, para no tocar el resumen de
+    destinos). Ningún parser debe sacar ítems de ellos: el resultado tiene que ser el mismo que sin basura.
+    """
+    rng = np.random.default_rng(semilla)
+    resultado = {}
+    for nombre, df in hojas.items():
+        n = int(len(df) * proporcion)
+        if n == 0 or len(df) <= desde:
+            resultado[nombre] = df
+            continue
+        basura = pd.DataFrame([BASURA[i] for i in rng.integers(0, len(BASURA), n)]).fillna(np.nan).reindex(columns=df.columns)
+        posiciones = np.sort(rng.integers(desde, len(df), n))
+        # Cada renglón de basura queda justo antes del renglón original en su posición
+        orden = np.argsort(np.concatenate([np.arange(len(df)), posiciones - 0.5]), kind="stable")
+        resultado[nombre] = pd.concat([df, basura], ignore_index=True).iloc[orden].reset_index(drop=True)
+    return resultado
+
+
+# --- ARCHIVOS EN DISCO ---
+def escribir_libro(ruta, hojas):
+    with pd.ExcelWriter(ruta, engine="xlsxwriter") as writer:
+        for nombre, df in hojas.items(): df.to_excel(writer, sheet_name=nombre, header=False, index=False)
+
+
+ALMACENES = ["Refacciones Cuautitlan", "TALLER CUAUTITLAN", "Mostrador Tultitlan", "tultitlan hyp", "BODEGA CENTRAL"]
+
+
+def escribir_ventas(ruta, renglones, semilla=0, excel=False, almacen_vacio=False):
+    """Ventas Master: tres años de ventas con las columnas de más que trae el real; NP numéricos y alfanuméricos."""
+    rng = np.random.default_rng(semilla)
+    fechas = pd.Timestamp("2024-01-01") + pd.to_timedelta(rng.integers(0, 3 * 365, renglones), unit="D")
+    np_num = rng.integers(10_000, 60_000, renglones)
+    df = pd.DataFrame({
+        "FOLIO": rng.integers(1, 10**7, renglones), "FECHA": fechas.strftime("%d/%m/%Y"),
+        "ALMACEN": np.array(ALMACENES)[rng.integers(0, len(ALMACENES), renglones)],
+        "CLIENTE": [f"CLIENTE {i}" for i in rng.integers(0, 5_000, renglones)],
+        "NP": np.where(rng.random(renglones) < 0.3, [f"A{n}" for n in np_num], np_num.astype(str)),
+        "DESCRIPCION": "REFACCION GENERICA", "CANTIDAD": rng.integers(1, 6, renglones),
+        "PRECIO": np.round(rng.random(renglones) * 3_000, 2), "VENDEDOR": [f"V{i}" for i in rng.integers(0, 80, renglones)],
+    })
+    df.loc[::997, "FECHA"] = None
+    if almacen_vacio: df.loc[::1009, "ALMACEN"] = None
+    if excel: df.to_excel(ruta, index=False)
+    else: df.to_csv(ruta, index=False, encoding="latin1")
+
+
+MESES_TEXTO = ["enero", "febrero", "marzo", "abril", "mayo", "junio", "julio", "agosto", "septiembre", "octubre", "noviembre", "diciembre"]
+SEMANA_TEXTO = ["lunes", "martes", "miércoles", "jueves", "viernes", "sábado", "domingo"]
+
+
+def escribir_drive(ruta, agencia, filas, semilla=0):
+    """CSV de solicitudes del Drive: Cuautitlán con 1 renglón de título, Tultitlán con 6; fechas en texto libre."""
+    rng = np.random.default_rng(semilla)
+    es_tulti = agencia == "TULTITLAN"
+    dias = pd.date_range("2025-06-01", "2026-12-31")
+    fechas = dias[rng.integers(0, len(dias), filas)]
+    estilos = rng.integers(0, 4, filas)
+    textos = [f"{SEMANA_TEXTO[f.weekday()]}, {f.day} de {MESES_TEXTO[f.month - 1]} de {f.year}" if e == 0 else
+              (f"{f.month}/{f.day}/{f.year}" if es_tulti else f"{f.day}/{f.month}/{f.year}") if e == 1 else
+              f"{f.year}-{f.month:02d}-{f.day:02d}" if e == 2 else "" for f, e in zip(fechas, estilos)]
+    df = pd.DataFrame({"Fecha": textos, "Vendedor": [f"V{i}" for i in rng.integers(0, 30, filas)],
+                       "No. De Parte": [f"NP{i}" for i in rng.integers(0, 5000, filas)], "Descripcion": "PIEZA",
+                       "Cantidad": rng.integers(1, 10, filas), ("Observaciones" if es_tulti else "Orden de Compra"): "OC"})
+    if not es_tulti: df.insert(0, "CANCELAR (X)", np.where(rng.random(filas) < 0.05, "X", None))
+    with open(ruta, "w", encoding="latin1", newline="") as f:
+        f.write("SOLICITUDES DE PIEZAS\n" * (6 if es_tulti else 1))
+        df.to_csv(f, index=False)
+
+
+# --- ESCENARIO COMPLETO ---
+def escenario_bpro(carpeta, filas=50_000, semilla=0, hojas=3, basura=0.02):
+    """
+    Escribe en `carpeta` los exports de las dos agencias (compras, traspasos en los dos layouts, ventas), las
+    ventas manuales de cada almacén destino, el Drive y el Ventas Master, más un config.json para
+    limpiador_cli. `filas` es el tamaño de cada export de compras; los demás son proporcionales. Devuelve
+    {nombre: ruta}.
+    """
+    os.makedirs(os.path.join(carpeta, "manuales"), exist_ok=True)
+    rutas = {}
+
+    def libro(nombre, hojas_df, i):
+        rutas[nombre] = os.path.join(carpeta, f"{nombre}.xlsx")
+        escribir_libro(rutas[nombre], con_basura(hojas_df, basura, semilla + i) if basura else hojas_df)
+
+    for i, (agencia, sufijo) in enumerate((("CUAUTITLAN", "cu"), ("TULTITLAN", "tu"))):
+        items = NOMENCLATURAS_ITEMS[agencia]
+        s = semilla * 100 + i * 10
+        libro(f"compras_{sufijo}", generar_compras(filas, hojas, s, items["compras"]), s)
+        libro(f"traspasos_{sufijo}", generar_traspasos(filas // 2, hojas, s + 1, items["traspasos"]), s + 1)
+        libro(f"traspasos_fifo_{sufijo}", generar_traspasos_resumen(filas // 2, hojas, s + 2, items["traspasos"]), s + 2)
+        libro(f"ventas_{sufijo}", generar_ventas(filas, hojas, s + 3), s + 3)
+        rutas[f"drive_{sufijo}"] = os.path.join(carpeta, f"drive_{sufijo}.csv")
+        escribir_drive(rutas[f"drive_{sufijo}"], agencia, max(filas // 20, 50), s + 4)
+    for j, almacen in enumerate(destinos_resumen()):
+        libro(os.path.join("manuales", almacen), generar_ventas(max(filas // 10, 100), 1, semilla * 100 + 50 + j), 50 + j)
+    rutas["ventas_master"] = os.path.join(carpeta, "ventas_master.csv")
+    escribir_ventas(rutas["ventas_master"], filas * 4, semilla)
+
+    por_agencia = lambda prefijo: {"CUAUTITLAN": f"{prefijo}_cu.xlsx", "TULTITLAN": f"{prefijo}_tu.xlsx"}  # noqa: E731
+    config = {
+        "unificacion": {"compras": por_agencia("compras"), "traspasos": por_agencia("traspasos")},
+        "fifo": {"agencias": {a: {"compras": f"compras_{s}.xlsx", "traspasos": f"traspasos_fifo_{s}.xlsx", "ventas": f"ventas_{s}.xlsx",
+                                  "almacenes": {"ALMACEN VENTAS MOSTRADOR": "No Considerar"}}
+                              for a, s in (("CUAUTITLAN", "cu"), ("TULTITLAN", "tu"))},
+                 "ventas_manuales": {a: f"manuales/{a}.xlsx" for a in destinos_resumen()}},
+        "cruce": {"compras": por_agencia("compras"), "traspasos": por_agencia("traspasos"),
+                  "drive": {"CUAUTITLAN": "drive_cu.csv", "TULTITLAN": "drive_tu.csv"}, "ventas_master": "ventas_master.csv"},
+    }
+    rutas["config"] = os.path.join(carpeta, "config.json")
+    with open(rutas["config"], "w", encoding="utf-8") as f: json.dump(config, f, indent=2, ensure_ascii=False)
+    return rutas
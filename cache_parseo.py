@@ -0,0 +1,163 @@
+import functools
+import hashlib
+import inspect
+import json
+import os
+import shutil
+import uuid
+
+import pandas as pd
+
+# --- CACHÉ DE PARSEO EN DISCO (COMPARTIDA ENTRE SESIONES Y REINICIOS) ---
+# La llave es el hash del contenido del archivo + parser + versión + parámetros, así subir el mismo
+# export de BPro (desde cualquier sesión) cuesta un hash y una lectura columnar en lugar de un parseo
+# completo del Excel. Cada resultado vive en su carpeta con un manifest.json y un Parquet por DataFrame.
+# Por omisión vive en la carpeta de caché del usuario (no en el tmp compartido): solo él puede escribir ahí.
+CACHE_DIR = os.environ.get("LIMPIADOR_CACHE_DIR", os.path.join(os.environ.get("XDG_CACHE_HOME") or os.path.expanduser("~/.cache"), "limpiador"))
+LIMITE_MB = float(os.environ.get("LIMPIADOR_CACHE_MB", 1024))
+
+def carpeta_privada(ruta):
+    """Crea `ruta` (y los niveles que falten) con permisos 0700; si ya existía y es de este usuario, les quita el acceso a los demás."""
+    padre = os.path.dirname(ruta)
+    if padre and padre != ruta and not os.path.isdir(padre): carpeta_privada(padre)
+    os.makedirs(ruta, mode=0o700, exist_ok=True)
+    if hasattr(os, "getuid") and os.stat(ruta).st_uid == os.getuid(): os.chmod(ruta, 0o700)
+    return ruta
+
+def contenido_archivo(file):
+    """Bytes de un UploadedFile de Streamlit, una ruta, bytes o cualquier objeto tipo archivo."""
+    if isinstance(file, (bytes, bytearray)): return bytes(file)
+    if isinstance(file, (str, os.PathLike)):
+        with open(file, "rb") as f: return f.read()
+    if hasattr(file, "getvalue"): return file.getvalue()
+    pos = file.tell()
+    datos = file.read()
+    file.seek(pos)
+    return datos
+
+def hash_archivo(file):
+    return hashlib.sha256(contenido_archivo(file)).hexdigest()
+
+def clave_cache(hash_contenido, parser, version, params):
+    llave = json.dumps([hash_contenido, parser, version, params], sort_keys=True, default=str, ensure_ascii=False)
+    return hashlib.sha256(llave.encode("utf-8")).hexdigest()
+
+# --- SERIALIZACIÓN ---
+# Solo Parquet (nunca pickle: la caché se lee de disco y un pickle ajeno ejecutaría código al cargarse).
+# Las columnas object con tipos mezclados (NP int/str) que Arrow no acepta se guardan como texto JSON por
+# valor y quedan anotadas en el manifest ("json"), así al leerlas cada valor vuelve con su tipo original.
+def a_json(valor):
+    return json.dumps(valor.item() if hasattr(valor, "item") else valor, default=str, ensure_ascii=False)
+
+def guardar_df(df, carpeta, nombre):
+    """Escribe `df` como <carpeta>/<nombre>.parquet; devuelve lo que `leer_df` necesita para reconstruirlo."""
+    objeto = [c for c in df.columns if df[c].dtype == object]
+    mixtas = [c for c in objeto if pd.api.types.infer_dtype(df[c], skipna=True) not in ("string", "empty")]
+    if mixtas:
+        df = df.copy()
+        for c in mixtas: df[c] = df[c].map(a_json).where(df[c].notna(), None)
+    df.to_parquet(os.path.join(carpeta, f"{nombre}.parquet"), index=False)
+    return {"archivo": f"{nombre}.parquet", "object": objeto, "json": mixtas}
+
+def leer_df(carpeta, meta):
+    if not meta["archivo"].endswith(".parquet"): raise ValueError(f"Formato no soportado: {meta['archivo']}")
+    df = pd.read_parquet(os.path.join(carpeta, meta["archivo"]))
+    # Arrow devuelve como texto las columnas object que solo tenían strings; se restauran tal cual salieron del parser
+    for c in meta.get("object", ()): df[c] = df[c].astype(object).where(df[c].notna(), None)
+    for c in meta.get("json", ()):
+        textos = df[c].dropna().unique()
+        df[c] = df[c].map(dict(zip(textos, map(json.loads, textos)))).where(df[c].notna(), None)
+    return df
+
+def serializar(valor, carpeta, contador):
+    if isinstance(valor, pd.DataFrame):
+        contador[0] += 1
+        return {"tipo": "df", **guardar_df(valor, carpeta, str(contador[0]))}
+    if isinstance(valor, dict):
+        return {"tipo": "dict", "items": [[k, serializar(v, carpeta, contador)] for k, v in valor.items()]}
+    if isinstance(valor, (tuple, list)):
+        return {"tipo": "tuple", "items": [serializar(v, carpeta, contador) for v in valor]}
+    raise TypeError(f"Tipo no soportado por la caché de parseo: {type(valor).__name__}")
+
+def deserializar(nodo, carpeta):
+    if nodo["tipo"] == "df": return leer_df(carpeta, nodo)
+    if nodo["tipo"] == "dict": return {k: deserializar(v, carpeta) for k, v in nodo["items"]}
+    return tuple(deserializar(v, carpeta) for v in nodo["items"])
+
+def es_vacio(valor):
+    if isinstance(valor, pd.DataFrame): return valor.empty
+    if isinstance(valor, dict): return not valor
+    if isinstance(valor, (tuple, list)): return es_vacio(valor[0]) if valor else True
+    return valor is None
+
+# --- LECTURA / ESCRITURA / EVICCIÓN ---
+def carpeta_parseo():
+    return os.path.join(CACHE_DIR, "parseo")
+
+def leer(clave, base=None):
+    carpeta = os.path.join(base or carpeta_parseo(), clave)
+    try:
+        with open(os.path.join(carpeta, "manifest.json"), encoding="utf-8") as f: manifest = json.load(f)
+        resultado = deserializar(manifest, carpeta)
+        os.utime(carpeta)  # marca de uso para el LRU
+        return resultado
+    except Exception:
+        return None  # entrada corrupta o de un formato viejo: cuenta como fallo de caché
+
+def guardar(clave, resultado, base=None, limite_mb=None):
+    """Escribe `resultado` en <base>/<clave> (por omisión la caché de parseo) y desaloja hasta quedar bajo el límite."""
+    base = base or carpeta_parseo()
+    carpeta_privada(base)
+    tmp = os.path.join(base, f".tmp-{uuid.uuid4().hex}")
+    os.makedirs(tmp)
+    try:
+        manifest = serializar(resultado, tmp, [0])
+        with open(os.path.join(tmp, "manifest.json"), "w", encoding="utf-8") as f: json.dump(manifest, f)
+        os.rename(tmp, os.path.join(base, clave))  # atómico: otra sesión nunca ve una entrada a medias
+    except OSError:
+        pass  # otra sesión guardó la misma llave primero
+    finally:
+        shutil.rmtree(tmp, ignore_errors=True)
+    desalojar(limite_mb, base)
+
+def tamano_carpeta(carpeta):
+    return sum(e.stat().st_size for e in os.scandir(carpeta) if e.is_file())
+
+def desalojar(limite_mb=None, base=None):
+    """Borra las entradas menos usadas (por mtime) hasta quedar bajo el límite de tamaño."""
+    base = base or carpeta_parseo()
+    limite = (LIMITE_MB if limite_mb is None else limite_mb) * 1024 * 1024
+    try:
+        entradas = [(e.stat().st_mtime, tamano_carpeta(e.path), e.path) for e in os.scandir(base) if e.is_dir() and not e.name.startswith(".")]
+    except OSError:
+        return
+    total = sum(t for _, t, _ in entradas)
+    for _, tam, ruta in sorted(entradas):
+        if total <= limite: break
+        shutil.rmtree(ruta, ignore_errors=True)
+        total -= tam
+
+def cache_parseo(version=1, ejecucion=("streaming",)):
+    """
+    Decorador para parsers cuyo primer argumento es el archivo subido. Los resultados vacíos no se
+    guardan: normalmente vienen de un error que el parser ya reportó en pantalla. La llave usa los
+    parámetros ya resueltos contra la firma (posicional o por nombre, con sus defaults) y deja fuera los
+    de `ejecucion`, que solo cambian cómo se lee el archivo y no el resultado.
+    """
+    def decorador(fn):
+        firma = inspect.signature(fn)
+        @functools.wraps(fn)
+        def envuelta(file, *args, **kwargs):
+            try:
+                params = firma.bind(file, *args, **kwargs)
+                params.apply_defaults()
+                params = {k: v for k, v in list(params.arguments.items())[1:] if k not in ejecucion}
+                clave = clave_cache(hash_archivo(file), f"{fn.__module__}.{fn.__qualname__}", version, params)
+            except (OSError, AttributeError, TypeError): return fn(file, *args, **kwargs)
+            resultado = leer(clave)
+            if resultado is not None: return resultado
+            resultado = fn(file, *args, **kwargs)
+            if not es_vacio(resultado): guardar(clave, resultado)
+            return resultado
+        return envuelta
+    return decorador
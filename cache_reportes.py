@@ -0,0 +1,78 @@
+import hashlib
+import json
+import os
+import shutil
+import time
+import uuid
+
+from cache_parseo import CACHE_DIR, carpeta_privada, desalojar
+
+# --- CACHÉ DE REPORTES TERMINADOS (COMPARTIDA ENTRE SESIONES) ---
+# Los usuarios de las dos agencias suelen pedir el mismo reporte con los mismos archivos y la misma tabla de
+# acciones por almacén. La llave es el tipo de reporte + su versión + los handles de las bases de entrada (que ya
+# son hashes del contenido de cada archivo, ver memoria_sesion; con el histórico, también la huella del almacén
+# incremental) + las dos tablas de acciones completas en forma canónica. Cada reporte usa las dos tablas, así que
+# cambiar la acción de cualquier almacén, de cualquier agencia, hace fallar la llave de los tres tipos de reporte;
+# lo que sí se aprovecha es volver a una combinación de acciones ya generada (y el orden de las filas no importa).
+# Cada reporte vive en <CACHE_DIR>/reportes/<llave>/<nombre>: caduca a las TTL_HORAS de escrito y, por tamaño, sale
+# primero el menos pedido (mtime de la carpeta, como en la caché de parseo). La sesión solo guarda la ruta.
+LIMITE_MB = float(os.environ.get("LIMPIADOR_REPORTES_MB", 1024))
+TTL_HORAS = float(os.environ.get("LIMPIADOR_REPORTES_TTL_H", 24))
+
+def carpeta_reportes():
+    return os.path.join(CACHE_DIR, "reportes")
+
+def acciones_canonicas(almacenes):
+    """[(almacén, acción)] ordenado de la tabla que edita la interfaz; el orden de las filas no cambia la llave."""
+    if almacenes is None or getattr(almacenes, "empty", True): return []
+    return sorted(zip(almacenes['Almacén Destino'].astype(str), almacenes['Acción'].astype(str)))
+
+def clave_reporte(tipo, version, entradas, almacenes):
+    """`entradas` son hashes de contenido (o handles) de todas las bases; `almacenes`, una tabla de acciones por agencia."""
+    llave = json.dumps([tipo, version, entradas, [acciones_canonicas(a) for a in almacenes]], default=str, ensure_ascii=False)
+    return hashlib.sha256(llave.encode("utf-8")).hexdigest()
+
+def vigente(ruta):
+    try: return time.time() - os.path.getmtime(ruta) < TTL_HORAS * 3600
+    except OSError: return False
+
+def buscar(clave, nombre):
+    """Ruta del reporte guardado con esa llave, o None si no existe o ya caducó."""
+    carpeta = os.path.join(carpeta_reportes(), clave)
+    ruta = os.path.join(carpeta, nombre)
+    if not vigente(ruta):
+        shutil.rmtree(carpeta, ignore_errors=True)
+        return None
+    os.utime(carpeta)  # marca de uso para el desalojo por tamaño; la caducidad va por el mtime del archivo
+    return ruta
+
+def caducar():
+    try: entradas = [e.path for e in os.scandir(carpeta_reportes()) if e.is_dir()]
+    except OSError: return
+    for carpeta in entradas:
+        try: archivos = [e.path for e in os.scandir(carpeta) if e.is_file() and not e.name.endswith(".tmp")]
+        except OSError: continue  # otra sesión la acaba de borrar
+        if archivos and not any(map(vigente, archivos)): shutil.rmtree(carpeta, ignore_errors=True)
+
+def guardar(clave, origen, nombre):
+    """Mueve el libro ya escrito en `origen` (ver exportar) bajo la llave y devuelve su ruta; None si no hay libro."""
+    if origen is None: return None
+    carpeta = os.path.join(carpeta_reportes(), clave)
+    carpeta_privada(carpeta)
+    ruta = os.path.join(carpeta, nombre)
+    tmp = f"{ruta}.{uuid.uuid4().hex}.tmp"
+    shutil.move(origen, tmp)  # copia solo si la caché vive en otro disco que las exportaciones
+    os.replace(tmp, ruta)  # atómico: otra sesión nunca lee un libro a medias
+    caducar()
+    desalojar(LIMITE_MB, carpeta_reportes())
+    return ruta
+
+def reporte_en_cache(tipo, version, entradas, almacenes, calcular, nombre="Reporte.xlsx"):
+    """
+    (ruta, True) si otra petición ya generó este reporte con las mismas entradas y acciones; si no,
+    (ruta donde quedó el libro que escribió calcular(), False). La ruta es None cuando calcular() no da hojas.
+    """
+    clave = clave_reporte(tipo, version, entradas, almacenes)
+    ruta = buscar(clave, nombre)
+    if ruta: return ruta, True
+    return guardar(clave, calcular(), nombre), False
@@ -0,0 +1,60 @@
+import numpy as np
+import pandas as pd
+from parsers_bpro import TEXTO
+
+# --- CATÁLOGO DE NÚMEROS DE PARTE ---
+# ID PART (FIFO) y NP (cruce con Drive y Ventas Master) llegan de Excel y CSV como int, float o texto según la
+# celda: 12345, 12345.0, "12345" y " 12345 " son la misma parte. El catálogo de una corrida es el índice ordenado
+# de todas las partes ya normalizadas; cada tabla cambia su columna de parte por el código int32 (posición en el
+# catálogo), los groupby y merges corren sobre enteros y el texto vuelve solo al exportar. Como el catálogo está
+# ordenado, agrupar por código da las filas en el mismo orden que agrupar por el texto.
+def normalizar_parte(v):
+    """Texto canónico de un número de parte; None si la celda está vacía."""
+    if isinstance(v, (bool, np.bool_)): return str(v)
+    if isinstance(v, (int, np.integer)): return str(int(v))
+    if isinstance(v, (float, np.floating)):
+        if np.isnan(v): return None
+        return str(int(v)) if float(v).is_integer() else str(float(v))
+    return str(v).strip() or None
+
+def partes_unicas(col):
+    """Códigos de factorize y los valores únicos ya normalizados: cada valor distinto se normaliza una sola vez."""
+    codigos, unicos = pd.factorize(col)
+    # Texto (lo común): strip vectorizado; int, float o tipos mezclados valor por valor
+    if pd.api.types.infer_dtype(unicos, skipna=True) == "string": partes = pd.Series(unicos, dtype=TEXTO).str.strip()
+    else: partes = pd.Series([normalizar_parte(v) for v in unicos], dtype=TEXTO)
+    return codigos, partes.mask(partes == "")
+
+def por_codigo(valores, codigos, nulo=-1):
+    """valores[codigos] para códigos de factorize: el código -1 (valor vacío) da `nulo`."""
+    # El `nulo` extra al final es el destino del -1, que numpy lee como el último elemento
+    return np.append(valores, nulo)[codigos]
+
+def codificar_partes(columnas):
+    """(catálogo, [códigos int32 de cada columna]); -1 donde no hay parte."""
+    factorizadas = [partes_unicas(col) for col in columnas]
+    if not factorizadas: return pd.Index([], dtype=TEXTO), []
+    posiciones, catalogo = pd.factorize(pd.concat([partes for _, partes in factorizadas], ignore_index=True), sort=True)
+    fin = np.cumsum([len(partes) for _, partes in factorizadas])
+    return catalogo, [por_codigo(posiciones[i - len(partes):i], codigos).astype(np.int32) for (codigos, partes), i in zip(factorizadas, fin)]
+
+def tablas_con(fuentes, col):
+    for f in fuentes:
+        for df in (f.values() if isinstance(f, dict) else [f]):
+            if isinstance(df, pd.DataFrame) and col in df.columns: yield df
+
+def codificar_tablas(fuentes, col):
+    """
+    `fuentes` son DataFrames o dicts {almacén: DataFrame}. Devuelve (catálogo, fuentes con la misma forma y `col`
+    como código). Las filas sin parte se quitan: los groupby por parte las descartaban igual.
+    """
+    tablas = {id(df): df for df in tablas_con(fuentes, col)}
+    catalogo, codigos = codificar_partes([df[col] for df in tablas.values()])
+    nuevas = {k: df.assign(**{col: c})[c >= 0] for (k, df), c in zip(tablas.items(), codigos)}
+    def reemplazar(df): return nuevas.get(id(df), df)
+    return catalogo, [{k: reemplazar(v) for k, v in f.items()} if isinstance(f, dict) else reemplazar(f) for f in fuentes]
+
+def con_texto(df, col, catalogo):
+    """De vuelta al número de parte como texto, para exportar."""
+    if not isinstance(df, pd.DataFrame) or df.empty or col not in df.columns: return df
+    return df.assign(**{col: catalogo.take(df[col].to_numpy(), allow_fill=True, fill_value=np.nan)})
@@ -0,0 +1,183 @@
+import re
+
+import numpy as np
+import pandas as pd
+from parsers_bpro import COLUMNAS_RECHAZADOS, ESQUEMA_COMPRAS, ESQUEMA_TRASPASOS, compras_bloque, traspasos_bloque
+from cache_parseo import cache_parseo
+from ejecucion import ejecutar, parsear_archivo
+from catalogo_partes import codificar_tablas, con_texto, por_codigo
+from rendimiento import medido
+
+# --- CRUCE END-TO-END (SIN INTERFAZ) ---
+# BPro (compras y traspasos) + solicitudes del Drive + Ventas Master -> base final para Power BI. Lo usan
+# limpiador_ventasdrive (Streamlit) y limpiador_cli (batch); cada fase es una función aparte para que quien
+# llama intercale sus avisos y el histórico.
+AGENCIAS = ("CUAUTITLAN", "TULTITLAN")
+ANIO_CRUCE = 2026
+
+# --- FUNCIONES INTERNAS DE LIMPIEZA ---
+def obtener_enlace_directo_drive(url):
+    if "drive.google.com/file/d/" in url:
+        file_id = url.split("/d/")[1].split("/")[0]
+        return f"https://drive.google.com/uc?export=download&id={file_id}"
+    return url
+
+@cache_parseo(version=5)
+def procesar_compras(file, nombre_agencia, streaming=None):
+    # Mismo esquema que app.py: así ambos comparten el dataset "compras" del almacén incremental
+    return parsear_archivo(compras_bloque, file, (nombre_agencia,), [ESQUEMA_COMPRAS], streaming, solo_primera=True)
+
+def columnas_cruce(df_items):
+    if df_items.empty: return df_items
+    df_items = df_items.rename(columns={'COSTO UNITARIO': 'COSTO_UNIT'})
+    return df_items[['AGENCIA', 'FACTURA', 'FECHA', 'PROVEEDOR', 'COMPRADOR', 'NP', 'DESCRIPCION', 'CANTIDAD', 'COSTO_UNIT', 'TOTAL']]
+
+@cache_parseo(version=4)
+def procesar_traspasos(file, nombre_agencia, streaming=None):
+    return parsear_archivo(traspasos_bloque, file, (nombre_agencia,), [ESQUEMA_TRASPASOS, COLUMNAS_RECHAZADOS], streaming, solo_primera=True)
+
+def describir_ventas(informe):
+    origen = {"local": "archivo local", "descargado": f"descargado ({informe['bytes_descargados'] / 2**20:.1f} MB)"}.get(informe["origen"], informe["origen"])
+    archivos = ", ".join(f"{nombre}: {estado}" for nombre, estado in informe["archivos"])
+    return f"☁️ Ventas Master {origen} en {informe['descarga_s']:.1f}s · parseo {informe['parseo_s']:.1f}s ({archivos})"
+
+# --- FECHAS DEL DRIVE EN ESPAÑOL ---
+# "Jueves, 5 de Marzo de 2026" -> "5/03/2026". Todos los tokens van en un solo regex y cada texto distinto
+# se limpia y parsea una sola vez (en el Drive las fechas se repiten mucho).
+DIAS_SEMANA = ['lunes', 'martes', 'miércoles', 'miercoles', 'jueves', 'viernes', 'sábado', 'sabado', 'domingo']
+MESES_NUMERO = {'enero': '01', 'febrero': '02', 'marzo': '03', 'abril': '04', 'mayo': '05', 'junio': '06', 'julio': '07',
+                'agosto': '08', 'septiembre': '09', 'octubre': '10', 'noviembre': '11', 'diciembre': '12'}
+TOKENS_FECHA = {**dict.fromkeys(DIAS_SEMANA, ''), **MESES_NUMERO, ' del ': '/', ' de ': '/', ',': ''}
+PATRON_TOKENS_FECHA = re.compile('|'.join(map(re.escape, TOKENS_FECHA)))
+
+# Formatos explícitos en el orden en que los resuelve pd.to_datetime con dayfirst (Cuautitlán) o sin él
+# (Tultitlán): si el primer campo no cabe como mes/día se intercambian, y con año al inicio dayfirst lee aaaa/dd/mm.
+# Lo que no encaja (años de 2 dígitos, "a. m.", etc.) se parsea como siempre, texto por texto.
+FORMATOS_DIA_MES = ['%d/%m/%Y', '%m/%d/%Y', '%Y/%d/%m']
+FORMATOS_MES_DIA = ['%m/%d/%Y', '%d/%m/%Y', '%Y/%m/%d']
+FORMATOS_FECHA = {es_tulti: [f + h for f in formatos for h in ('', ' %H:%M:%S', ' %H:%M')]
+                  for es_tulti, formatos in [(False, FORMATOS_DIA_MES), (True, FORMATOS_MES_DIA)]}
+
+def normalizar_texto_fecha(textos):
+    textos = textos.str.lower().str.strip().str.replace(PATRON_TOKENS_FECHA, lambda m: TOKENS_FECHA[m.group(0)], regex=True)
+    return textos.str.replace(r'\s+', ' ', regex=True).str.strip().str.replace('-', '/', regex=False)
+
+def parsear_fecha_libre(texto, es_tulti):
+    try: return pd.to_datetime(texto, dayfirst=not es_tulti)
+    except Exception: return pd.NaT
+
+def limpiar_fechas(col, es_tulti):
+    """Columna de fechas del Drive (texto libre en español) -> datetime; lo vacío o ilegible queda NaT."""
+    codigos, unicos = pd.factorize(col)
+    textos = normalizar_texto_fecha(pd.Series([str(v) for v in unicos], dtype=object))
+    fechas = [pd.NaT] * len(textos)
+    pendientes = (textos != '').to_numpy().copy()
+    for formato in FORMATOS_FECHA[es_tulti]:
+        if not pendientes.any(): break
+        leidas = pd.to_datetime(textos[pendientes], format=formato, errors='coerce').astype('datetime64[us]')
+        for i, fecha in leidas.dropna().items(): fechas[i] = fecha
+        pendientes[leidas.dropna().index] = False
+    for i in np.flatnonzero(pendientes): fechas[i] = parsear_fecha_libre(textos[i], es_tulti)
+    # to_datetime: una columna vacía o sin una sola fecha también sale como datetime
+    return pd.to_datetime(pd.Series(por_codigo(fechas, codigos, pd.NaT), index=col.index))
+
+def procesar_drive(file, nombre_agencia):
+    """Solicitudes del Drive de una agencia, con FECHA_SOLICITUD_DT ya normalizada."""
+    es_tulti = nombre_agencia == "TULTITLAN"
+    df = pd.read_csv(file, header=6 if es_tulti else 1, encoding='latin1')
+    df.columns = df.columns.str.strip()
+    if not es_tulti and 'CANCELAR (X)' in df.columns: df = df[df['CANCELAR (X)'].isna()]
+    col_orden = 'Observaciones' if es_tulti else 'Orden de Compra'
+    df = df.rename(columns={'Fecha': 'FECHA_SOLICITUD', 'Vendedor': 'VENDEDOR', 'No. De Parte': 'NP', 'Descripcion': 'DESCRIPCION', 'Cantidad': 'CANTIDAD', col_orden: 'ORDEN_COMPRA'})
+    df['AGENCIA'] = nombre_agencia
+    df['FECHA_SOLICITUD_DT'] = limpiar_fechas(df['FECHA_SOLICITUD'], es_tulti)
+    return df
+
+def calcular_drive_no_vendido(df_drive, df_ventas):
+    """
+    Solicitudes de Drive con sobrante: lo pedido menos lo vendido en la misma AGENCIA y NP
+    desde la fecha de la solicitud. Las ventas se ordenan una sola vez por (AGENCIA, NP, FECHA)
+    con sumas acumuladas inversas por grupo, y cada solicitud se resuelve con búsqueda binaria.
+    """
+    if df_drive.empty: return pd.DataFrame()
+    ventas = df_ventas[df_ventas['FECHA'].notna()]
+    n_v = len(ventas)
+    # Desde cruzar_bases el NP ya llega como código del catálogo; factorize también acepta el NP crudo (compara como ==)
+    cod_agencia, agencias = pd.factorize(pd.concat([ventas['AGENCIA'], df_drive['AGENCIA']], ignore_index=True))
+    cod_np, _ = pd.factorize(pd.concat([ventas['NP'], df_drive['NP']], ignore_index=True))
+    codigos, _ = pd.factorize(cod_np.astype(np.int64) * (len(agencias) + 1) + cod_agencia)
+    fechas = np.concatenate([ventas['FECHA'].to_numpy('datetime64[ns]'), df_drive['FECHA_SOLICITUD_DT'].to_numpy('datetime64[ns]')])
+    _, rango_fecha = np.unique(fechas, return_inverse=True)
+    llave = codigos.astype(np.int64) * (int(rango_fecha.max()) + 1) + rango_fecha
+
+    orden = np.argsort(llave[:n_v], kind='stable')
+    llave_v, codigo_v = llave[:n_v][orden], codigos[:n_v][orden]
+    cantidades = ventas['CANTIDAD'].fillna(0).to_numpy()[orden]
+    vendido_desde = pd.Series(cantidades[::-1]).groupby(codigo_v[::-1]).cumsum().to_numpy()[::-1]
+
+    pos = np.searchsorted(llave_v, llave[n_v:], side='left')
+    fin_grupo = np.searchsorted(codigo_v, codigos[n_v:], side='right')
+    en_grupo = pos < fin_grupo
+    vendido = np.where(en_grupo, vendido_desde[np.minimum(pos, max(n_v - 1, 0))] if n_v else 0, 0)
+
+    sobrante = df_drive['CANTIDAD'] - vendido
+    con_sobrante = (sobrante > 0).to_numpy()
+    if not con_sobrante.any(): return pd.DataFrame()
+    hoja_drive = df_drive[con_sobrante].drop(columns='FECHA_SOLICITUD_DT').reset_index(drop=True)
+    hoja_drive['FECHA_SOLICITUD'] = df_drive['FECHA_SOLICITUD_DT'][con_sobrante].dt.strftime('%d/%m/%Y').to_numpy()
+    hoja_drive['CANTIDAD_VENDIDA'] = vendido[con_sobrante]
+    hoja_drive['SOBRANTE'] = sobrante[con_sobrante].to_numpy()
+    hoja_drive = hoja_drive[['AGENCIA', 'FECHA_SOLICITUD', 'VENDEDOR', 'NP', 'DESCRIPCION', 'CANTIDAD', 'CANTIDAD_VENDIDA', 'SOBRANTE', 'ORDEN_COMPRA']]
+    return hoja_drive.sort_values(by='SOBRANTE', ascending=False)
+
+@medido()
+def cruzar_bases(df_compras, df_traspasos, df_ventas, df_drive):
+    """
+    Fase 5: (hoja General_Compras_Ventas, hoja Drive_No_Vendido). Los NP de las cuatro bases pasan a códigos de un
+    mismo catálogo, así 12345, 12345.0 y "12345" cruzan entre BPro, Ventas Master y el Drive; el NP vuelve a texto al final.
+    """
+    catalogo, (df_compras, df_traspasos, df_ventas, df_drive) = codificar_tablas([df_compras, df_traspasos, df_ventas, df_drive], 'NP')
+    agg_com = df_compras.groupby(['AGENCIA', 'NP'], observed=True).agg({'CANTIDAD': 'sum', 'DESCRIPCION': 'first', 'FECHA': 'max'}).reset_index().rename(columns={'CANTIDAD': 'COMPRADO', 'FECHA': 'ULT_COMPRA'})
+    agg_tra = df_traspasos.groupby(['AGENCIA', 'NP'], observed=True).agg({'CANTIDAD': 'sum'}).reset_index().rename(columns={'CANTIDAD': 'TRASPASADO'})
+    agg_ven = df_ventas.groupby(['AGENCIA', 'NP'], observed=True).agg({'CANTIDAD': 'sum', 'FECHA': 'max'}).reset_index().rename(columns={'CANTIDAD': 'VENDIDO', 'FECHA': 'ULT_VENTA'})
+
+    hoja_gral = pd.merge(agg_com, agg_tra, on=['AGENCIA', 'NP'], how='left')
+    hoja_gral = pd.merge(hoja_gral, agg_ven, on=['AGENCIA', 'NP'], how='left').fillna(0)
+    hoja_gral['ULT_COMPRA'] = hoja_gral['ULT_COMPRA'].dt.strftime('%d/%m/%Y').replace('NaT', 'Sin Fecha')
+    hoja_gral['ULT_VENTA'] = pd.to_datetime(hoja_gral['ULT_VENTA']).dt.strftime('%d/%m/%Y').replace('NaT', 'Sin Venta')
+    hoja_gral = hoja_gral[['AGENCIA', 'NP', 'DESCRIPCION', 'COMPRADO', 'TRASPASADO', 'VENDIDO', 'ULT_COMPRA', 'ULT_VENTA']]
+    return con_texto(hoja_gral, 'NP', catalogo), con_texto(calcular_drive_no_vendido(df_drive, df_ventas), 'NP', catalogo)
+
+# --- FASES 1-3 Y REPORTE FINAL ---
+def parsear_entradas(compras, drive, traspasos):
+    """
+    Fases 1-3 en el pool de procesos, un trabajo por archivo. Cada argumento es {agencia: archivo} (traspasos
+    puede traer solo algunas agencias). Devuelve los tres dicts con el resultado de cada archivo; el de traspasos
+    es (datos, filas apartadas por CANTIDAD o COSTO no numérico).
+    """
+    trabajos = [(procesar_compras, f, a) for a, f in compras.items()] + [(procesar_drive, f, a) for a, f in drive.items()]
+    resultados = iter(ejecutar(trabajos + [(procesar_traspasos, f, a) for a, f in traspasos.items()]))
+    return tuple({a: next(resultados) for a in entrada} for entrada in (compras, drive, traspasos))
+
+@medido()
+def base_compras(compras):
+    df_compras = pd.concat([columnas_cruce(df) for df in compras.values()], ignore_index=True)
+    df_compras['FECHA'] = pd.to_datetime(df_compras['FECHA'], dayfirst=True, errors='coerce')
+    return df_compras
+
+@medido()
+def base_traspasos(dfs_trasp):
+    dfs_trasp = list(dfs_trasp)
+    return pd.concat(dfs_trasp, ignore_index=True) if dfs_trasp else pd.DataFrame(columns=['AGENCIA', 'NP', 'CANTIDAD'])
+
+@medido()
+def base_drive(drive, anio=ANIO_CRUCE):
+    """Solicitudes de ambas agencias con fecha, vendedor y NP, del año del cruce."""
+    df_drive = pd.concat(list(drive.values()), ignore_index=True)
+    for col in ['FECHA_SOLICITUD_DT', 'VENDEDOR', 'NP']: df_drive[col] = df_drive[col].replace(r'^\s*$', np.nan, regex=True)
+    df_drive = df_drive.dropna(subset=['FECHA_SOLICITUD_DT', 'VENDEDOR', 'NP'])
+    return df_drive[df_drive['FECHA_SOLICITUD_DT'].dt.year == anio]
+
+def hojas_power_bi(hoja_gral, hoja_drive):
+    if hoja_drive.empty: hoja_drive = pd.DataFrame({'Msg': ['Todo vendido']})
+    return {'General_Compras_Ventas': hoja_gral, 'Drive_No_Vendido': hoja_drive}
@@ -0,0 +1,123 @@
+import atexit
+import concurrent.futures
+import hashlib
+import multiprocessing
+import os
+import tempfile
+
+from cache_parseo import CACHE_DIR, carpeta_privada, contenido_archivo, desalojar
+from lector_excel import UMBRAL_STREAMING_MB, iterar_bloques, leer_hojas, nombre_archivo, nombres_hojas, tamano_mb
+from parsers_bpro import en_lotes, parsear_hoja_aislada, reconciliar_hojas, resultado_de_lotes
+from rendimiento import agregar, llamar, trabajo_medido
+
+# --- CAPA DE EJECUCIÓN: POOL DE PROCESOS PARA PARSEOS ---
+# Los parseos de archivos y de hojas son independientes y de CPU, así que se reparten en un pool
+# de procesos (spawn: el servidor de Streamlit tiene hilos y un fork los copiaría a medias).
+# Los archivos subidos se pasan a los procesos como ruta a una copia en disco, no como bytes.
+TRABAJADORES = int(os.environ.get("LIMPIADOR_TRABAJADORES", len(os.sched_getaffinity(0)) if hasattr(os, "sched_getaffinity") else os.cpu_count() or 1))
+POOL = None
+
+def sin_pool_anidado():
+    global TRABAJADORES
+    TRABAJADORES = 1  # un proceso del pool nunca abre su propio pool
+
+def obtener_pool():
+    global POOL
+    if POOL is None:
+        POOL = concurrent.futures.ProcessPoolExecutor(max_workers=TRABAJADORES, mp_context=multiprocessing.get_context("spawn"),
+                                                      initializer=sin_pool_anidado)
+        atexit.register(POOL.shutdown, cancel_futures=True)
+    return POOL
+
+def como_ruta(file):
+    """Copia (una sola vez, por hash de contenido) un archivo subido a disco para que otro proceso lo abra por ruta."""
+    if isinstance(file, (str, os.PathLike)): return os.fspath(file)
+    datos = contenido_archivo(file)
+    carpeta = os.path.join(CACHE_DIR, "subidas")
+    carpeta_privada(carpeta)
+    ruta = os.path.join(carpeta, hashlib.sha256(datos).hexdigest() + os.path.splitext(nombre_archivo(file))[1].lower())
+    if not os.path.exists(ruta):
+        with tempfile.NamedTemporaryFile(dir=carpeta, delete=False) as tmp: tmp.write(datos)
+        os.replace(tmp.name, ruta)
+        desalojar(base=carpeta)
+    return ruta
+
+def es_archivo(valor):
+    return hasattr(valor, "read") and hasattr(valor, "seek")
+
+def ejecutar(trabajos):
+    """
+    Corre cada trabajo (fn, *args) y devuelve sus resultados en el mismo orden. Con un solo trabajo,
+    un solo núcleo o si el pool se rompe, se ejecuta en el proceso actual. Las funciones deben ser de
+    nivel de módulo; los archivos subidos entre los args se convierten en rutas.
+    """
+    trabajos = [(fn, *[como_ruta(a) if es_archivo(a) else a for a in args]) for fn, *args in trabajos]
+    if len(trabajos) <= 1 or TRABAJADORES <= 1: return [llamar(etiqueta(fn, args), fn, *args) for fn, *args in trabajos]
+    global POOL
+    try:
+        # Cada trabajo se mide en el proceso que lo corre (tiempo y RSS del worker) y la medición vuelve con el resultado
+        futuros = [obtener_pool().submit(trabajo_medido, etiqueta(fn, args), fn, *args) for fn, *args in trabajos]
+        resultados = []
+        for f in futuros:
+            resultado, medicion = f.result()
+            agregar(medicion)
+            resultados.append(resultado)
+        return resultados
+    except concurrent.futures.process.BrokenProcessPool:
+        POOL = None
+        return [llamar(etiqueta(fn, args), fn, *args) for fn, *args in trabajos]
+
+def etiqueta(fn, args):
+    """Nombre de un trabajo para el panel de rendimiento: la función y el archivo (o la hoja) que procesa."""
+    if fn is aplicar_a_hoja: fn, args = args[0], (args[2],)
+    nombre = f"{fn.__module__}.{fn.__qualname__}"
+    archivo = next((a for a in args if isinstance(a, str)), None)
+    return f"{nombre} · {os.path.basename(archivo)}" if archivo else nombre
+
+# --- PARSEO DE UN LIBRO: STREAMING, POR HOJA EN EL POOL O COMPLETO ---
+def aplicar_a_hoja(fn, ruta, hoja, args, omitir_errores):
+    """Trabajo del pool: lee una sola hoja del libro y devuelve fn(df, *args)."""
+    try: df = leer_hojas(ruta, nombres=[hoja])[hoja]
+    except Exception:
+        if omitir_errores: return None
+        raise
+    return fn(df, *args)
+
+def en_pool(hojas):
+    return len(hojas) > 1 and TRABAJADORES > 1
+
+def mapear_hojas(fn, file, args, hojas, omitir_errores=False):
+    """fn(df_hoja, *args) para cada hoja en orden: una hoja por trabajo del pool si conviene, si no aquí mismo."""
+    if en_pool(hojas):
+        ruta = como_ruta(file)
+        return ejecutar([(aplicar_a_hoja, fn, ruta, hoja, args, omitir_errores) for hoja in hojas])
+    libro = leer_hojas(file, nombres=hojas, omitir_errores=omitir_errores)
+    return [fn(df, *args) for df in libro.values()]
+
+def parsear_hoja_sola(df, parser_bloque, *args):
+    return next(en_lotes(parser_bloque, [(None, df)], *args), None)
+
+def parsear_archivo(parser_bloque, file, args, columnas, streaming=None, por_hoja=False, solo_primera=False, omitir_errores=False):
+    """
+    Punto único de parseo para los procesar_*: `parser_bloque` es una de las funciones *_bloque de
+    parsers_bpro y `columnas` las del resultado (una lista por DataFrame). `por_hoja` reinicia el contexto
+    en cada hoja; si no, los encabezados cruzan de una hoja a la siguiente.
+    - streaming (o archivo arriba de UMBRAL_STREAMING_MB con streaming=None): bloques de filas, memoria acotada.
+    - libro de varias hojas con más de un núcleo: una hoja por trabajo del pool, unidas en orden
+      (reconciliar_hojas arrastra el contexto a través de los cortes de hoja).
+    - si no, el libro completo en este proceso.
+    """
+    if streaming is None: streaming = tamano_mb(file) > UMBRAL_STREAMING_MB
+    if streaming:
+        bloques = iterar_bloques(file, solo_primera=solo_primera, omitir_errores=omitir_errores)
+        return resultado_de_lotes(en_lotes(parser_bloque, bloques, *args, por_hoja=por_hoja), *columnas)
+    hojas = nombres_hojas(file)[:1 if solo_primera else None]
+    if not en_pool(hojas):
+        libro = leer_hojas(file, nombres=hojas, omitir_errores=omitir_errores)
+        return resultado_de_lotes(en_lotes(parser_bloque, libro, *args, por_hoja=por_hoja), *columnas)
+    if por_hoja:
+        lotes = [l for l in mapear_hojas(parsear_hoja_sola, file, (parser_bloque, *args), hojas, omitir_errores) if l is not None]
+    else:
+        aisladas = [r for r in mapear_hojas(parsear_hoja_aislada, file, (parser_bloque, *args), hojas, omitir_errores) if r is not None]
+        lotes = reconciliar_hojas(parser_bloque, aisladas, *args)
+    return resultado_de_lotes(lotes, *columnas)
@@ -0,0 +1,215 @@
+import contextlib
+import gzip
+import io
+import os
+import queue
+import tempfile
+import threading
+import time
+import uuid
+import zipfile
+
+from rendimiento import medido
+
+# --- EXPORTACIÓN DE RESULTADOS (EXCEL / PARQUET / CSV.GZ) ---
+# Las bases unificadas y el reporte de Power BI pasan de cientos de miles de filas. El Excel se escribe
+# directo con xlsxwriter en modo constant_memory (cada fila se vuelca a disco en cuanto se escribe, en
+# lugar de armar todas las celdas en memoria como hace to_excel) y el libro final se escribe a un archivo en
+# carpeta_exportaciones(): las funciones devuelven su ruta, nunca los bytes. La página lo entrega con descarga()
+# (se lee del disco hasta que el usuario da clic), la caché de reportes lo mueve a su carpeta y el CLI a la salida;
+# lo que nadie movió se borra a las TTL_HORAS. Parquet y CSV.gz son alternativas que Power BI carga mucho más
+# rápido que un .xlsx. pandas y xlsxwriter se importan dentro de las funciones: las páginas importan este módulo
+# (FORMATOS) al primer render, antes de que haya datos que exportar.
+TTL_HORAS = float(os.environ.get("LIMPIADOR_EXPORT_TTL_H", 6))
+MAX_FILAS_EXCEL = 1_048_576
+FILAS_POR_TRAMO = 20_000
+
+# formato -> (extensión, MIME)
+FORMATOS = {
+    "Excel": ("xlsx", "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"),
+    "Parquet": ("parquet", "application/vnd.apache.parquet"),
+    "CSV.gz": ("csv.gz", "application/gzip"),
+}
+
+# Encabezado en negritas con borde (el de to_excel antes de pandas 3) y el mismo formato de fechas que to_excel
+FORMATO_ENCABEZADO = {"bold": True, "border": 1, "align": "center", "valign": "top"}
+FORMATO_GRUPO = {"bold": True, "border": 1, "align": "center", "valign": "vcenter"}
+FORMATO_FECHA = "yyyy-mm-dd hh:mm:ss"
+OPCIONES_LIBRO = {"constant_memory": True, "tmpdir": tempfile.gettempdir(), "default_date_format": FORMATO_FECHA}
+
+def carpeta_exportaciones():
+    return os.path.join(tempfile.gettempdir(), "limpiador_exportaciones")
+
+def purgar():
+    """Borra las exportaciones de más de TTL_HORAS: ya se descargaron o nadie las va a pedir."""
+    limite = time.time() - TTL_HORAS * 3600
+    try: entradas = list(os.scandir(carpeta_exportaciones()))
+    except OSError: return
+    for e in entradas:
+        try:
+            if e.stat().st_mtime < limite: os.remove(e.path)
+        except OSError: pass  # otra sesión ya lo borró o lo movió
+
+@contextlib.contextmanager
+def archivo_temporal(extension):
+    """Ruta nueva en carpeta_exportaciones(); si escribirla falla, el archivo a medias se borra."""
+    purgar()
+    os.makedirs(carpeta_exportaciones(), exist_ok=True)
+    # Nombre único, sin crear el archivo: mkstemp lo dejaría con permisos 0600 (el CLI lo mueve a la salida tal cual)
+    ruta = os.path.join(carpeta_exportaciones(), f"{uuid.uuid4().hex}.{extension}")
+    try: yield ruta
+    except BaseException:
+        with contextlib.suppress(OSError): os.remove(ruta)
+        raise
+
+def descarga(ruta):
+    """`data` para st.download_button(..., on_click="ignore"): el archivo se lee hasta que el usuario da clic."""
+    def leer():
+        with open(ruta, "rb") as f: return f.read()
+    return leer
+
+def valores_celda(col):
+    """Valores de una columna listos para write_row: nulos -> None (celda vacía), categorías y texto Arrow -> objetos de Python."""
+    import pandas as pd
+    if isinstance(col.dtype, pd.CategoricalDtype): col = col.astype(object)
+    if pd.api.types.is_bool_dtype(col) or pd.api.types.is_integer_dtype(col) and not col.hasnans: return col.tolist()
+    return col.astype(object).where(col.notna(), None).tolist()
+
+def nueva_hoja(libro, df, hoja, filas_encabezado):
+    if len(df) + filas_encabezado > MAX_FILAS_EXCEL:
+        raise ValueError(f"La hoja {hoja} tiene {len(df)} filas, más de las que admite Excel; descárgala en Parquet o CSV.gz.")
+    return libro.add_worksheet(hoja)
+
+def escribir_filas(ws, df, primera_fila):
+    # constant_memory exige escribir fila por fila en orden: cada tramo se convierte columna por columna y se
+    # recorre con zip, así en memoria solo hay objetos de Python para FILAS_POR_TRAMO filas a la vez
+    for inicio in range(0, len(df), FILAS_POR_TRAMO):
+        tramo = df.iloc[inicio:inicio + FILAS_POR_TRAMO]
+        for i, fila in enumerate(zip(*(valores_celda(tramo[c]) for c in tramo.columns)), start=primera_fila + inicio):
+            ws.write_row(i, 0, fila)
+
+def escribir_hoja(libro, df, hoja, encabezado):
+    ws = nueva_hoja(libro, df, hoja, 1)
+    ws.write_row(0, 0, [str(c) for c in df.columns], encabezado)
+    escribir_filas(ws, df, 1)
+
+def excel(hojas):
+    """`hojas` es {nombre_hoja: DataFrame}. Devuelve la ruta del .xlsx."""
+    import xlsxwriter
+    with archivo_temporal("xlsx") as ruta:
+        libro = xlsxwriter.Workbook(ruta, OPCIONES_LIBRO)
+        encabezado = libro.add_format(FORMATO_ENCABEZADO)
+        for hoja, df in hojas.items(): escribir_hoja(libro, df, hoja, encabezado)
+        libro.close()
+    return ruta
+
+# --- REPORTES CON ENCABEZADO DE DOS NIVELES ---
+# Las columnas "<almacén>_<dato>" de los reportes FIFO se agrupan bajo el almacén: la primera fila lleva el
+# almacén combinado sobre sus columnas y la segunda el dato; las columnas sin "_" ocupan las dos filas.
+def niveles_encabezado(columnas):
+    niveles = []
+    for c in map(str, columnas):
+        grupo, _, dato = c.rpartition("_")
+        niveles.append((grupo, dato) if grupo else (c, ""))
+    return niveles
+
+def escribir_encabezado(ws, columnas, formatos):
+    niveles = niveles_encabezado(columnas)
+    # Fila 1 completa antes de tocar la fila 2: en constant_memory una fila ya volcada no se puede reescribir
+    j = 0
+    while j < len(niveles):
+        grupo, dato = niveles[j]
+        fin = j
+        while dato and fin + 1 < len(niveles) and niveles[fin + 1][0] == grupo and niveles[fin + 1][1]: fin += 1
+        if fin > j: ws.merge_range(0, j, 0, fin, grupo, formatos["grupo"])
+        else: ws.write(0, j, grupo, formatos["grupo"] if dato else formatos["encabezado"])
+        j = fin + 1
+    for j, (grupo, dato) in enumerate(niveles):
+        # merge_range ya no reescribe la celda de la fila 1 (quedó escrita arriba), solo registra la combinación
+        if dato: ws.write(1, j, dato, formatos["encabezado"])
+        else: ws.merge_range(0, j, 1, j, grupo, formatos["encabezado"])
+
+def escribir_reporte(libro, df, hoja, formatos):
+    if not any(dato for _, dato in niveles_encabezado(df.columns)): return escribir_hoja(libro, df, hoja, formatos["encabezado"])
+    ws = nueva_hoja(libro, df, hoja, 2)
+    escribir_encabezado(ws, df.columns, formatos)
+    escribir_filas(ws, df, 2)
+
+def producir_en_hilo(hojas):
+    """
+    Recorre `hojas` en un hilo aparte con una cola de una hoja: mientras se escribe la hoja N, el generador
+    ya calcula la N+1. Los errores del generador se relanzan del lado que escribe.
+    """
+    cola, fin = queue.Queue(maxsize=1), object()
+    def producir():
+        try:
+            for item in hojas: cola.put(item)
+        except BaseException as e: cola.put(e)
+        finally: cola.put(fin)
+    threading.Thread(target=producir, daemon=True).start()
+    while (item := cola.get()) is not fin:
+        if isinstance(item, BaseException): raise item
+        yield item
+
+@medido()
+def libro_reportes(hojas, en_paralelo=True):
+    """
+    `hojas` es un iterable de (nombre_hoja, DataFrame), normalmente un generador que calcula cada hoja; las
+    vacías o None se omiten. Devuelve la ruta del .xlsx, o None si no se escribió ninguna hoja. Los formatos
+    de celda se crean una vez por libro y se comparten entre hojas.
+    """
+    import xlsxwriter
+    with archivo_temporal("xlsx") as ruta:
+        libro = xlsxwriter.Workbook(ruta, OPCIONES_LIBRO)
+        formatos = {"encabezado": libro.add_format(FORMATO_ENCABEZADO), "grupo": libro.add_format(FORMATO_GRUPO)}
+        escritas = 0
+        for hoja, df in producir_en_hilo(hojas) if en_paralelo else hojas:
+            if df is None or df.empty: continue
+            escribir_reporte(libro, df, hoja, formatos)
+            escritas += 1
+        libro.close()
+    if escritas: return ruta
+    os.remove(ruta)
+    return None
+
+def para_arrow(df):
+    """Parquet no acepta columnas object con tipos mezclados (NP int/str): esas se exportan como texto."""
+    import pandas as pd
+    mezcladas = [c for c in df.columns if df[c].dtype == object and pd.api.types.infer_dtype(df[c], skipna=True) not in ("string", "empty")]
+    if not mezcladas: return df
+    return df.assign(**{c: df[c].where(df[c].isna(), df[c].astype(str)) for c in mezcladas})
+
+def parquet(df, destino):
+    para_arrow(df).to_parquet(destino, index=False)
+
+def bytes_parquet(df):
+    buffer = io.BytesIO()
+    parquet(df, buffer)
+    return buffer.getvalue()
+
+def csv_gz(df, destino):
+    with gzip.GzipFile(fileobj=destino, mode="wb", compresslevel=6) as gz, io.TextIOWrapper(gz, encoding="utf-8", newline="") as texto:
+        df.to_csv(texto, index=False, chunksize=20_000)
+
+@medido()
+def exportar(hojas, formato, nombre):
+    """
+    Devuelve (ruta, nombre_archivo, mime); la ruta va a st.download_button con descarga(). En Parquet y
+    CSV.gz cada hoja es un archivo; si hay más de una hoja se entregan juntas en un .zip.
+    """
+    extension, mime = FORMATOS[formato]
+    if formato == "Excel": return excel(hojas), f"{nombre}.{extension}", mime
+    escribir = parquet if formato == "Parquet" else csv_gz
+    if len(hojas) > 1: extension, mime = "zip", "application/zip"
+    with archivo_temporal(extension) as ruta, open(ruta, "wb") as destino:
+        if len(hojas) == 1:
+            escribir(next(iter(hojas.values())), destino)
+        else:
+            # Ya van comprimidos: el zip solo los agrupa
+            with zipfile.ZipFile(destino, "w", zipfile.ZIP_STORED) as zf:
+                for hoja, df in hojas.items():
+                    with zf.open(f"{hoja}.{FORMATOS[formato][0]}", "w", force_zip64=True) as f:
+                        # Arrow necesita un archivo con tell(); el miembro del zip no lo tiene
+                        if formato == "Parquet": f.write(bytes_parquet(df))
+                        else: escribir(df, f)
+    return ruta, f"{nombre}.{extension}", mime
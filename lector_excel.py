@@ -0,0 +1,147 @@
+import importlib.util
+import os
+
+import numpy as np
+import pandas as pd
+
+# --- INGESTA DE REPORTES BPRO EN EXCEL ---
+# Un solo punto de lectura para todos los parsers: el libro se abre una vez, se usa el motor más
+# rápido disponible y solo se traen las columnas que los parsers usan (A y C–L). Las columnas quedan
+# etiquetadas por su posición original (0..11) para que row[2], df[3], etc. sigan significando lo mismo.
+COLUMNAS_BPRO = (0,) + tuple(range(2, 12))
+
+HAY_CALAMINE = importlib.util.find_spec("python_calamine") is not None
+
+# Modo streaming: bloques de N filas en lugar de hojas completas. Se activa solo arriba del umbral
+# (o explícitamente con streaming=True) porque para archivos chicos leer todo de golpe es más rápido.
+FILAS_POR_BLOQUE = int(os.environ.get("LIMPIADOR_FILAS_POR_BLOQUE", 20_000))
+UMBRAL_STREAMING_MB = float(os.environ.get("LIMPIADOR_STREAMING_MB", 25))
+
+def nombre_archivo(file):
+    if isinstance(file, (str, os.PathLike)): return os.fspath(file)
+    return getattr(file, "name", "") or ""
+
+def es_xlsx(file):
+    """Los .xlsx/.xlsm son zip (PK\\x03\\x04); los .xls de BPro son BIFF dentro de un contenedor OLE."""
+    if isinstance(file, (str, os.PathLike)):
+        with open(file, "rb") as f: return f.read(4) == b"PK\x03\x04"
+    pos = file.tell()
+    firma = file.read(4)
+    file.seek(pos)
+    return firma == b"PK\x03\x04"
+
+def tamano_mb(file):
+    if isinstance(file, (str, os.PathLike)): return os.path.getsize(file) / 2**20
+    if getattr(file, "size", None) is not None: return file.size / 2**20
+    return len(file.getvalue()) / 2**20 if hasattr(file, "getvalue") else 0.0
+
+def motor_excel(file):
+    """
+    calamine (lector en Rust, pandas >= 2.2) si está instalado: lee .xls y .xlsx varias veces más rápido.
+    Si no, openpyxl en modo streaming para .xlsx y xlrd para .xls.
+    """
+    if HAY_CALAMINE: return "calamine"
+    nombre = nombre_archivo(file).lower()
+    if nombre.endswith(".xls"): return "xlrd"
+    if nombre.endswith((".xlsx", ".xlsm")): return "openpyxl"
+    return None  # sin nombre: pandas detecta el formato por el contenido
+
+def a_dataframe(filas, ancho):
+    """Filas crudas -> DataFrame como lo entrega read_excel(header=None): NaN en vacíos y sin filas vacías al final."""
+    while filas and all(v is None for v in filas[-1]): filas.pop()
+    df = pd.DataFrame(filas, columns=range(ancho)) if filas else pd.DataFrame(columns=range(ancho))
+    return df.fillna(np.nan).infer_objects()
+
+def filas_openpyxl(ws, ancho):
+    """
+    Filas de una hoja abierta en read-only + values_only, cortadas en la última columna usada:
+    evita la conversión celda por celda de pandas y nunca materializa las columnas de la derecha.
+    """
+    ws.reset_dimensions()  # BPro a veces escribe una dimensión incorrecta en el XML
+    for fila in ws.iter_rows(values_only=True, max_col=ancho):
+        yield fila + (None,) * (ancho - len(fila))
+
+def hojas_openpyxl(file, seleccion, columnas, omitir_errores):
+    import openpyxl
+    ancho = max(columnas) + 1
+    wb = openpyxl.load_workbook(file, read_only=True, data_only=True)
+    try:
+        hojas = {}
+        for nombre in seleccion(wb.sheetnames):
+            try: df = a_dataframe(list(filas_openpyxl(wb[nombre], ancho)), ancho)
+            except Exception:
+                if omitir_errores: continue
+                raise
+            hojas[nombre] = df[list(columnas)].reindex(columns=range(ancho))
+        return hojas
+    finally:
+        wb.close()
+
+def selector_hojas(solo_primera=False, nombres=None):
+    if nombres is not None: return lambda disponibles: [h for h in disponibles if h in set(nombres)]
+    return lambda disponibles: disponibles[:1] if solo_primera else list(disponibles)
+
+def nombres_hojas(file):
+    """Nombres de las hojas sin leer su contenido (openpyxl read-only y calamine solo abren el índice del libro)."""
+    if hasattr(file, "seek"): file.seek(0)
+    with pd.ExcelFile(file, engine=motor_excel(file)) as xls: return list(xls.sheet_names)
+
+def leer_hojas(file, solo_primera=False, columnas=COLUMNAS_BPRO, omitir_errores=False, motor=None, nombres=None):
+    """
+    Devuelve {nombre_hoja: DataFrame} (header=None) en el orden del libro.
+    `solo_primera` replica pd.read_excel(file) sin sheet_name y `nombres` limita la lectura a esas hojas;
+    con `omitir_errores` una hoja ilegible se salta en lugar de abortar todo el libro.
+    """
+    columnas = tuple(columnas)
+    motor = motor or motor_excel(file)
+    seleccion = selector_hojas(solo_primera, nombres)
+    if hasattr(file, "seek"): file.seek(0)
+    if motor == "openpyxl": return hojas_openpyxl(file, seleccion, columnas, omitir_errores)
+    usadas, ancho = set(columnas), range(max(columnas) + 1)
+    hojas = {}
+    with pd.ExcelFile(file, engine=motor) as xls:
+        for hoja in seleccion(xls.sheet_names):
+            try: df = xls.parse(hoja, header=None, usecols=lambda c: c in usadas)
+            except Exception:
+                if omitir_errores: continue
+                raise
+            hojas[hoja] = df.reindex(columns=ancho)
+    return hojas
+
+def iterar_bloques(file, filas_por_bloque=FILAS_POR_BLOQUE, solo_primera=False, columnas=COLUMNAS_BPRO, omitir_errores=False):
+    """
+    Genera (nombre_hoja, DataFrame) de a lo más `filas_por_bloque` filas, en orden, sin tener nunca
+    la hoja completa en memoria. Los .xlsx se leen siempre con openpyxl read-only (calamine carga la
+    hoja entera); los .xls se leen completos porque BIFF no permite streaming, pero topan en 65,536 filas por hoja.
+    Con `omitir_errores` una hoja que falla a medio camino conserva los bloques ya entregados.
+    """
+    columnas = tuple(columnas)
+    ancho = max(columnas) + 1
+    if hasattr(file, "seek"): file.seek(0)
+    if not es_xlsx(file):
+        for hoja, df in leer_hojas(file, solo_primera, columnas, omitir_errores, motor="calamine" if HAY_CALAMINE else "xlrd").items():
+            for inicio in range(0, len(df), filas_por_bloque): yield hoja, df.iloc[inicio:inicio + filas_por_bloque]
+        return
+
+    import openpyxl
+    wb = openpyxl.load_workbook(file, read_only=True, data_only=True)
+    try:
+        for ws in (wb.worksheets[:1] if solo_primera else wb.worksheets):
+            try:
+                filas = []
+                for fila in filas_openpyxl(ws, ancho):
+                    filas.append(fila)
+                    if len(filas) == filas_por_bloque:
+                        yield ws.title, a_bloque(filas, columnas, ancho)
+                        filas = []
+                if filas: yield ws.title, a_bloque(filas, columnas, ancho)
+            except Exception:
+                if omitir_errores: continue
+                raise
+    finally:
+        wb.close()
+
+def a_bloque(filas, columnas, ancho):
+    # Sin inferir tipos: un bloque no ve la hoja completa, las celdas conservan el tipo que trae Excel
+    df = pd.DataFrame(filas, columns=range(ancho), dtype=object).fillna(np.nan)
+    return df[list(columnas)].reindex(columns=range(ancho))
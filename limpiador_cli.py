@@ -0,0 +1,221 @@
+"""
+Corrida batch (sin Streamlit) de los tres flujos del limpiador sobre una carpeta de exports de BPro:
+
+    python limpiador_cli.py config.json [--jobs N] [--salida DIR] [--formato Excel|Parquet|CSV.gz]
+
+config.json (las rutas son relativas al archivo de configuración; con comodines se toma el archivo más reciente):
+
+    {
+      "historico": false,
+      "unificacion": {"compras": {"CUAUTITLAN": "bpro/compras_cu*.xlsx", "TULTITLAN": "..."},
+                      "traspasos": {"CUAUTITLAN": "...", "TULTITLAN": "..."}},
+      "fifo": {"agencias": {"CUAUTITLAN": {"compras": "...", "traspasos": "...", "ventas": "...",
+                                           "almacenes": {"ALMACEN X": "No Considerar"},
+                                           "nomenclaturas": {"ventas": ["VRCU"]}},
+                            "TULTITLAN": {...}},
+               "ventas_manuales": {"ALMACEN Y": "manuales/almacen_y.xlsx"},
+               "reportes": ["general", "mensual", "remanentes"]},
+      "cruce": {"compras": {...}, "traspasos": {...}, "drive": {"CUAUTITLAN": "drive_cu.csv", "TULTITLAN": "..."},
+                "ventas_master": "https://drive.google.com/file/d/... | ventas/ | ventas.csv", "anio": 2026}
+    }
+
+Cada sección es opcional. Todos los archivos de BPro y del Drive se parsean en un solo lote del pool de procesos
+(--jobs procesos; por omisión LIMPIADOR_TRABAJADORES o los núcleos disponibles) y pasan por la misma caché de
+parseo que la interfaz. Sale con código 1 si algo falla. Con --rendimiento archivo.jsonl cada fase (parseo de cada
+archivo, flujos, escritura) se agrega a ese archivo con su tiempo, filas y RSS, como LIMPIADOR_LOG_RENDIMIENTO.
+"""
+import argparse
+import glob
+import json
+import os
+import shutil
+import sys
+import time
+
+import pandas as pd
+
+import cruce_drive
+import ejecucion
+import reportes_fifo
+import rendimiento
+import unificacion
+from almacen_incremental import acumular
+from exportar import FORMATOS, exportar
+from rendimiento import corrida, fase
+from ventas_master import es_url, leer_ventas_master
+
+REPORTES_FIFO = {"general": ("Reporte_General", reportes_fifo.reporte_general),
+                 "mensual": ("Reporte_Mensual", reportes_fifo.reporte_mensual),
+                 "remanentes": ("Compras_sin_Venta_Exitosa", reportes_fifo.reporte_remanentes)}
+INICIO = time.perf_counter()
+
+def avisar(mensaje):
+    print(f"[{time.perf_counter() - INICIO:7.1f}s] {mensaje}", flush=True)
+
+# --- CONFIGURACIÓN ---
+def resolver(base, patron):
+    """Ruta relativa a la carpeta de la configuración; con comodines, el archivo más reciente que coincida."""
+    ruta = os.path.join(base, os.path.expanduser(patron))
+    if glob.has_magic(ruta):
+        coincidencias = glob.glob(ruta)
+        if not coincidencias: raise FileNotFoundError(f"Ningún archivo coincide con {patron}")
+        return max(coincidencias, key=os.path.getmtime)
+    if not os.path.exists(ruta): raise FileNotFoundError(f"No existe {ruta}")
+    return ruta
+
+def por_agencia(seccion, base):
+    return {agencia: resolver(base, patron) for agencia, patron in (seccion or {}).items()}
+
+def nomenclaturas(agencia, config_agencia):
+    if agencia not in reportes_fifo.NOMENCLATURAS: raise ValueError(f"Agencia desconocida {agencia}; usa {list(reportes_fifo.NOMENCLATURAS)}")
+    return {**reportes_fifo.NOMENCLATURAS[agencia], **config_agencia.get("nomenclaturas", {})}
+
+# --- PARSEO: UN SOLO LOTE PARA TODOS LOS ARCHIVOS ---
+def trabajos(config, base):
+    """(llave, (fn, archivo, *args)) de cada archivo de la configuración."""
+    uni = config.get("unificacion", {})
+    for agencia, ruta in por_agencia(uni.get("compras"), base).items(): yield ("unificacion", "compras", agencia), (unificacion.procesar_compras, ruta, agencia)
+    for agencia, ruta in por_agencia(uni.get("traspasos"), base).items(): yield ("unificacion", "traspasos", agencia), (unificacion.procesar_traspasos, ruta, agencia)
+
+    fifo = config.get("fifo", {})
+    for agencia, conf in fifo.get("agencias", {}).items():
+        nom = nomenclaturas(agencia, conf)
+        for tipo, fn in (("compras", reportes_fifo.procesar_compras), ("traspasos", reportes_fifo.parsear_traspasos_detallado), ("ventas", reportes_fifo.procesar_archivo_venta_individual)):
+            if conf.get(tipo): yield ("fifo", tipo, agencia), (fn, resolver(base, conf[tipo]), nom[tipo])
+    for almacen, ruta in por_agencia(fifo.get("ventas_manuales"), base).items():
+        yield ("fifo", "manuales", almacen), (reportes_fifo.procesar_archivo_venta_individual, ruta, reportes_fifo.NOMENCLATURAS_MANUALES)
+
+    cruce = config.get("cruce", {})
+    for tipo, fn in (("compras", cruce_drive.procesar_compras), ("drive", cruce_drive.procesar_drive), ("traspasos", cruce_drive.procesar_traspasos)):
+        for agencia, ruta in por_agencia(cruce.get(tipo), base).items(): yield ("cruce", tipo, agencia), (fn, ruta, agencia)
+
+def parsear(config, base):
+    pares = list(trabajos(config, base))
+    avisar(f"Parseando {len(pares)} archivos con {ejecucion.TRABAJADORES} procesos...")
+    resultados = dict(zip([llave for llave, _ in pares], ejecucion.ejecutar([trabajo for _, trabajo in pares])))
+    avisar("Parseo terminado.")
+    return resultados
+
+def de(resultados, seccion, tipo):
+    return {llave[2]: res for llave, res in resultados.items() if llave[:2] == (seccion, tipo)}
+
+def con_historico(nombre, df, agencia):
+    """Como en la interfaz: guarda lo nuevo en el almacén incremental y devuelve el histórico completo."""
+    historico, resumen = acumular(nombre, df, agencia)
+    avisar(f"Histórico {nombre} {agencia}: {resumen['nuevas']} registros nuevos, {resumen['duplicadas']} ya estaban.")
+    return historico
+
+def avisar_rechazados(nombre, agencia, rechazados):
+    if not rechazados.empty: avisar(f"{nombre} {agencia}: {len(rechazados)} filas con CANTIDAD o COSTO no numérico se apartaron.")
+
+# --- LOS TRES FLUJOS ---
+def correr_unificacion(resultados, usar_historico, escribir):
+    compras = [con_historico("compras", df, a) if usar_historico else df for a, df in de(resultados, "unificacion", "compras").items()]
+    traspasos = []
+    for agencia, (datos, rechazados) in de(resultados, "unificacion", "traspasos").items():
+        avisar_rechazados("Traspasos", agencia, rechazados)
+        traspasos.append(con_historico("traspasos", datos, agencia) if usar_historico else datos)
+    for dfs, nombre in ((compras, "Master_Compras"), (traspasos, "Master_Traspasos")):
+        if dfs: escribir({"Sheet1": unificacion.unir_bases(dfs)}, nombre)
+
+def almacenes_agencia(traspasos, acciones, agencia):
+    desconocidas = {a for a in acciones.values() if a not in reportes_fifo.ACCIONES}
+    if desconocidas: raise ValueError(f"{agencia}: acciones no válidas {sorted(desconocidas)}; usa {reportes_fifo.ACCIONES}")
+    for almacen in set(acciones) - set(traspasos): avisar(f"{agencia}: el almacén {almacen} de la configuración no aparece en los traspasos.")
+    return reportes_fifo.tabla_almacenes(traspasos, acciones)
+
+def correr_fifo(config, resultados, usar_historico, mover_archivo):
+    compras, traspasos, ventas = (de(resultados, "fifo", tipo) for tipo in ("compras", "traspasos", "ventas"))
+    manuales = de(resultados, "fifo", "manuales")
+    nom = {a: nomenclaturas(a, c) for a, c in config.get("agencias", {}).items()}
+    faltan = [f"{tipo} {a}" for a in cruce_drive.AGENCIAS for tipo, datos in (("compras", compras), ("traspasos", traspasos)) if a not in datos]
+    if faltan: raise ValueError(f"FIFO: faltan los archivos de {', '.join(faltan)}.")
+
+    if usar_historico:
+        compras = {a: con_historico("compras_fifo", df, nom[a]["compras"]) if reportes_fifo.es_dataframe_valido(df) else df for a, df in compras.items()}
+        ventas = {a: con_historico("ventas_fifo", df, nom[a]["ventas"][0]) if reportes_fifo.es_dataframe_valido(df) else df for a, df in ventas.items()}
+    datos_trasp = {}
+    for agencia, (por_destino, rechazados) in traspasos.items():
+        if not rechazados.empty: avisar(f"Traspasos {agencia}: {len(rechazados)} ítems con cantidad no numérica se apartaron.")
+        datos_trasp[agencia] = por_destino
+    almacenes = {a: almacenes_agencia(datos_trasp[a], config["agencias"][a].get("almacenes", {}), a) for a in cruce_drive.AGENCIAS}
+    for agencia, tabla in almacenes.items():
+        sin_venta = [alm for alm in tabla.loc[tabla["Acción"] == "Considerar", "Almacén Destino"] if alm not in manuales]
+        if sin_venta: avisar(f"{agencia}: {len(sin_venta)} almacenes a considerar sin archivo de ventas manuales.")
+
+    fuentes = (compras["CUAUTITLAN"], compras["TULTITLAN"], datos_trasp["CUAUTITLAN"], datos_trasp["TULTITLAN"],
+               ventas.get("CUAUTITLAN", pd.DataFrame()), ventas.get("TULTITLAN", pd.DataFrame()), manuales)
+    for reporte in config.get("reportes", list(REPORTES_FIFO)):
+        nombre, fn = REPORTES_FIFO[reporte]
+        mover_archivo(fn(fuentes, almacenes["CUAUTITLAN"], almacenes["TULTITLAN"]), f"{nombre}.xlsx")
+
+def correr_cruce(config, base, resultados, usar_historico, escribir):
+    compras, drive, res_trasp = (de(resultados, "cruce", tipo) for tipo in ("compras", "drive", "traspasos"))
+    faltan = [f"{tipo} {a}" for a in cruce_drive.AGENCIAS for tipo, datos in (("compras", compras), ("drive", drive)) if a not in datos]
+    if faltan or not config.get("ventas_master"): raise ValueError(f"Cruce: faltan {', '.join(faltan) or 'ventas_master'}.")
+    anio = config.get("anio", cruce_drive.ANIO_CRUCE)
+
+    if usar_historico: compras = {a: con_historico("compras", df, a) for a, df in compras.items()}
+    df_compras = cruce_drive.base_compras(compras)
+    dfs_trasp = {}
+    for agencia, (datos, rechazados) in res_trasp.items():
+        avisar_rechazados("Traspasos", agencia, rechazados)
+        dfs_trasp[agencia] = datos
+    if usar_historico:
+        # Igual que la interfaz: la agencia sin traspasos nuevos entra con su histórico
+        dfs_trasp = {a: df for a, df in ((a, con_historico("traspasos", dfs_trasp.get(a), a)) for a in cruce_drive.AGENCIAS) if not df.empty}
+    df_traspasos = cruce_drive.base_traspasos(dfs_trasp.values())
+    df_drive = cruce_drive.base_drive(drive, anio)
+
+    origen = config["ventas_master"] if es_url(config["ventas_master"]) else resolver(base, config["ventas_master"])
+    df_ventas, informe = leer_ventas_master(cruce_drive.obtener_enlace_directo_drive(origen), anio=anio)
+    avisar(cruce_drive.describir_ventas(informe))
+    hoja_gral, hoja_drive = cruce_drive.cruzar_bases(df_compras, df_traspasos, df_ventas, df_drive)
+    escribir(cruce_drive.hojas_power_bi(hoja_gral, hoja_drive), "Base_Final_PowerBI")
+
+# --- PUNTO DE ENTRADA ---
+def argumentos(argv):
+    p = argparse.ArgumentParser(description="Corre la unificación, los reportes FIFO y el cruce con el Drive sin Streamlit.")
+    p.add_argument("config", help="archivo JSON con las entradas de cada flujo")
+    p.add_argument("--jobs", "-j", type=int, default=None, help="procesos para el parseo (por omisión LIMPIADOR_TRABAJADORES o los núcleos)")
+    p.add_argument("--salida", "-o", default=None, help="carpeta de los reportes (por omisión, la de la configuración)")
+    p.add_argument("--formato", choices=list(FORMATOS), default="Excel", help="formato de las bases unificadas y la base final (los reportes FIFO son siempre Excel)")
+    p.add_argument("--rendimiento", default=None, help="archivo JSON lines donde agregar la medición de cada fase")
+    return p.parse_args(argv)
+
+def main(argv=None):
+    args = argumentos(argv)
+    if args.jobs is not None: ejecucion.TRABAJADORES = max(1, args.jobs)  # antes de crear el pool
+    if args.rendimiento: rendimiento.LOG_RENDIMIENTO = args.rendimiento
+    base = os.path.dirname(os.path.abspath(args.config))
+    salida = args.salida or base
+    try:
+        with open(args.config, encoding="utf-8") as f: config = json.load(f)
+        os.makedirs(salida, exist_ok=True)
+
+        def mover_archivo(ruta, nombre):
+            if ruta is None: return avisar(f"{nombre}: sin hojas que escribir.")
+            shutil.move(ruta, os.path.join(salida, nombre))
+            avisar(f"Escrito {os.path.join(salida, nombre)}")
+
+        def escribir(hojas, nombre):
+            ruta, archivo, _ = exportar(hojas, args.formato, nombre)
+            mover_archivo(ruta, archivo)
+
+        usar_historico = bool(config.get("historico"))
+        with corrida(os.path.basename(args.config)):
+            with fase("Parseo"): resultados = parsear(config, base)
+            if config.get("unificacion"):
+                with fase("Unificación"): correr_unificacion(resultados, usar_historico, escribir)
+            if config.get("fifo"):
+                with fase("FIFO"): correr_fifo(config["fifo"], resultados, usar_historico, mover_archivo)
+            if config.get("cruce"):
+                with fase("Cruce"): correr_cruce(config["cruce"], base, resultados, usar_historico, escribir)
+    except Exception as e:
+        avisar(f"Error: {type(e).__name__}: {e}")
+        return 1
+    avisar("Listo.")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,71 @@
+import functools
+import re
+from collections import namedtuple
+
+import numpy as np
+import pandas as pd
+
+# --- CLASIFICACIÓN DE FILAS DE LOS REPORTES BPRO ---
+# Todos los parsers deciden qué es cada fila por su columna A: encabezado (FACTURA:, SALIDA...HACIA,
+# REFERENCIA:), ítem por nomenclatura (CR*, TRAS*, CRCU, VRCU|VRTU...), TOTALES u otra cosa. Cada reporte
+# declara sus reglas una vez, en orden de prioridad y con los patrones ya compilados; clasificar_filas
+# resuelve el tipo de todas las filas del bloque con operaciones de columna.
+OTRA = "OTRA"
+
+PATRON_FECHA = re.compile(r"(\d{2}/\d{2}/\d{4})")
+PATRON_HACIA = re.compile(r"hacia", re.IGNORECASE)
+
+# Texto literal contenido en la celda o, con `al_inicio`, como prefijo: se resuelve sin regex (str.contains
+# con regex=False / str.startswith), que en columnas de texto es varias veces más rápido
+Literal = namedtuple("Literal", ["texto", "al_inicio"])
+
+def literal(texto, al_inicio=False):
+    return Literal(texto, al_inicio)
+
+def cumple(col, patron):
+    if isinstance(patron, Literal):
+        if patron.al_inicio: return col.str.startswith(patron.texto, na=False)
+        return col.str.contains(patron.texto, regex=False, na=False)
+    return col.str.contains(patron, na=False)
+
+@functools.lru_cache(maxsize=None)
+def patron_nomenclaturas(nomenclaturas):
+    """
+    Una sola alternación compilada por tupla de nomenclaturas (TRASUCCU|TRASAPROCU, VRCU|VRTU...), en
+    lugar de un `in` por nomenclatura. None si la tupla está vacía: la regla no aplica a ninguna fila.
+    """
+    return re.compile("|".join(map(re.escape, nomenclaturas))) if nomenclaturas else None
+
+def clasificar_filas(col, reglas):
+    """
+    `reglas` es una lista de (tipo, patrón, patrón, ...) con patrones compilados o literales: una fila es
+    del primer tipo cuyos patrones se encuentran todos en la celda. Las celdas nulas y las que no cumplen
+    ninguna regla son OTRA. Devuelve una Series categórica alineada con `col`.
+    """
+    codigos = np.full(len(col), len(reglas), dtype=np.int8)
+    pendiente = np.ones(len(col), dtype=bool)
+    for i, (_, *patrones) in enumerate(reglas):
+        si_cumple = pendiente.copy()
+        for patron in patrones:
+            if patron is None or not si_cumple.any():
+                si_cumple[:] = False
+                break
+            si_cumple &= cumple(col, patron).to_numpy(dtype=bool)
+        codigos[si_cumple] = i
+        pendiente &= ~si_cumple
+    return pd.Series(pd.Categorical.from_codes(codigos, categories=[tipo for tipo, *_ in reglas] + [OTRA]), index=col.index)
+
+# Reglas de cada reporte (la columna ya viene como la normaliza su parser)
+REGLAS_COMPRAS = [("FACTURA", literal("FACTURA:")), ("ITEM", literal("CR", al_inicio=True))]
+REGLAS_TRASPASOS = [("SALIDA_HACIA", literal("SALIDA", al_inicio=True), literal("HACIA")),
+                    ("SALIDA_TRASPASO", literal("SALIDA", al_inicio=True), literal("SALIDA DE ALMACEN POR TRASPASO")),
+                    ("SALIDA", literal("SALIDA", al_inicio=True)),
+                    ("REFERENCIA", literal("REFERENCIA:")),
+                    ("ITEM", literal("TRAS", al_inicio=True))]
+# Traspasos por destino: la columna conserva mayúsculas/minúsculas, los encabezados se reconocen sin distinguirlas
+REFERENCIA_DESTINOS = re.compile(r"^REFERENCIA:", re.IGNORECASE)
+TOTALES = ("TOTALES", re.compile(r"^TOTALES\Z", re.IGNORECASE))
+
+def reglas_por_nomenclatura(marca, nomenclaturas):
+    """Reportes del análisis FIFO: encabezado `marca` (literal o compilado) e ítems por nomenclatura."""
+    return [("MARCA", marca), ("ITEM", patron_nomenclaturas(tuple(nomenclaturas)))]
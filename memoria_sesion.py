@@ -0,0 +1,147 @@
+import atexit
+import hashlib
+import json
+import os
+import shutil
+import threading
+import time
+import uuid
+from collections import OrderedDict
+
+from cache_parseo import CACHE_DIR, guardar, leer, tamano_carpeta
+from cache_reportes import carpeta_reportes
+from rendimiento import memoria_mb
+
+# --- ALMACÉN COMPARTIDO DE DATOS DE SESIÓN ---
+# st.session_state solo guarda handles (la llave de contenido de cada base); los DataFrames viven aquí, una sola
+# vez por proceso aunque diez sesiones suban el mismo export. La parte en memoria es un LRU acotado a LIMITE_MB:
+# lo que sale de memoria se escribe a <CACHE_DIR>/sesion/<proceso> (mismo formato que la caché de parseo, acotado
+# a LIMITE_DISCO_MB por proceso) y vuelve a memoria cuando alguien lo pide. Las llaves solo viven en las sesiones
+# de este proceso, así que cada proceso (réplicas, el CLI, los benchmarks) tiene su carpeta y la borra al salir;
+# la de un proceso que murió sin salir se borra cuando lleva TTL_HORAS sin uso. Si una base se perdió también del
+# disco, la página la vuelve a calcular en el siguiente rerun (el archivo sigue en el uploader). Los reportes
+# terminados no pasan por memoria: van a la caché de reportes en disco (ver cache_reportes) y la sesión guarda la ruta.
+LIMITE_MB = float(os.environ.get("LIMPIADOR_SESION_MB", 512))
+LIMITE_DISCO_MB = float(os.environ.get("LIMPIADOR_SESION_DISCO_MB", 2048))
+CLAVE_ADMIN = os.environ.get("LIMPIADOR_ADMIN_CLAVE")
+TTL_HORAS = float(os.environ.get("LIMPIADOR_SESION_TTL_H", 24))
+PROCESO = f"{os.getpid()}-{uuid.uuid4().hex[:8]}"
+
+MEMORIA = OrderedDict()  # clave -> (valor, MB), del menos al más usado
+DUENOS = {}  # clave -> sesiones que la tienen como handle
+CANDADO = threading.Lock()
+
+def carpeta_sesion():
+    return os.path.join(CACHE_DIR, "sesion", PROCESO)
+
+def marcar_uso():
+    try: os.utime(carpeta_sesion())
+    except OSError: pass  # todavía no se desborda nada a disco
+
+def borrar_huerfanas():
+    """Carpetas de otros procesos sin uso en TTL_HORAS (murieron sin salir); las vivas se marcan al escribir y leer."""
+    raiz, limite = os.path.dirname(carpeta_sesion()), time.time() - TTL_HORAS * 3600
+    try: entradas = [e for e in os.scandir(raiz) if e.is_dir() and e.name != PROCESO]
+    except OSError: return
+    for e in entradas:
+        try:
+            if e.stat().st_mtime < limite: shutil.rmtree(e.path, ignore_errors=True)
+        except OSError: pass  # su proceso la acaba de borrar al salir
+
+atexit.register(lambda: shutil.rmtree(carpeta_sesion(), ignore_errors=True))
+
+def clave_de(*partes):
+    """Handle de un dato: hash de lo que lo determina (hash del archivo, parser, parámetros)."""
+    return hashlib.sha256(json.dumps(partes, default=str, ensure_ascii=False).encode("utf-8")).hexdigest()
+
+def tamano_mb(valor):
+    if hasattr(valor, "memory_usage"): return float(valor.memory_usage(index=True, deep=True).sum()) / 2**20
+    if isinstance(valor, dict): return sum(map(tamano_mb, valor.values()))
+    if isinstance(valor, (tuple, list)): return sum(map(tamano_mb, valor))
+    if isinstance(valor, (bytes, bytearray)): return len(valor) / 2**20
+    return 0.0
+
+def usado_mb():
+    return sum(mb for _, mb in MEMORIA.values())
+
+def a_disco():
+    """Saca de memoria las entradas menos usadas hasta quedar bajo LIMITE_MB (con el candado tomado)."""
+    if MEMORIA and usado_mb() > LIMITE_MB: borrar_huerfanas()
+    while MEMORIA and usado_mb() > LIMITE_MB:
+        clave, (valor, _) = MEMORIA.popitem(last=False)
+        DUENOS.pop(clave, None)  # quien lo vuelva a pedir con obtener() vuelve a ser dueño
+        if os.path.isdir(os.path.join(carpeta_sesion(), clave)): continue  # ya estaba en disco
+        try: guardar(clave, valor, carpeta_sesion(), LIMITE_DISCO_MB)
+        except TypeError: pass  # algo que no es DataFrame / dict / tupla: se recalcula si se vuelve a pedir
+        marcar_uso()
+
+# --- API ---
+def poner(clave, valor, sesion):
+    with CANDADO:
+        MEMORIA[clave] = (valor, tamano_mb(valor))
+        MEMORIA.move_to_end(clave)
+        DUENOS.setdefault(clave, set()).add(sesion)
+        a_disco()
+    return clave
+
+def obtener(clave, sesion=None):
+    """El valor de un handle, o None si ya no está ni en memoria ni en disco."""
+    if not clave: return None
+    with CANDADO:
+        if clave in MEMORIA:
+            MEMORIA.move_to_end(clave)
+            if sesion: DUENOS.setdefault(clave, set()).add(sesion)
+            return MEMORIA[clave][0]
+    valor = leer(clave, carpeta_sesion())
+    if valor is not None:
+        marcar_uso()
+        poner(clave, valor, sesion)
+    return valor
+
+def tiene(clave):
+    with CANDADO:
+        if clave in MEMORIA: return True
+    return os.path.isdir(os.path.join(carpeta_sesion(), clave))
+
+def soltar(clave, sesion):
+    """La sesión deja de usar el handle; sin dueños, la entrada sale de memoria (queda en disco si ya estaba)."""
+    with CANDADO:
+        duenos = DUENOS.get(clave, set())
+        duenos.discard(sesion)
+        if not duenos:
+            DUENOS.pop(clave, None)
+            MEMORIA.pop(clave, None)
+
+# --- MEDIDOR PARA ADMINISTRADORES ---
+def uso():
+    """Memoria del almacén: total, límite, MB por sesión (cada entrada cuenta completa para cada sesión que la usa) y disco."""
+    with CANDADO:
+        por_sesion = {}
+        for clave, (_, mb) in MEMORIA.items():
+            for sesion in DUENOS.get(clave, ()): por_sesion[sesion] = por_sesion.get(sesion, 0.0) + mb
+        resumen = {"memoria_mb": usado_mb(), "limite_mb": LIMITE_MB, "entradas": len(MEMORIA), "por_sesion": por_sesion}
+    for nombre, carpeta in (("disco_mb", carpeta_sesion()), ("reportes_mb", carpeta_reportes())):
+        try: resumen[nombre] = sum(tamano_carpeta(e.path) for e in os.scandir(carpeta) if e.is_dir()) / 2**20
+        except OSError: resumen[nombre] = 0.0
+    resumen["rss_mb"], resumen["pico_rss_mb"] = memoria_mb()
+    return resumen
+
+def es_admin():
+    import streamlit as st
+    return bool(CLAVE_ADMIN) and st.query_params.get("admin") == CLAVE_ADMIN
+
+def panel_memoria(sesion=None):
+    """Medidor en la barra lateral, solo con ?admin=<LIMPIADOR_ADMIN_CLAVE> en la URL."""
+    if not es_admin(): return
+    import pandas as pd
+    import streamlit as st
+    u = uso()
+    with st.sidebar.expander("🧠 Memoria del servidor", expanded=False):
+        st.progress(min(u["memoria_mb"] / u["limite_mb"], 1.0) if u["limite_mb"] else 1.0,
+                    text=f"Almacén de sesión: {u['memoria_mb']:.0f} / {u['limite_mb']:.0f} MB ({u['entradas']} bases)")
+        rss = "—" if u["rss_mb"] is None else f"{u['rss_mb']:.0f} MB"
+        st.caption(f"RSS del proceso: {rss} · en disco: {u['disco_mb']:.0f} MB de bases de este proceso, {u['reportes_mb']:.0f} MB de reportes")
+        if u["por_sesion"]:
+            st.dataframe(pd.DataFrame({"Sesión": [s[:8] + (" (esta)" if s == sesion else "") for s in u["por_sesion"]],
+                                       "MB": [round(mb, 1) for mb in u["por_sesion"].values()]}), hide_index=True, use_container_width=True)
+        if st.button("Vaciar bases en disco", key="admin_vaciar_sesion"): shutil.rmtree(carpeta_sesion(), ignore_errors=True)
@@ -0,0 +1,387 @@
+import numpy as np
+import pandas as pd
+
+from marcadores_bpro import (PATRON_FECHA, PATRON_HACIA, REFERENCIA_DESTINOS, REGLAS_COMPRAS, REGLAS_TRASPASOS,
+                             TOTALES, clasificar_filas, literal, reglas_por_nomenclatura)
+
+# --- MOTOR COLUMNAR PARA REPORTES BPRO ---
+# Los reportes de BPro mezclan filas de encabezado (FACTURA:, REFERENCIA:, SALIDA...)
+# con las filas de ítems. En lugar de recorrer fila por fila con una máquina de estados,
+# se marcan los encabezados con máscaras, se propaga su contexto con ffill hacia los
+# ítems y se filtran los ítems válidos, todo como operaciones de columna.
+# Cada parser trabaja por bloques: el contexto vigente al final de un bloque entra como
+# contexto inicial del siguiente, así da lo mismo pasar el libro completo, hoja por hoja o
+# en trozos de N filas leídos en streaming (memoria acotada por el tamaño del bloque).
+
+COLUMNAS_COMPRAS = ["AGENCIA", "FACTURA", "FECHA", "PROVEEDOR", "COMPRADOR", "NP", "DESCRIPCION",
+                    "CANTIDAD", "COSTO UNITARIO", "SUBTOTAL", "IVA", "TOTAL"]
+COLUMNAS_TRASPASOS = ["AGENCIA", "DESTINO", "REFERENCIA", "FECHA_MOV", "USUARIO", "NP", "DESCRIPCION",
+                      "CANTIDAD", "COSTO_UNIT", "TOTAL_COSTO"]
+
+# --- ESQUEMA DE LOS RESULTADOS ---
+# Cada resultado declara el tipo de sus columnas: las que se repiten en todos los ítems de un encabezado
+# (agencia, proveedor, comprador, destino, usuario) son categóricas, los textos usan el str de Arrow,
+# montos y cantidades float64 y las fechas datetime64. None deja la columna como sale del parser.
+try: TEXTO = pd.StringDtype("pyarrow", na_value=np.nan)  # el str por omisión de pandas 3
+except (TypeError, ImportError): TEXTO = None  # pandas < 2.3 o sin pyarrow: se queda como object
+
+def como_texto(col):
+    """Solo si todos los valores son texto: un NP numérico de Excel sigue siendo número para cruzar con otras fuentes."""
+    if TEXTO is None or col.dtype == TEXTO or pd.api.types.infer_dtype(col, skipna=True) not in ("string", "empty"): return col
+    return col.astype(TEXTO)
+
+def como_categoria(col):
+    return col.astype("category")
+
+def como_decimal(col):
+    return pd.to_numeric(col, errors="coerce").astype("float64")
+
+def como_fecha(col):
+    """Fechas de encabezado de BPro (dd/mm/aaaa); lo ilegible queda NaT."""
+    if pd.api.types.is_datetime64_any_dtype(col): return col
+    return pd.to_datetime(col, format="%d/%m/%Y", errors="coerce")
+
+def tipar(df, esquema):
+    return df.assign(**{c: tipo(df[c]) for c, tipo in esquema.items() if tipo is not None and c in df.columns})
+
+ESQUEMA_COMPRAS = dict(zip(COLUMNAS_COMPRAS, [como_categoria, como_texto, como_fecha, como_categoria, como_categoria, como_texto,
+                                              como_texto, como_decimal, como_decimal, como_decimal, como_decimal, como_decimal]))
+ESQUEMA_TRASPASOS = dict(zip(COLUMNAS_TRASPASOS, [como_categoria, como_categoria, como_texto, como_fecha, como_categoria, como_texto,
+                                                  como_texto, como_decimal, como_decimal, como_decimal]))
+
+def unir_hojas(hojas, n_columnas=12):
+    """Concatena las hojas en orden para que el contexto de encabezados cruce los cortes de hoja."""
+    if isinstance(hojas, pd.DataFrame): hojas = [hojas]
+    elif isinstance(hojas, dict): hojas = list(hojas.values())
+    hojas = [h.reindex(columns=range(max(n_columnas, len(h.columns)))) for h in hojas]
+    if not hojas: return pd.DataFrame(columns=range(n_columnas))
+    return pd.concat(hojas, ignore_index=True)
+
+def como_bloques(hojas):
+    """Acepta dict de hojas, lista, un DataFrame o un iterable de pares (hoja, DataFrame)."""
+    if isinstance(hojas, pd.DataFrame): return [(None, hojas)]
+    if isinstance(hojas, dict): return hojas.items()
+    if isinstance(hojas, list) and all(isinstance(h, pd.DataFrame) for h in hojas): return list(enumerate(hojas))
+    return hojas
+
+def en_lotes(parser_bloque, bloques, *args, por_hoja=False):
+    """
+    Aplica `parser_bloque(df, *args, estado)` a cada bloque llevando el contexto de encabezados
+    de un bloque al siguiente; con `por_hoja` el contexto se reinicia al cambiar de hoja.
+    """
+    estado, hoja_actual = None, object()
+    for hoja, df in como_bloques(bloques):
+        if por_hoja and hoja != hoja_actual: estado = None
+        hoja_actual = hoja
+        lote, estado = parser_bloque(unir_hojas(df), *args, estado=estado)
+        if lote is not None: yield lote
+
+def juntar_lotes(lotes, *columnas):
+    """
+    Acumula los lotes columna por columna y arma cada DataFrame una sola vez al final, así los
+    tipos se infieren sobre todo el resultado igual que si se hubiera parseado en un solo bloque.
+    Si cada lote es una tupla de DataFrames, se pasa una lista de columnas por elemento; si en lugar
+    de lista es un esquema ({columna: tipo}), el DataFrame sale con esos tipos.
+    """
+    acumulados = [{c: [] for c in cols} for cols in columnas]
+    for lote in lotes:
+        for acumulado, df in zip(acumulados, lote if isinstance(lote, tuple) else (lote,)):
+            for c, valores in acumulado.items(): valores.extend(df[c].tolist())
+    resultado = tuple(tipar(pd.DataFrame(a), cols) if isinstance(cols, dict) else pd.DataFrame(a) for a, cols in zip(acumulados, columnas))
+    return resultado if len(resultado) > 1 else resultado[0]
+
+def resultado_de_lotes(lotes, *columnas):
+    """juntar_lotes + la convención de los parsers: sin ítems se devuelve pd.DataFrame() (el primer elemento si son tuplas)."""
+    resultado = juntar_lotes(lotes, *columnas)
+    if isinstance(resultado, tuple): return (resultado[0] if not resultado[0].empty else pd.DataFrame(),) + resultado[1:]
+    return resultado if not resultado.empty else pd.DataFrame()
+
+def filas_lote(lote):
+    if lote is None: return 0
+    return tuple(len(df) for df in lote) if isinstance(lote, tuple) else len(lote)
+
+def recortar_lote(lote, filas):
+    """Quita las primeras `filas` del lote (una cantidad por DataFrame si el lote es una tupla)."""
+    if lote is None or not filas: return lote
+    if isinstance(lote, tuple): return tuple(df.iloc[n:] for df, n in zip(lote, filas))
+    return lote.iloc[filas:]
+
+def parsear_hoja_aislada(df, parser_bloque, *args):
+    """
+    Parsea una hoja sin conocer las anteriores (para correrla en otro proceso). Devuelve
+    (lote de las filas con contexto propio, prefijo crudo cuyo contexto viene de hojas anteriores,
+    contexto al final de la hoja). reconciliar_hojas completa el prefijo con el contexto arrastrado.
+    """
+    df = unir_hojas(df)
+    lote, estado = parser_bloque(df, *args, estado=None)
+    prefijo = df.iloc[:estado.autonomo_desde]
+    lote_prefijo, _ = parser_bloque(prefijo, *args, estado=None)
+    return recortar_lote(lote, filas_lote(lote_prefijo)), prefijo, estado
+
+def reconciliar_hojas(parser_bloque, hojas_aisladas, *args):
+    """
+    Une en orden los resultados de parsear_hoja_aislada como si el libro se hubiera leído de corrido:
+    el prefijo de cada hoja se vuelve a parsear con el contexto que dejaron las hojas anteriores.
+    """
+    arrastre = None
+    for lote, prefijo, estado in hojas_aisladas:
+        lote_prefijo, _ = parser_bloque(prefijo, *args, estado=arrastre)
+        if lote_prefijo is not None: yield lote_prefijo
+        if lote is not None: yield lote
+        arrastre = {**(arrastre or {}), **estado}
+
+def texto(col):
+    """Equivalente columnar de str(celda).strip(); las celdas vacías quedan como nulos."""
+    return col.astype(str).str.strip().where(col.notna())
+
+def valor_tras_marca(col_texto, marca, filas):
+    """Texto posterior a `marca` (como str.split(marca)[1].strip()) solo en `filas` que la contienen."""
+    con_marca = filas & col_texto.str.contains(marca, regex=False, na=False)
+    valores = col_texto[con_marca].str.split(marca, regex=False).str[1].str.strip()
+    return valores.reindex(col_texto.index)
+
+def texto_celda(col):
+    """Equivalente columnar de str(celda or '').strip(): 0 y "" quedan vacíos y las celdas vacías como 'nan'."""
+    return col.astype(str).str.strip().fillna("nan").where(~(col.eq(0) | col.eq("")), "")
+
+def descripcion_valida(col):
+    """Candado de limpieza: descripción no vacía y distinta de 'nan'."""
+    desc = texto(col)
+    return desc.notna() & (desc != "") & (desc.str.lower() != "nan")
+
+def propagar_contexto(marcas, filas, inicial=None):
+    """
+    Propaga hacia `filas` el último valor asignado por cada marca.
+    `marcas` es {campo: (mascara, valores)}: en las filas de la máscara el campo toma el valor
+    (aunque sea NaT o ""), en el resto conserva el anterior. Se propaga la posición de la
+    última asignación y no el valor, así un NaT asignado no se confunde con "sin cambio".
+    """
+    inicial = inicial or {}
+    contexto = {}
+    for campo, (mascara, valores) in marcas.items():
+        posiciones = np.where(mascara.to_numpy(), np.arange(len(mascara)), np.nan)
+        ultima = pd.Series(posiciones).ffill().to_numpy()[filas.to_numpy()]
+        sin_valor = np.isnan(ultima)
+        tomados = valores.iloc[np.where(sin_valor, 0, ultima).astype(np.int64)] if len(valores) else valores
+        tomados = tomados.reset_index(drop=True).astype(object)
+        tomados[sin_valor] = inicial.get(campo)
+        contexto[campo] = tomados
+    return pd.DataFrame(contexto)
+
+class Contexto(dict):
+    """
+    Contexto vigente al final de un bloque. `autonomo_desde` es la primera fila del bloque cuyo contexto
+    ya no depende de bloques anteriores (todos los campos se asignaron antes dentro del mismo bloque).
+    """
+    autonomo_desde = 0
+
+def ultimo_contexto(marcas, inicial=None):
+    """Contexto vigente al terminar el bloque: el valor de la última asignación de cada campo o el que traía."""
+    estado = Contexto(inicial or {})
+    for campo, (mascara, valores) in marcas.items():
+        posiciones = np.flatnonzero(mascara.to_numpy())
+        if len(posiciones): estado[campo] = valores.iloc[posiciones[-1]]
+        estado.autonomo_desde = max(estado.autonomo_desde, posiciones[0] + 1 if len(posiciones) else len(mascara))
+    return estado
+
+def a_numero(col):
+    """Conversión numérica en bloque; devuelve (números, celdas con texto no convertible)."""
+    num = pd.to_numeric(col, errors="coerce")
+    invalida = num.isna() & col.notna() & (texto(col).str.lower() != "nan")
+    return num, invalida
+
+# --- COMPRAS ---
+def compras_bloque(df, nombre_agencia, estado=None):
+    """Un bloque de filas del reporte de compras; devuelve (ítems o None, contexto al final del bloque)."""
+    col_a = texto(df[0])
+    tipo = clasificar_filas(col_a, REGLAS_COMPRAS)
+    es_factura = tipo == "FACTURA"
+    valores = {"FACTURA": valor_tras_marca(col_a, "FACTURA:", es_factura),
+               "FECHA": valor_tras_marca(df[2].astype(str), "FECHA FACT:", es_factura),
+               "PROVEEDOR": valor_tras_marca(df[3].astype(str), "PROVEEDOR:", es_factura),
+               "COMPRADOR": valor_tras_marca(df[4].astype(str), "COMPRADOR:", es_factura)}
+    marcas = {campo: (v.notna(), v) for campo, v in valores.items()}
+    estado_final = ultimo_contexto(marcas, estado)
+    es_item = (tipo == "ITEM") & descripcion_valida(df[3])
+    if not es_item.any(): return None, estado_final
+
+    items = df[es_item].reset_index(drop=True)
+    datos = propagar_contexto(marcas, es_item, estado)
+    datos.insert(0, "AGENCIA", nombre_agencia)
+    for campo, i in [("NP", 2), ("DESCRIPCION", 3), ("CANTIDAD", 4), ("COSTO UNITARIO", 5), ("SUBTOTAL", 7), ("IVA", 8), ("TOTAL", 9)]:
+        datos[campo] = items[i]
+    return datos[COLUMNAS_COMPRAS], estado_final
+
+def lotes_compras_bpro(bloques, nombre_agencia):
+    return en_lotes(compras_bloque, bloques, nombre_agencia)
+
+def parsear_compras_bpro(hojas, nombre_agencia):
+    """
+    Versión columnar del parser de compras: detecta filas "FACTURA:", propaga
+    factura/fecha/proveedor/comprador hasta los ítems "CR*" y descarta ítems sin descripción.
+    `hojas` puede ser el libro completo o los bloques de lector_excel.iterar_bloques.
+    """
+    return resultado_de_lotes(lotes_compras_bpro(hojas, nombre_agencia), ESQUEMA_COMPRAS)
+
+# --- TRASPASOS ---
+COLUMNAS_RECHAZADOS = ["AGENCIA"] + COLUMNAS_TRASPASOS[1:-1]
+
+def traspasos_bloque(df, nombre_agencia, estado=None):
+    """Un bloque de filas del reporte de traspasos; devuelve ((ítems, rechazados), contexto al final del bloque)."""
+    col_a = texto(df[0]).str.upper()
+    tipo = clasificar_filas(col_a, REGLAS_TRASPASOS)
+
+    # Nivel 1: destino explícito (HACIA) o salida genérica por traspaso
+    con_hacia, generica = tipo == "SALIDA_HACIA", tipo == "SALIDA_TRASPASO"
+    destino = valor_tras_marca(col_a, "HACIA", con_hacia).astype(object)
+    destino[generica] = f"SALIDA DE ALMACEN POR TRASPASO {nombre_agencia}"
+
+    # Nivel 2: cabecera del movimiento
+    es_ref = tipo == "REFERENCIA"
+    fecha_mov = valor_tras_marca(df[2].astype(str).str.upper(), "FECHA MOV:", es_ref)
+    usuario = valor_tras_marca(df[3].astype(str).str.upper(), "USUARIO:", es_ref)
+
+    # Nivel 3: ítems
+    es_item = tipo == "ITEM"
+    marcas = {"DESTINO": (con_hacia | generica, destino),
+              "REFERENCIA": (es_ref, valor_tras_marca(col_a, "REFERENCIA:", es_ref)),
+              "FECHA_MOV": (fecha_mov.notna(), fecha_mov), "USUARIO": (usuario.notna(), usuario)}
+    estado_final = ultimo_contexto(marcas, estado)
+    contexto = propagar_contexto(marcas, es_item, estado)
+    items = df[es_item].reset_index(drop=True)
+    con_destino = (contexto["DESTINO"].notna() & (contexto["DESTINO"] != "")).to_numpy()
+    validos = con_destino & descripcion_valida(items[3]).to_numpy()
+    contexto, items = contexto[validos].reset_index(drop=True), items[validos].reset_index(drop=True)
+
+    cantidad, cant_mala = a_numero(items[4])
+    costo, costo_malo = a_numero(items[5])
+    malas = (cant_mala | costo_malo).to_numpy()
+    rechazados = contexto[malas].assign(AGENCIA=nombre_agencia, NP=items[2][malas], DESCRIPCION=items[3][malas],
+                                        CANTIDAD=items[4][malas], COSTO_UNIT=items[5][malas])
+
+    buenas = ~malas
+    datos = contexto[buenas].reset_index(drop=True)
+    datos.insert(0, "AGENCIA", nombre_agencia)
+    datos["NP"] = items[2][buenas].tolist()
+    datos["DESCRIPCION"] = items[3][buenas].tolist()
+    datos["CANTIDAD"] = cantidad[buenas].astype(float).abs().to_numpy()
+    datos["COSTO_UNIT"] = costo[buenas].astype(float).to_numpy()
+    datos["TOTAL_COSTO"] = datos["CANTIDAD"] * datos["COSTO_UNIT"]
+    return (datos, rechazados.reset_index(drop=True)), estado_final
+
+def lotes_traspasos_bpro(bloques, nombre_agencia):
+    return en_lotes(traspasos_bloque, bloques, nombre_agencia)
+
+def parsear_traspasos_bpro(hojas, nombre_agencia):
+    """
+    Traspasos con tres niveles de contexto: destino (SALIDA...HACIA), cabecera
+    (REFERENCIA / FECHA MOV / USUARIO) e ítems TRAS*. Devuelve (ítems, rechazados):
+    los ítems con CANTIDAD o COSTO no numéricos van a la tabla de rechazados.
+    """
+    return resultado_de_lotes(lotes_traspasos_bpro(hojas, nombre_agencia), ESQUEMA_TRASPASOS, COLUMNAS_RECHAZADOS)
+
+def traspasos_destino_hoja(df, nomenclaturas):
+    """
+    Una hoja del reporte de traspasos del análisis FIFO: la hoja lista sus destinos en el resumen
+    superior (hasta TOTALES), la fecha sale de la fila REFERENCIA: y los ítems se reconocen por
+    nomenclatura. Devuelve (ítems con su Destino, rechazados) o None si la hoja no trae destinos.
+    """
+    df = unir_hojas(df)
+    # str(celda) del parser original: las celdas vacías se leían como 'nan'
+    col_a = texto(df[0]).fillna("nan")
+    tipo = clasificar_filas(col_a, reglas_por_nomenclatura(REFERENCIA_DESTINOS, nomenclaturas) + [TOTALES])
+    resumen = col_a.iloc[4:50]
+    fin = (tipo.iloc[4:50] == "TOTALES").to_numpy()
+    if fin.any(): resumen = resumen.iloc[:fin.argmax()]
+    lista_destinos = resumen[resumen != ""].unique()
+    if not len(lista_destinos): return None
+
+    es_ref = tipo == "MARCA"
+    fecha_txt = texto(df[2]).fillna("nan").str.extract(PATRON_FECHA, expand=False)
+    con_fecha = es_ref & fecha_txt.notna()
+    fecha = pd.to_datetime(fecha_txt.where(con_fecha), format="%d/%m/%Y", errors="coerce")
+    es_destino = ~es_ref & col_a.isin(lista_destinos)
+    con_hacia = col_a.str.contains(PATRON_HACIA)
+    nombre_limpio = col_a.where(~con_hacia, col_a.str.split(PATRON_HACIA).str[-1].str.strip())
+    es_item = (tipo == "ITEM") & ~es_destino & (col_a != "")
+
+    marcas = {"Destino": (es_destino, nombre_limpio), "Fecha": (con_fecha, fecha)}
+    contexto = propagar_contexto(marcas, es_item)
+    items = df[es_item].reset_index(drop=True)
+    con_destino = contexto["Destino"].notna().to_numpy()
+    contexto, items = contexto[con_destino].reset_index(drop=True), items[con_destino].reset_index(drop=True)
+
+    cant, cant_mala = a_numero(items[4])
+    rechazados = contexto[cant_mala.to_numpy()].assign(**{"ID PART": items[2][cant_mala], "Cantidad": items[4][cant_mala]})
+    validos = (items[2].notna() & cant.notna() & (items[2] != 0) & contexto["Fecha"].notna()).to_numpy()
+    bloque = pd.DataFrame({"Destino": contexto["Destino"][validos].to_numpy(), "ID PART": items[2][validos].tolist(),
+                           "Cantidad Traspasada": pd.to_numeric(items[4][validos]).abs().to_numpy(),
+                           "Fecha": pd.to_datetime(contexto["Fecha"][validos].tolist())})
+    return bloque, rechazados
+
+def unir_por_destino(resultados_hojas):
+    """Junta en orden los resultados de traspasos_destino_hoja: ({destino: DataFrame}, rechazados)."""
+    resultados_hojas = [r for r in resultados_hojas if r is not None]
+    rechazados = pd.concat([r for _, r in resultados_hojas], ignore_index=True) if resultados_hojas else pd.DataFrame()
+    if not resultados_hojas: return {}, rechazados
+    todos = pd.concat([b for b, _ in resultados_hojas], ignore_index=True)
+    todos["ID PART"] = como_texto(todos["ID PART"])
+    return {d: g.drop(columns="Destino").reset_index(drop=True) for d, g in todos.groupby("Destino", sort=False)}, rechazados
+
+def parsear_traspasos_por_destino(hojas, nomenclaturas):
+    """
+    Variante del análisis FIFO, con el contexto reiniciado en cada hoja.
+    Devuelve ({destino: DataFrame}, rechazados).
+    """
+    return unir_por_destino(traspasos_destino_hoja(df, nomenclaturas) for df in hojas.values())
+
+# --- COMPRAS Y VENTAS DEL ANÁLISIS FIFO (limpiador_01) ---
+# Misma semántica que los bucles originales: la fecha sale de la fila marcadora (FACTURA: o
+# FACTURA/REFERENCIA:), los ítems se reconocen por nomenclatura y el contexto se reinicia por hoja.
+COLUMNAS_COMPRAS_FIFO = ["ID PART", "DESCRIPTION", "PRODUCT LINE", "CANTIDAD COMPRADA", "TOTAL COMPRADO", "Fecha", "FACTURA"]
+COLUMNAS_VENTAS_FIFO = ["ID PART", "Cantidad Vendida", "Total Vendido", "Fecha", "REFERENCIA"]
+# Las cantidades ya salen numéricas de items_fifo (enteras si todas lo son) y Fecha como datetime64
+ESQUEMA_COMPRAS_FIFO = dict(zip(COLUMNAS_COMPRAS_FIFO, [como_texto, como_texto, como_texto, None, None, None, como_texto]))
+ESQUEMA_VENTAS_FIFO = dict(zip(COLUMNAS_VENTAS_FIFO, [como_texto, None, None, None, como_texto]))
+
+def fecha_de_marca(df, marca, nomenclaturas, col_fecha, campo_documento, estado):
+    """(ítems por nomenclatura, marcas de fecha y documento, contexto al final del bloque)."""
+    col_a = texto_celda(df[0]).str.upper()
+    tipo = clasificar_filas(col_a, reglas_por_nomenclatura(literal(marca), nomenclaturas))
+    es_marca = tipo == "MARCA"
+    fecha_txt = texto_celda(df[col_fecha]).str.extract(PATRON_FECHA, expand=False)
+    con_fecha = es_marca & fecha_txt.notna()
+    marcas = {"Fecha": (con_fecha, pd.to_datetime(fecha_txt.where(con_fecha), format="%d/%m/%Y", errors="coerce")),
+              campo_documento: (es_marca, valor_tras_marca(col_a, marca, es_marca))}
+    return tipo == "ITEM", marcas, ultimo_contexto(marcas, estado)
+
+def items_fifo(df, es_item, marcas, estado, col_cantidad, col_total):
+    """Ítems con ID PART distinto de 0, cantidad numérica y fecha; (ítems, cantidad, total, contexto)."""
+    items = df[es_item].reset_index(drop=True)
+    contexto = propagar_contexto(marcas, es_item, estado)
+    validos = (items[2].notna() & (items[2] != 0) & pd.to_numeric(items[col_cantidad], errors="coerce").notna() & contexto["Fecha"].notna()).to_numpy()
+    items, contexto = items[validos].reset_index(drop=True), contexto[validos].reset_index(drop=True)
+    # Solo sobre las filas válidas, para que los enteros sigan siendo enteros como con pd.to_numeric por celda
+    return items, pd.to_numeric(items[col_cantidad]), pd.to_numeric(items[col_total], errors="coerce"), contexto
+
+def compras_fifo_bloque(df, nomenclatura, estado=None):
+    es_item, marcas, estado_final = fecha_de_marca(df, "FACTURA:", [nomenclatura], 2, "FACTURA", estado)
+    if not es_item.any(): return None, estado_final
+    items, cantidad, total, contexto = items_fifo(df, es_item, marcas, estado, 4, 7)
+    return pd.DataFrame({"ID PART": items[2], "DESCRIPTION": items[3], "PRODUCT LINE": items[11], "CANTIDAD COMPRADA": cantidad,
+                         "TOTAL COMPRADO": total, "Fecha": contexto["Fecha"], "FACTURA": contexto["FACTURA"]}), estado_final
+
+def ventas_fifo_bloque(df, nomenclaturas, estado=None):
+    es_item, marcas, estado_final = fecha_de_marca(df, "FACTURA/REFERENCIA:", nomenclaturas, 4, "REFERENCIA", estado)
+    if not es_item.any(): return None, estado_final
+    items, cantidad, total, contexto = items_fifo(df, es_item, marcas, estado, 4, 6)
+    return pd.DataFrame({"ID PART": items[2], "Cantidad Vendida": cantidad, "Total Vendido": total, "Fecha": contexto["Fecha"],
+                         "REFERENCIA": contexto["REFERENCIA"]}), estado_final
+
+def parsear_compras_fifo(hojas, nomenclatura):
+    """Compras por nomenclatura de agencia (CRCU, CRTU) con su factura y fecha de factura."""
+    return resultado_de_lotes(en_lotes(compras_fifo_bloque, hojas, nomenclatura, por_hoja=True), ESQUEMA_COMPRAS_FIFO)
+
+def parsear_ventas_fifo(hojas, nomenclaturas):
+    """Ventas por nomenclaturas (VRCU, VRTU) con su FACTURA/REFERENCIA y la fecha de esta."""
+    return resultado_de_lotes(en_lotes(ventas_fifo_bloque, hojas, nomenclaturas, por_hoja=True), ESQUEMA_VENTAS_FIFO)
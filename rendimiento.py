@@ -0,0 +1,147 @@
+import contextlib
+import contextvars
+import functools
+import json
+import os
+import sys
+import time
+import uuid
+
+try:
+    import resource
+except ImportError:  # Windows: sin getrusage, el pico de RSS queda vacío
+    resource = None
+
+# --- MEDICIÓN POR FASE (TIEMPO, FILAS, RSS) ---
+# Cada fase (parseo de un archivo, descarga de Ventas Master, cruce, escritura del libro) deja un dict con su
+# tiempo de reloj, filas de entrada y salida, el RSS al terminar y cuánto subió el pico de RSS del proceso
+# (getrusage no permite reiniciar el pico, así que "sube_pico_mb" es lo que esta fase empujó el máximo).
+# Las mediciones se juntan en la corrida activa (una por clic, ver corrida()) para el panel "Rendimiento" y,
+# si LIMPIADOR_LOG_RENDIMIENTO apunta a un archivo, también se agregan ahí como JSON lines.
+# Solo usa la biblioteca estándar: app.py lo importa en el primer render.
+LOG_RENDIMIENTO = os.environ.get("LIMPIADOR_LOG_RENDIMIENTO")
+CORRIDA = contextvars.ContextVar("corrida_rendimiento", default=None)
+NIVEL = contextvars.ContextVar("nivel_rendimiento", default=0)
+
+def memoria_mb():
+    """(RSS actual, pico de RSS del proceso) en MB; None donde el sistema no los da."""
+    rss = pico = None
+    try:
+        with open("/proc/self/statm") as f: rss = int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 2**20
+    except (OSError, ValueError, AttributeError):
+        pass
+    if resource is not None:
+        # ru_maxrss viene en KB en Linux y en bytes en macOS
+        pico = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / (2**20 if sys.platform == "darwin" else 2**10)
+    return rss, pico
+
+def contar_filas(valor):
+    """Filas de los DataFrames dentro de `valor` (también en dicts, tuplas y listas); None si no hay ninguno."""
+    if hasattr(valor, "shape") and len(getattr(valor, "shape", ())) == 2: return int(valor.shape[0])
+    if isinstance(valor, dict): valor = list(valor.values())
+    if not isinstance(valor, (tuple, list)): return None
+    conteos = [c for c in map(contar_filas, valor) if c is not None]
+    return sum(conteos) if conteos else None
+
+def redondear(mb):
+    return None if mb is None else round(mb, 1)
+
+# --- CORRIDAS Y FASES ---
+@contextlib.contextmanager
+def corrida(nombre):
+    """Junta las mediciones de lo que pase dentro (un clic de la interfaz o una corrida del CLI); entrega la lista."""
+    actual = {"nombre": nombre, "id": uuid.uuid4().hex[:8], "mediciones": []}
+    token = CORRIDA.set(actual)
+    try: yield actual["mediciones"]
+    finally: CORRIDA.reset(token)
+
+def escribir_log(medicion):
+    if not LOG_RENDIMIENTO: return
+    actual = CORRIDA.get()
+    registro = {"ts": time.strftime("%Y-%m-%dT%H:%M:%S"), "corrida": actual and actual["nombre"], "corrida_id": actual and actual["id"], **medicion}
+    try:
+        with open(LOG_RENDIMIENTO, "a", encoding="utf-8") as f: f.write(json.dumps(registro, ensure_ascii=False, default=str) + "\n")
+    except OSError:
+        pass  # el log es opcional: nunca tumba una corrida
+
+def agregar(medicion):
+    """Suma a la corrida activa (y al log) una medición hecha en otro proceso, al nivel de la fase actual."""
+    medicion["nivel"] = NIVEL.get()
+    actual = CORRIDA.get()
+    if actual is not None: actual["mediciones"].append(medicion)
+    escribir_log(medicion)
+
+@contextlib.contextmanager
+def fase(nombre, filas_entrada=None, registrar=True):
+    """
+    Mide lo que corre dentro. Entrega el dict de la medición: quien llama puede poner "filas_salida" (o
+    corregir "filas_entrada"). Las fases anidadas quedan con un nivel más; una fase que falla lleva "error".
+    """
+    _, pico_antes = memoria_mb()
+    medicion = {"fase": nombre, "nivel": NIVEL.get(), "pid": os.getpid(), "filas_entrada": filas_entrada, "filas_salida": None}
+    actual = CORRIDA.get()
+    # Se agrega al empezar para que el panel la muestre antes que sus fases internas
+    if registrar and actual is not None: actual["mediciones"].append(medicion)
+    token = NIVEL.set(medicion["nivel"] + 1)
+    inicio = time.perf_counter()
+    try:
+        yield medicion
+    except BaseException as e:
+        medicion["error"] = type(e).__name__
+        raise
+    finally:
+        NIVEL.reset(token)
+        rss, pico = memoria_mb()
+        medicion.update(segundos=round(time.perf_counter() - inicio, 4), rss_mb=redondear(rss), pico_rss_mb=redondear(pico),
+                        sube_pico_mb=redondear(pico - pico_antes) if pico is not None else None)
+        if registrar: escribir_log(medicion)
+
+def medido(nombre=None):
+    """Decorador: cada llamada es una fase, con las filas de los DataFrames de los argumentos y del resultado."""
+    def decorador(fn):
+        etiqueta = nombre or f"{fn.__module__}.{fn.__qualname__}"
+        @functools.wraps(fn)
+        def envuelta(*args, **kwargs):
+            with fase(etiqueta, contar_filas(list(args) + list(kwargs.values()))) as m:
+                resultado = fn(*args, **kwargs)
+                m["filas_salida"] = contar_filas(resultado)
+                if isinstance(resultado, (bytes, bytearray)): m["bytes"] = len(resultado)
+                elif isinstance(resultado, str) and os.path.isfile(resultado): m["bytes"] = os.path.getsize(resultado)
+            return resultado
+        return envuelta
+    return decorador
+
+def llamar(nombre, fn, *args):
+    """fn(*args) medida como fase."""
+    with fase(nombre) as m:
+        resultado = fn(*args)
+        m["filas_salida"] = contar_filas(resultado)
+    return resultado
+
+def trabajo_medido(nombre, fn, *args):
+    """Trabajo del pool: (fn(*args), su medición en el proceso que lo corrió), para agregar() del lado que espera."""
+    with fase(nombre, registrar=False) as m:
+        resultado = fn(*args)
+        m["filas_salida"] = contar_filas(resultado)
+    return resultado, m
+
+# --- PANEL EN LA INTERFAZ ---
+COLUMNAS_PANEL = {"segundos": "Segundos", "filas_entrada": "Filas entrada", "filas_salida": "Filas salida",
+                  "rss_mb": "RSS MB", "pico_rss_mb": "Pico RSS MB", "sube_pico_mb": "Sube pico MB"}
+
+def tabla(mediciones):
+    import pandas as pd
+    filas = [{"Fase": "· " * m["nivel"] + m["fase"] + (f" ⚠️ {m['error']}" if m.get("error") else ""),
+              **{titulo: m.get(c) for c, titulo in COLUMNAS_PANEL.items()},
+              "Proceso": "pool" if m["pid"] != os.getpid() else "local"} for m in mediciones]
+    return pd.DataFrame(filas)
+
+def panel(mediciones, titulo="⏱️ Rendimiento"):
+    """Expander colapsado con la tabla de fases de la última corrida."""
+    if not mediciones: return
+    import streamlit as st
+    with st.expander(titulo, expanded=False):
+        total = sum(m.get("segundos") or 0 for m in mediciones if m["nivel"] == 0)
+        st.caption(f"{len(mediciones)} fases, {total:.2f} s en las de primer nivel."
+                   + ("" if LOG_RENDIMIENTO else " Define LIMPIADOR_LOG_RENDIMIENTO para guardarlas como JSON lines."))
+        st.dataframe(tabla(mediciones), hide_index=True, use_container_width=True)
@@ -0,0 +1,381 @@
+import pandas as pd
+import numpy as np
+from parsers_bpro import (ESQUEMA_COMPRAS_FIFO, ESQUEMA_VENTAS_FIFO, compras_fifo_bloque, traspasos_destino_hoja,
+                          unir_por_destino, ventas_fifo_bloque)
+from cache_parseo import cache_parseo
+from ejecucion import mapear_hojas, parsear_archivo
+from lector_excel import nombres_hojas
+from exportar import libro_reportes
+from catalogo_partes import codificar_tablas, con_texto
+from rendimiento import medido
+
+# --- REPORTES FIFO (SIN INTERFAZ) ---
+# Parseo, agregación y reportes del análisis integrado: lo usa limpiador_01 (Streamlit) y limpiador_cli (batch).
+# Las nomenclaturas de cada agencia y las acciones por almacén son las mismas que ofrece la interfaz.
+NOMENCLATURAS = {
+    "CUAUTITLAN": {"compras": "CRCU", "traspasos": ["TRASUCCU", "TRASAPROCU"], "ventas": ["VRCU"]},
+    "TULTITLAN": {"compras": "CRTU", "traspasos": ["TRASUCTU", "TRASAPROTU"], "ventas": ["VRTU"]},
+}
+NOMENCLATURAS_MANUALES = ["VRCU", "VRTU"]
+ACCIONES = ["Considerar", "Venta Exitosa", "Por analizar", "No Considerar"]
+# Súbela cuando cambie el cálculo o el formato de los reportes: invalida los libros de la caché de reportes
+VERSION_REPORTES = 1
+# Orden de las bases crudas que reciben fuentes_codificadas y los reporte_*
+FUENTES_FIFO = ["compras_cua", "compras_tul", "traspasos_cua", "traspasos_tul", "ventas_cua", "ventas_tul", "ventas_manuales"]
+# Nombres de las hojas mensuales: los mismos que get_month_names('wide', locale='es_ES') de babel, sin cargar babel
+MESES = ["", "Enero", "Febrero", "Marzo", "Abril", "Mayo", "Junio", "Julio", "Agosto", "Septiembre", "Octubre", "Noviembre", "Diciembre"]
+
+# --- HELPER: VALIDACIÓN SEGURA ---
+def es_dataframe_valido(df):
+    return isinstance(df, pd.DataFrame) and not df.empty
+
+def nombre_mes(periodo):
+    return f"{MESES[periodo.month]}_{periodo.year}"
+
+# --- PARSERS VIEJOS (MULTI-HOJA) ---
+@cache_parseo(version=5)
+def procesar_compras(file_content, nomenclatura, streaming=None):
+    return parsear_archivo(compras_fifo_bloque, file_content, (nomenclatura,), [ESQUEMA_COMPRAS_FIFO], streaming, por_hoja=True, omitir_errores=True)
+
+@cache_parseo(version=5)
+def parsear_traspasos_detallado(file_content, nomenclaturas_agencia):
+    """({almacén destino: DataFrame}, ítems apartados por cantidad no numérica)."""
+    # Cada hoja trae su propio resumen de destinos: se parsean por separado (en el pool) y se unen en orden
+    por_hoja = mapear_hojas(traspasos_destino_hoja, file_content, (nomenclaturas_agencia,), nombres_hojas(file_content), omitir_errores=True)
+    return unir_por_destino(por_hoja)
+
+@cache_parseo(version=5)
+def procesar_archivo_venta_individual(file_content, nomenclaturas, streaming=None):
+    return parsear_archivo(ventas_fifo_bloque, file_content, (nomenclaturas,), [ESQUEMA_VENTAS_FIFO], streaming, por_hoja=True, omitir_errores=True)
+
+def tabla_almacenes(traspasos, acciones=None):
+    """Almacenes destino de los traspasos con su acción ("Considerar" si no se indica otra), como la edita la interfaz."""
+    nombres = sorted(traspasos)
+    acciones = acciones or {}
+    return pd.DataFrame({"Almacén Destino": nombres, "Acción": [acciones.get(a, "Considerar") for a in nombres]})
+
+# --- AGREGACIÓN ---
+AGG_COMPRAS = {'CANTIDAD COMPRADA': 'sum', 'TOTAL COMPRADO': 'sum', 'DESCRIPTION': 'first', 'PRODUCT LINE': 'first', 'Fecha': 'max'}
+
+def formatear_ult_compra(agg):
+    agg.rename(columns={'Fecha': 'Fecha Ult. Comp.'}, inplace=True)
+    agg['Fecha Ult. Comp.'] = agg['Fecha Ult. Comp.'].apply(lambda x: x.strftime('%d/%m/%Y') if pd.notna(x) else 'N/A')
+    return agg
+
+def agregar_compras(df_raw):
+    if not es_dataframe_valido(df_raw): return pd.DataFrame()
+    return formatear_ult_compra(df_raw.groupby('ID PART').agg(AGG_COMPRAS).reset_index())
+
+def agregar_datos_simples(df_raw, col_cantidad, col_total=None):
+    if not es_dataframe_valido(df_raw): return pd.DataFrame()
+    agg_dict = {col_cantidad: 'sum'}
+    if col_total and col_total in df_raw.columns: agg_dict[col_total] = 'sum'
+    return df_raw.groupby('ID PART').agg(agg_dict).reset_index()
+
+def agregar_dict_datos(dict_raw, col_cantidad, col_total=None):
+    if not dict_raw: return {}
+    dict_agg = {}
+    for key, df_raw in dict_raw.items():
+        if es_dataframe_valido(df_raw): dict_agg[key] = agregar_datos_simples(df_raw, col_cantidad, col_total)
+    return dict_agg
+
+# --- AGREGACIÓN MENSUAL (UNA SOLA PASADA) ---
+# El Periodo se calcula una vez por DataFrame y cada agregación es un solo groupby por (Periodo, ID PART).
+def periodo_mensual(df_raw):
+    return df_raw['Fecha'].dt.to_period('M').rename('Periodo')
+
+def agregar_compras_periodo(df_raw):
+    if not es_dataframe_valido(df_raw): return pd.DataFrame()
+    return formatear_ult_compra(df_raw.groupby([periodo_mensual(df_raw), 'ID PART']).agg(AGG_COMPRAS).reset_index())
+
+def agregar_datos_periodo(df_raw, col_cantidad, col_total=None):
+    if not es_dataframe_valido(df_raw): return pd.DataFrame()
+    agg_dict = {col_cantidad: 'sum'}
+    if col_total and col_total in df_raw.columns: agg_dict[col_total] = 'sum'
+    return df_raw.groupby([periodo_mensual(df_raw), 'ID PART']).agg(agg_dict).reset_index()
+
+def agregar_dict_periodo(dict_raw, col_cantidad, col_total=None):
+    return {k: agregar_datos_periodo(v, col_cantidad, col_total) for k, v in (dict_raw or {}).items() if es_dataframe_valido(v)}
+
+# --- GENERACIÓN DE REPORTES (CORE VIEJO) ---
+def tabla_larga(dfs, ids, columnas):
+    """
+    Los agregados por almacén apilados en una sola tabla: posición de cada ID PART en `ids`, número de
+    almacén (k) y los valores de `columnas`. Las partes que no están en `ids` se descartan.
+    """
+    if not dfs: return np.empty(0, dtype=np.intp), np.empty(0, dtype=np.intp), {c: np.empty(0) for c in columnas}
+    largo = pd.concat([d.reindex(columns=['ID PART'] + columnas) for d in dfs.values()], ignore_index=True)
+    k = np.repeat(list(dfs), [len(d) for d in dfs.values()])
+    pos = ids.get_indexer(largo['ID PART'])
+    dentro = pos >= 0
+    return pos[dentro], k[dentro], {c: largo[c].to_numpy(dtype=float, na_value=0)[dentro] for c in columnas}
+
+def a_lo_ancho(n, w, pos, k, valores):
+    """Pivote de la tabla larga a una matriz (ID PART x almacén); lo que no tiene registro queda en 0."""
+    ancho = np.zeros((n, w))
+    ancho[pos, k] = valores
+    return ancho
+
+def sin_infinitos(x):
+    """x / 0 -> 0, como el .fillna(0).replace([inf, -inf], 0) de los costos y precios."""
+    return np.where(np.isfinite(x), x, 0)
+
+def generar_reporte_agencia(df_compras, traspasos_data, seleccion_almacenes, ventas_gral, ventas_manuales):
+    """
+    Traspasos y ventas manuales de todos los almacenes se apilan en una tabla larga (ID PART, almacén) y se
+    pasan a lo ancho una sola vez; vendida / total por acción salen de operaciones sobre esas matrices:
+      Venta Exitosa  -> vendida = traspasada, total = vendida * costo unitario de compra
+      Considerar     -> vendida = min(venta manual, traspasada), total = vendida * precio de la venta manual
+      Por analizar   -> 0 (y CANTIDAD VENDIDA = "Por analizar" en las partes traspasadas)
+    """
+    if not es_dataframe_valido(df_compras): return pd.DataFrame()
+    df = df_compras.copy()
+    por_analizar, hay_por_analizar = None, False
+
+    all_trasp = [d for d in traspasos_data.values() if es_dataframe_valido(d)]
+    if all_trasp:
+        df['TOTAL TRASPASOS'] = df['ID PART'].map(pd.concat(all_trasp).groupby('ID PART')['Cantidad Traspasada'].sum())
+    else: df['TOTAL TRASPASOS'] = 0
+    df['TOTAL TRASPASOS'] = df['TOTAL TRASPASOS'].fillna(0)
+
+    ignorar_list = []
+    if es_dataframe_valido(seleccion_almacenes):
+        lista_no = seleccion_almacenes[seleccion_almacenes['Acción'] == 'No Considerar']['Almacén Destino'].tolist()
+        ignorar_list = [traspasos_data.get(a) for a in lista_no if traspasos_data.get(a) is not None]
+    valid_ignorar = [x for x in ignorar_list if es_dataframe_valido(x)]
+    if valid_ignorar:
+        ignorada = df['ID PART'].map(pd.concat(valid_ignorar).groupby('ID PART')['Cantidad Traspasada'].sum())
+        df = df.fillna(0)
+        costo = (df['TOTAL COMPRADO']/df['CANTIDAD COMPRADA']).replace([float('inf'), -float('inf')], 0).fillna(0)
+        df['CANTIDAD COMPRADA'] -= ignorada.fillna(0)
+        df['TOTAL COMPRADO'] = df['CANTIDAD COMPRADA'] * costo
+    df = df[df['CANTIDAD COMPRADA'] > 0].reset_index(drop=True)
+    if df.empty: return pd.DataFrame()
+    ids = pd.Index(df['ID PART'])
+
+    if es_dataframe_valido(ventas_gral):
+        directa = ventas_gral.set_index('ID PART').reindex(ids).reset_index(drop=True)
+        df = pd.concat([df, directa.rename(columns={"Cantidad Vendida": "ALMACEN GENERAL_Venta Directa", "Total Vendido": "ALMACEN GENERAL_Total Vendido"})], axis=1)
+    else: df["ALMACEN GENERAL_Venta Directa"], df["ALMACEN GENERAL_Total Vendido"] = 0, 0
+
+    # Almacenes considerados en el orden de la tabla de acciones (uno por columna k)
+    almacenes = []
+    if es_dataframe_valido(seleccion_almacenes):
+        for alm, accion in seleccion_almacenes.loc[seleccion_almacenes['Acción'] != 'No Considerar', ['Almacén Destino', 'Acción']].itertuples(index=False):
+            if es_dataframe_valido(traspasos_data.get(alm)): almacenes.append((alm, accion))
+    if almacenes:
+        n, w = len(df), len(almacenes)
+        acciones = np.array([accion for _, accion in almacenes])
+        trasp = {k: traspasos_data[alm] for k, (alm, _) in enumerate(almacenes)}
+        manual = {k: ventas_manuales[alm] for k, (alm, accion) in enumerate(almacenes)
+                  if accion == "Considerar" and es_dataframe_valido(ventas_manuales.get(alm))}
+        pos, k, val = tabla_larga(trasp, ids, ['Cantidad Traspasada'])
+        traspasada = a_lo_ancho(n, w, pos, k, val['Cantidad Traspasada'])
+        con_traspaso = np.bincount(k, minlength=w)
+        pos, k, val = tabla_larga(manual, ids, ['Cantidad Vendida', 'Total Vendido'])
+        cant_manual, total_manual = a_lo_ancho(n, w, pos, k, val['Cantidad Vendida']), a_lo_ancho(n, w, pos, k, val['Total Vendido'])
+
+        costo_unit = sin_infinitos((df['TOTAL COMPRADO'] / df['CANTIDAD COMPRADA']).fillna(0).to_numpy(dtype=float))
+        with np.errstate(divide='ignore', invalid='ignore'): precio = sin_infinitos(total_manual / cant_manual)
+        exito = acciones == "Venta Exitosa"
+        considerar = np.isin(np.arange(w), list(manual))
+        vendida = np.where(exito, traspasada, np.where(considerar, np.minimum(cant_manual, traspasada), 0))
+        total = np.where(exito, traspasada * costo_unit[:, None], np.where(considerar, vendida * precio, 0))
+
+        nuevas = {}
+        for k, (alm, accion) in enumerate(almacenes):
+            t_df = traspasos_data[alm]
+            # Entero como en el agregado si todas las partes del reporte tienen traspaso (si no, el hueco era NaN)
+            entero = pd.api.types.is_integer_dtype(t_df['Cantidad Traspasada']) and con_traspaso[k] == n
+            nuevas[f"{alm}_Traspasada"] = traspasada[:, k].astype('int64') if entero else traspasada[:, k]
+            if accion == "Por analizar": hay_por_analizar |= bool((t_df['Cantidad Traspasada'] > 0).any())
+            if accion not in ("Venta Exitosa", "Considerar", "Por analizar"): continue
+            if exito[k]: nuevas[f"{alm}_Vendida"] = nuevas[f"{alm}_Traspasada"]
+            elif considerar[k]: nuevas[f"{alm}_Vendida"] = vendida[:, k]
+            else: nuevas[f"{alm}_Vendida"] = np.zeros(n, dtype='int64')
+            nuevas[f"{alm}_Total Vendido"] = total[:, k] if exito[k] or considerar[k] else np.zeros(n, dtype='int64')
+        df = pd.concat([df, pd.DataFrame(nuevas)], axis=1)
+        por_analizar = (traspasada[:, acciones == "Por analizar"] > 0).any(axis=1)
+
+    df.fillna(0, inplace=True)
+    c_v = [c for c in df.columns if '_Vendida' in c or '_Venta Directa' in c]
+    c_t = [c for c in df.columns if '_Total Vendido' in c]
+    df['CANTIDAD VENDIDA'] = df[c_v].sum(axis=1)
+    df['TOTAL VENDIDO'] = df[c_t].sum(axis=1)
+    # Como antes: con cualquier traspaso "Por analizar" (aunque sea de partes fuera del reporte) la columna pasa a object
+    if hay_por_analizar:
+        df['CANTIDAD VENDIDA'] = df['CANTIDAD VENDIDA'].astype(object)
+        df.loc[por_analizar, 'CANTIDAD VENDIDA'] = "Por analizar"
+    return df
+
+COLUMNAS_BASE_REPORTE = ['ID PART', 'DESCRIPTION', 'PRODUCT LINE', 'TOTAL COMPRADO', 'CANTIDAD COMPRADA', 'CANTIDAD VENDIDA', 'TOTAL TRASPASOS', 'TOTAL VENDIDO', 'Fecha Ult. Comp.']
+
+def hoja_reporte(hoja, df):
+    """
+    (hoja, columnas en el orden del reporte) para exportar.libro_reportes: las base primero (en 0 si
+    faltan) y luego las "<almacén>_<dato>", ALMACEN GENERAL antes que el resto.
+    """
+    if not es_dataframe_valido(df): return hoja, None
+    gral = sorted([c for c in df.columns if 'ALMACEN GENERAL' in c])
+    otros = sorted([c for c in df.columns if c not in COLUMNAS_BASE_REPORTE and c not in gral])
+    return hoja, df.reindex(columns=COLUMNAS_BASE_REPORTE + gral + otros, fill_value=0)
+
+def generar_df_remanentes(df_compras_raw, df_ventas_gral, traspasos_dict, manuales_dict, df_config_almacenes):
+    if not es_dataframe_valido(df_compras_raw): return pd.DataFrame()
+    mapa_acciones = {}
+    if es_dataframe_valido(df_config_almacenes):
+        for _, r in df_config_almacenes.iterrows():
+            mapa_acciones[str(r['Almacén Destino']).strip()] = str(r['Acción']).strip()
+
+    # Salidas totales por ID PART: venta directa + traspasos "Venta Exitosa" + ventas manuales "Considerar"
+    salidas = []
+    if es_dataframe_valido(df_ventas_gral): salidas.append(df_ventas_gral.groupby('ID PART')['Cantidad Vendida'].sum())
+    for nombre_almacen, t_df in traspasos_dict.items():
+        if not es_dataframe_valido(t_df): continue
+        accion = mapa_acciones.get(nombre_almacen, "Considerar") 
+        if accion == "Venta Exitosa":
+            salidas.append(t_df.groupby('ID PART')['Cantidad Traspasada'].sum())
+        elif accion == "Considerar":
+            v_manual = manuales_dict.get(nombre_almacen)
+            if es_dataframe_valido(v_manual): salidas.append(v_manual.groupby('ID PART')['Cantidad Vendida'].sum())
+    total_salidas = pd.concat(salidas).groupby(level=0, sort=False).sum() if salidas else pd.Series(dtype='int64')
+
+    df_compras = df_compras_raw.copy()
+    df_compras['Periodo'] = df_compras['Fecha'].dt.to_period('M')
+    
+    compras_mensuales = df_compras.groupby(['ID PART', 'Periodo']).agg({
+        'CANTIDAD COMPRADA': 'sum',   
+        'TOTAL COMPRADO': 'sum',
+        'DESCRIPTION': 'first',
+        'PRODUCT LINE': 'first',
+        'Fecha': 'max'
+    }).reset_index()
+    
+    compras_mensuales = compras_mensuales.sort_values(by=['Periodo']).reset_index(drop=True)
+    
+    # FIFO por ID PART: las salidas consumen las compras mes a mes. Con S = salidas pendientes,
+    # cada mes hace S <- max(S - q, 0); su forma cerrada es S_i = max(S_0, máx. acumulado previo) - acumulado previo,
+    # que se calcula con cumsum/cummax agrupados (vale también con devoluciones, q < 0).
+    qty = compras_mensuales['CANTIDAD COMPRADA']
+    grupo = compras_mensuales['ID PART']
+    acumulado = qty.groupby(grupo, sort=False).cumsum()
+    previo = acumulado.groupby(grupo, sort=False).shift(fill_value=0)
+    tope_previo = acumulado.groupby(grupo, sort=False).cummax().groupby(grupo, sort=False).shift()
+    salidas_iniciales = grupo.map(total_salidas).fillna(0)
+    pendiente = np.maximum(salidas_iniciales, tope_previo.fillna(-np.inf)) - previo
+
+    queda = (pendiente < qty).to_numpy()
+    if not queda.any(): return pd.DataFrame()
+    residuo = (qty - pendiente)[queda]
+    if pd.api.types.is_integer_dtype(qty) and pd.api.types.is_integer_dtype(total_salidas): residuo = residuo.astype('int64')
+    costo_unit = (compras_mensuales['TOTAL COMPRADO'] / qty).where(qty > 0, 0)[queda]
+
+    df_remanentes = compras_mensuales[queda].copy()
+    df_remanentes['CANTIDAD COMPRADA'] = residuo
+    df_remanentes['TOTAL COMPRADO'] = residuo * costo_unit
+    df_remanentes['CANTIDAD VENDIDA'] = 0
+    df_remanentes['TOTAL TRASPASOS'] = 0
+    df_remanentes['TOTAL VENDIDO'] = 0
+    return df_remanentes.reset_index(drop=True)
+
+def reporte_agencia_por_mes(compras_raw, traspasos_raw, ventas_raw, manuales_periodo, seleccion_almacenes):
+    """
+    generar_reporte_agencia corrido una sola vez sobre todos los meses: (Periodo, ID PART) se
+    codifica como un entero ordenado y hace de ID PART; al final se reparte por mes y a cada mes
+    se le quitan las columnas de almacenes sin movimiento en ese mes, como en el reporte mes a mes.
+    """
+    compras = agregar_compras_periodo(compras_raw)
+    if compras.empty: return {}
+    traspasos = agregar_dict_periodo(traspasos_raw, 'Cantidad Traspasada')
+    ventas = agregar_datos_periodo(ventas_raw, 'Cantidad Vendida', 'Total Vendido')
+
+    fuentes = [compras, ventas] + list(traspasos.values()) + list(manuales_periodo.values())
+    pares = pd.concat([f[['Periodo', 'ID PART']] for f in fuentes if es_dataframe_valido(f)]).drop_duplicates()
+    claves = pd.MultiIndex.from_frame(pares.sort_values(['Periodo', 'ID PART'], kind='stable'))
+    def codificar(agg):
+        if not es_dataframe_valido(agg): return pd.DataFrame()
+        codigo = claves.get_indexer(pd.MultiIndex.from_frame(agg[['Periodo', 'ID PART']]))
+        return agg.drop(columns='Periodo').assign(**{'ID PART': codigo})
+
+    reporte = generar_reporte_agencia(codificar(compras), {k: codificar(v) for k, v in traspasos.items()}, seleccion_almacenes,
+                                      codificar(ventas), {k: codificar(v) for k, v in manuales_periodo.items()})
+    if reporte.empty: return {}
+    codigo = reporte['ID PART'].to_numpy()
+    reporte['ID PART'] = claves.get_level_values('ID PART')[codigo]
+
+    # Qué almacenes tuvieron traspasos en cada mes y en qué meses hubo algo "Por analizar"
+    presentes, meses_por_analizar = {}, set()
+    acciones = dict(zip(seleccion_almacenes['Almacén Destino'], seleccion_almacenes['Acción'])) if es_dataframe_valido(seleccion_almacenes) else {}
+    for alm, agg in traspasos.items():
+        for p in agg['Periodo'].unique(): presentes.setdefault(p, set()).add(alm)
+        if acciones.get(alm) == "Por analizar": meses_por_analizar.update(agg.loc[agg['Cantidad Traspasada'] > 0, 'Periodo'])
+    con_columnas = [a for a, acc in acciones.items() if acc != 'No Considerar' and a in traspasos]
+
+    por_mes = {}
+    for p, g in reporte.groupby(claves.get_level_values('Periodo')[codigo], sort=False):
+        ausentes = [f"{a}_{c}" for a in con_columnas if a not in presentes.get(p, ()) for c in ('Traspasada', 'Vendida', 'Total Vendido')]
+        g = g.drop(columns=ausentes).reset_index(drop=True)
+        if p not in meses_por_analizar: g['CANTIDAD VENDIDA'] = g['CANTIDAD VENDIDA'].infer_objects()
+        por_mes[p] = g
+    return por_mes
+
+def generar_reportes_mensuales(compras_cua, compras_tul, traspasos_cua, traspasos_tul, ventas_cua, ventas_tul, ventas_manuales, almacenes_cua, almacenes_tul):
+    """Genera (nombre_hoja, DataFrame) mes por mes, en el mismo orden de hojas del reporte mensual."""
+    manuales = agregar_dict_periodo(ventas_manuales, 'Cantidad Vendida', 'Total Vendido')
+    rep_cua = reporte_agencia_por_mes(compras_cua, traspasos_cua, ventas_cua, manuales, almacenes_cua)
+    rep_tul = reporte_agencia_por_mes(compras_tul, traspasos_tul, ventas_tul, manuales, almacenes_tul)
+
+    periodos = set()
+    for d in [compras_cua, compras_tul] + list(traspasos_cua.values()):
+        if es_dataframe_valido(d): periodos.update(periodo_mensual(d).dropna().unique())
+    for p in sorted(periodos):
+        name = nombre_mes(p)
+        yield f"Cuautitlan_{name}", rep_cua.get(p, pd.DataFrame())
+        yield f"Tultitlan_{name}", rep_tul.get(p, pd.DataFrame())
+
+def fuentes_codificadas(fuentes):
+    """
+    `fuentes` son las bases crudas en el orden de FUENTES_FIFO, con ID PART como código de un solo catálogo para
+    la corrida (ver catalogo_partes): devuelve (catálogo, fuentes). Agrupar y cruzar sobre enteros es más rápido
+    que sobre texto, y 12345 / "12345" / 12345.0 quedan como la misma parte.
+    """
+    return codificar_tablas(list(fuentes), 'ID PART')
+
+def hojas_remanentes(rem_cua, rem_tul):
+    """(nombre_hoja, DataFrame) de los remanentes mes por mes, Cuautitlán y Tultitlán alternados."""
+    dates_rem = [r['Fecha'] for r in (rem_cua, rem_tul) if not r.empty]
+    if not dates_rem: return
+    for p in sorted(pd.concat(dates_rem).dt.to_period('M').unique()):
+        name = nombre_mes(p)
+        for agencia, rem in (("Cuautitlan", rem_cua), ("Tultitlan", rem_tul)):
+            mes = rem[rem['Fecha'].dt.to_period('M')==p].copy() if not rem.empty else pd.DataFrame()
+            if not mes.empty:
+                mes['Fecha Ult. Comp.'] = mes['Fecha'].dt.strftime('%d/%m/%Y')
+                mes.drop(columns=['Fecha', 'Periodo'], inplace=True, errors='ignore')
+            yield f"{agencia}_{name}", mes
+
+# --- LOS TRES REPORTES (RUTA DEL .XLSX, O None SI NO HAY HOJAS) ---
+@medido()
+def reporte_general(fuentes, almacenes_cua, almacenes_tul):
+    catalogo, (cc_raw, ct_raw, tc_raw, tt_raw, vc_raw, vt_raw, vm_raw) = fuentes_codificadas(fuentes)
+    v_m = agregar_dict_datos(vm_raw, 'Cantidad Vendida', 'Total Vendido')
+    fin_c = generar_reporte_agencia(agregar_compras(cc_raw), agregar_dict_datos(tc_raw, 'Cantidad Traspasada'), almacenes_cua,
+                                    agregar_datos_simples(vc_raw, 'Cantidad Vendida', 'Total Vendido'), v_m)
+    fin_t = generar_reporte_agencia(agregar_compras(ct_raw), agregar_dict_datos(tt_raw, 'Cantidad Traspasada'), almacenes_tul,
+                                    agregar_datos_simples(vt_raw, 'Cantidad Vendida', 'Total Vendido'), v_m)
+    return libro_reportes([hoja_reporte("Detalle_Cuautitlan", con_texto(fin_c, 'ID PART', catalogo)),
+                           hoja_reporte("Detalle_Tultitlan", con_texto(fin_t, 'ID PART', catalogo))], en_paralelo=False)
+
+@medido()
+def reporte_mensual(fuentes, almacenes_cua, almacenes_tul):
+    # Cada mes se calcula en un hilo mientras se escribe el anterior
+    catalogo, fuentes = fuentes_codificadas(fuentes)
+    return libro_reportes(hoja_reporte(hoja, con_texto(df, 'ID PART', catalogo))
+                          for hoja, df in generar_reportes_mensuales(*fuentes, almacenes_cua, almacenes_tul))
+
+@medido()
+def reporte_remanentes(fuentes, almacenes_cua, almacenes_tul):
+    catalogo, (cc_raw, ct_raw, tc_raw, tt_raw, vc_raw, vt_raw, vm_raw) = fuentes_codificadas(fuentes)
+    rem_cua = con_texto(generar_df_remanentes(cc_raw, vc_raw, tc_raw, vm_raw, almacenes_cua), 'ID PART', catalogo)
+    rem_tul = con_texto(generar_df_remanentes(ct_raw, vt_raw, tt_raw, vm_raw, almacenes_tul), 'ID PART', catalogo)
+    return libro_reportes(hoja_reporte(hoja, df) for hoja, df in hojas_remanentes(rem_cua, rem_tul))
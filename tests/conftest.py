@@ -0,0 +1,8 @@
+import os
+import sys
+
+# Los módulos viven en la raíz del repo; las versiones originales de referencia, en tests/referencias.py. De
+# benchmarks solo se toman el generador de libros de BPro y el servidor que imita a Drive (test_fuente_ventas)
+RAIZ = os.path.join(os.path.dirname(__file__), "..")
+sys.path.insert(0, os.path.join(RAIZ, "benchmarks"))
+sys.path.insert(0, RAIZ)
@@ -0,0 +1,106 @@
+"""
+Referencias para las pruebas de equivalencia: las versiones originales (por registro / por celda) de las funciones
+que se vectorizaron y los generadores de datos sintéticos. Los benchmarks las importan de aquí.
+"""
+import re
+
+import numpy as np
+import pandas as pd
+
+from reportes_fifo import es_dataframe_valido
+
+ACCIONES = ["Considerar", "Venta Exitosa", "Por analizar", "No Considerar"]
+
+
+# --- REMANENTES: BUCLE FIFO ORIGINAL ---
+def generar_df_remanentes_bucle(df_compras_raw, df_ventas_gral, traspasos_dict, manuales_dict, df_config_almacenes):
+    if not es_dataframe_valido(df_compras_raw): return pd.DataFrame()
+    mapa_acciones = {}
+    if es_dataframe_valido(df_config_almacenes):
+        for _, r in df_config_almacenes.iterrows():
+            mapa_acciones[str(r['Almacén Destino']).strip()] = str(r['Acción']).strip()
+    total_salidas = {}
+    if es_dataframe_valido(df_ventas_gral):
+        s = df_ventas_gral.groupby('ID PART')['Cantidad Vendida'].sum()
+        for pid, cant in s.items(): total_salidas[pid] = total_salidas.get(pid, 0) + cant
+    for nombre_almacen, t_df in traspasos_dict.items():
+        if not es_dataframe_valido(t_df): continue
+        accion = mapa_acciones.get(nombre_almacen, "Considerar")
+        if accion == "Venta Exitosa":
+            s = t_df.groupby('ID PART')['Cantidad Traspasada'].sum()
+            for pid, cant in s.items(): total_salidas[pid] = total_salidas.get(pid, 0) + cant
+        elif accion == "Considerar":
+            v_manual = manuales_dict.get(nombre_almacen)
+            if es_dataframe_valido(v_manual):
+                s = v_manual.groupby('ID PART')['Cantidad Vendida'].sum()
+                for pid, cant in s.items(): total_salidas[pid] = total_salidas.get(pid, 0) + cant
+    df_compras = df_compras_raw.copy()
+    df_compras['Periodo'] = df_compras['Fecha'].dt.to_period('M')
+    compras_mensuales = df_compras.groupby(['ID PART', 'Periodo']).agg({'CANTIDAD COMPRADA': 'sum', 'TOTAL COMPRADO': 'sum', 'DESCRIPTION': 'first', 'PRODUCT LINE': 'first', 'Fecha': 'max'}).reset_index()
+    compras_mensuales = compras_mensuales.sort_values(by=['Periodo'])
+    filas_remanentes = []
+    for row in compras_mensuales.to_dict('records'):
+        pid = row['ID PART']
+        qty_mes = row['CANTIDAD COMPRADA']
+        costo_unit = row['TOTAL COMPRADO'] / qty_mes if qty_mes > 0 else 0
+        salidas_acumuladas = total_salidas.get(pid, 0)
+        if salidas_acumuladas >= qty_mes:
+            total_salidas[pid] = salidas_acumuladas - qty_mes  # el original hacía -= y tronaba (KeyError) si la parte no tenía salidas
+        else:
+            residuo = qty_mes - salidas_acumuladas
+            total_salidas[pid] = 0
+            row['CANTIDAD COMPRADA'] = residuo
+            row['TOTAL COMPRADO'] = residuo * costo_unit
+            row['CANTIDAD VENDIDA'] = 0
+            row['TOTAL TRASPASOS'] = 0
+            row['TOTAL VENDIDO'] = 0
+            filas_remanentes.append(row)
+    return pd.DataFrame(filas_remanentes)
+
+
+# --- REMANENTES: HISTORIAS SINTÉTICAS ---
+def generar_historia(n_partes, n_meses, semilla=0, devoluciones=0.0, flotantes=False):
+    """Compras crudas, venta directa, traspasos por almacén, ventas manuales y la tabla de acciones."""
+    rng = np.random.default_rng(semilla)
+    n = n_partes * n_meses
+    fechas = pd.Timestamp("2024-01-01") + pd.to_timedelta(rng.integers(0, 30 * n_meses, n), unit="D")
+    cantidad = rng.integers(1, 30, n) * np.where(rng.random(n) < devoluciones, -1, 1)
+    if flotantes: cantidad = cantidad * 0.5
+    compras = pd.DataFrame({"ID PART": [f"P{i}" for i in rng.integers(0, n_partes, n)], "DESCRIPTION": "PIEZA",
+                            "PRODUCT LINE": "LINEA", "CANTIDAD COMPRADA": cantidad,
+                            "TOTAL COMPRADO": np.round(rng.random(n) * 1000, 2), "Fecha": fechas})
+
+    def salidas(col, m):
+        return pd.DataFrame({"ID PART": [f"P{i}" for i in rng.integers(0, n_partes, m)], col: rng.integers(1, 20, m) * (0.5 if flotantes else 1),
+                             "Total Vendido": rng.random(m) * 500, "Fecha": fechas[:m]})
+
+    almacenes = [f"ALM {i}" for i in range(6)]
+    traspasos = {a: salidas("Cantidad Traspasada", n // 8).drop(columns="Total Vendido") for a in almacenes}
+    manuales = {a: salidas("Cantidad Vendida", n // 10) for a in almacenes[::2]}
+    config = pd.DataFrame({"Almacén Destino": almacenes[:-1], "Acción": [ACCIONES[i % 4] for i in range(5)]})
+    return compras, salidas("Cantidad Vendida", n // 3), traspasos, manuales, config
+
+
+# --- FECHAS DEL DRIVE: VERSIÓN ORIGINAL POR CELDA ---
+def limpiar_fecha_robusta(valor, es_tulti):
+    if pd.isna(valor) or str(valor).strip() == "": return pd.NaT
+    valor_str = str(valor).lower().strip()
+    reemplazos = {'enero':'01','febrero':'02','marzo':'03','abril':'04','mayo':'05','junio':'06',
+                  'julio':'07','agosto':'08','septiembre':'09','octubre':'10','noviembre':'11','diciembre':'12',
+                  ' de ':'/',' del ':'/',',':''}
+    for d in ['lunes','martes','miércoles','miercoles','jueves','viernes','sábado','sabado','domingo']: valor_str = valor_str.replace(d, '')
+    for txt, num in reemplazos.items(): valor_str = valor_str.replace(txt, str(num))
+    valor_str = re.sub(r'\s+', ' ', valor_str).strip().replace('-', '/')
+    try:
+        return pd.to_datetime(valor_str, dayfirst=not es_tulti)
+    except: return pd.NaT
+
+
+# --- VENTAS MASTER: FASE 4 ORIGINAL ---
+def ventas_original(ruta, es_csv=True):
+    df_ventas = pd.read_csv(ruta, encoding='latin1') if es_csv else pd.read_excel(ruta)
+    df_ventas['FECHA'] = pd.to_datetime(df_ventas['FECHA'], dayfirst=True, errors='coerce')
+    df_ventas = df_ventas[df_ventas['FECHA'].dt.year == 2026]
+    df_ventas['ALMACEN_NORM'] = df_ventas['ALMACEN'].astype(str).str.upper()
+    df_ventas['AGENCIA'] = df_ventas['ALMACEN_NORM'].apply(lambda x: 'CUAUTITLAN' if 'CUAUTI' in x else ('TULTITLAN' if 'TULTI' in x else x))
+    return df_ventas
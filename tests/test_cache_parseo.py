@@ -0,0 +1,85 @@
+import os
+import stat
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import almacen_incremental
+import cache_parseo
+from cache_parseo import guardar, leer
+
+
+# --- CACHÉ DE PARSEO EN DISCO ---
+@pytest.fixture(autouse=True)
+def carpetas(tmp_path, monkeypatch):
+    monkeypatch.setattr(cache_parseo, "CACHE_DIR", str(tmp_path / "cache"))
+    monkeypatch.setattr(almacen_incremental, "ALMACEN_DIR", str(tmp_path / "almacen"))
+
+
+def mixto():
+    # NP de BPro: números y textos en la misma columna object, más nulos y una columna solo de texto
+    return pd.DataFrame({"NP": [1234, "AB-12", None, 56.5, "0099", True, np.int64(7)], "DESC": ["a", "b", None, "d", "e", "f", "g"],
+                         "CANT": range(7)})
+
+
+def assert_identicos(obtenido, esperado):
+    pd.testing.assert_frame_equal(obtenido, esperado)
+    for c in esperado.columns[esperado.dtypes == object]:
+        assert [type(v) for v in obtenido[c]] == [type(v.item() if isinstance(v, np.generic) else v) for v in esperado[c]]
+
+
+def test_columnas_mixtas_vuelven_con_sus_tipos_y_sin_pickle():
+    df = mixto()
+    guardar("llave", {"base": df, "extra": (df.iloc[:0], df)})
+    resultado = leer("llave")
+    assert_identicos(resultado["base"], df)
+    assert_identicos(resultado["extra"][1], df)
+    carpeta = os.path.join(cache_parseo.carpeta_parseo(), "llave")
+    assert not [n for n in os.listdir(carpeta) if not n.endswith((".parquet", ".json"))]
+
+
+def test_entrada_corrupta_cuenta_como_fallo():
+    guardar("llave", mixto())
+    carpeta = os.path.join(cache_parseo.carpeta_parseo(), "llave")
+    with open(os.path.join(carpeta, "1.parquet"), "wb") as f: f.write(b"no es parquet")
+    assert leer("llave") is None
+    with open(os.path.join(carpeta, "manifest.json"), "w") as f: f.write('{"tipo": "df", "archivo": "1.pkl"}')
+    assert leer("llave") is None
+    with open(os.path.join(carpeta, "manifest.json"), "w") as f: f.write('["no es un manifest"]')
+    assert leer("llave") is None
+
+
+@pytest.mark.skipif(not hasattr(os, "getuid"), reason="permisos POSIX")
+def test_la_cache_es_privada_del_usuario():
+    guardar("llave", mixto())
+    assert stat.S_IMODE(os.stat(cache_parseo.CACHE_DIR).st_mode) == 0o700
+    os.chmod(cache_parseo.carpeta_parseo(), 0o777)
+    guardar("otra", mixto())
+    assert stat.S_IMODE(os.stat(cache_parseo.carpeta_parseo()).st_mode) == 0o700
+
+
+def test_almacen_guarda_columnas_mixtas():
+    df = mixto()
+    carpeta = os.path.join(almacen_incremental.ALMACEN_DIR, "compras")
+    almacen_incremental.escribir_parte(carpeta, df)
+    assert_identicos(almacen_incremental.leer_particion(carpeta), df)
+
+
+def test_llave_normalizada_contra_la_firma():
+    llamadas = []
+
+    @cache_parseo.cache_parseo(version=1)
+    def parser(file, agencia, hojas=None, streaming=None):
+        llamadas.append((agencia, hojas, streaming))
+        return mixto()
+
+    datos = b"export de BPro"
+    parser(datos, "CRCU")
+    parser(datos, agencia="CRCU")
+    parser(datos, "CRCU", None, streaming=True)
+    parser(datos, "CRCU", streaming=False)
+    assert llamadas == [("CRCU", None, None)]
+    parser(datos, "CRTU")
+    parser(datos, "CRCU", hojas=["Hoja1"])
+    assert llamadas[1:] == [("CRTU", None, None), ("CRCU", ["Hoja1"], None)]
@@ -0,0 +1,95 @@
+from collections import OrderedDict
+from types import SimpleNamespace
+
+import pandas as pd
+import pytest
+
+import almacen_incremental
+import cache_reportes
+import memoria_sesion
+from limpiador_01 import BaseFaltante, claves_entradas, fuentes_sesion
+
+
+# --- CACHÉ DE REPORTES CONTRA EL HISTÓRICO ---
+@pytest.fixture(autouse=True)
+def carpetas(tmp_path, monkeypatch):
+    monkeypatch.setattr(cache_reportes, "CACHE_DIR", str(tmp_path / "cache"))
+    monkeypatch.setattr(almacen_incremental, "ALMACEN_DIR", str(tmp_path / "almacen"))
+    monkeypatch.setattr(memoria_sesion, "CACHE_DIR", str(tmp_path / "cache"))
+    monkeypatch.setattr(memoria_sesion, "MEMORIA", OrderedDict())
+    monkeypatch.setattr(memoria_sesion, "DUENOS", {})
+
+
+def sesion():
+    """Handles de una sesión con todas las bases cargadas (los valores no importan: solo forman la llave)."""
+    return SimpleNamespace(df_compras_cua_raw="cc", df_compras_tul_raw="ct", traspasos_cua_data_raw="tc", traspasos_tul_data_raw="tt",
+                           ventas_gral_cua_raw="vc", ventas_gral_tul_raw="vt", ventas_manuales_raw={"ALM 2": "m2", "ALM 1": "m1", "ALM 3": None})
+
+
+def compras(facturas):
+    return pd.DataFrame({"FACTURA": facturas, "ID PART": "P1", "Fecha": pd.Timestamp("2026-02-10"), "CANTIDAD COMPRADA": 1})
+
+
+class Reporte:
+    """calcular() para reporte_en_cache: escribe un libro falso y cuenta cuántas veces se calculó."""
+
+    def __init__(self, carpeta):
+        self.carpeta, self.veces = carpeta, 0
+
+    def __call__(self):
+        self.veces += 1
+        ruta = self.carpeta / f"libro-{self.veces}.xlsx"
+        ruta.write_bytes(b"libro")
+        return str(ruta)
+
+
+def pedir(reporte, usar_historico=True):
+    almacenes = (pd.DataFrame({"Almacén Destino": ["ALM 1"], "Acción": ["Considerar"]}), pd.DataFrame())
+    return cache_reportes.reporte_en_cache("general", 1, claves_entradas(sesion(), usar_historico), almacenes, reporte)
+
+
+def test_agregar_al_historico_hace_fallar_la_cache(tmp_path):
+    reporte = Reporte(tmp_path)
+    almacen_incremental.agregar("compras_fifo", compras(["F1", "F2"]), "CRCU")
+    ruta, de_cache = pedir(reporte)
+    assert not de_cache and reporte.veces == 1
+    assert pedir(reporte) == (ruta, True) and reporte.veces == 1
+
+    # Otra sesión agrega filas nuevas al histórico de Cuautitlán: mismos handles, pero el reporte se recalcula
+    assert almacen_incremental.agregar("compras_fifo", compras(["F3"]), "CRCU")["nuevas"] == 1
+    nueva, de_cache = pedir(reporte)
+    assert not de_cache and reporte.veces == 2 and nueva != ruta
+
+    # Un export que ya estaba no escribe nada: la huella no cambia y el reporte sale de la caché
+    assert almacen_incremental.agregar("compras_fifo", compras(["F3"]), "CRCU")["nuevas"] == 0
+    assert pedir(reporte)[1] and reporte.veces == 2
+
+
+def test_sin_historico_la_llave_no_depende_del_almacen(tmp_path):
+    reporte = Reporte(tmp_path)
+    pedir(reporte, usar_historico=False)
+    almacen_incremental.agregar("ventas_fifo", compras(["F1"]).rename(columns={"FACTURA": "REFERENCIA"}), "VRTU")
+    assert pedir(reporte, usar_historico=False)[1] and reporte.veces == 1
+
+
+def test_orden_de_manuales_no_cambia_la_llave():
+    a, b = sesion(), sesion()
+    b.ventas_manuales_raw = dict(reversed(list(a.ventas_manuales_raw.items())))
+    assert claves_entradas(a, False) == claves_entradas(b, False)
+
+
+def test_handle_perdido_no_se_calcula_vacio_ni_se_guarda(tmp_path):
+    estado = sesion()
+    for h in ("df_compras_cua_raw", "df_compras_tul_raw", "ventas_gral_cua_raw"): memoria_sesion.poner(getattr(estado, h), compras(["F1"]), "s")
+    for h in ("traspasos_cua_data_raw", "traspasos_tul_data_raw"): memoria_sesion.poner(getattr(estado, h), {"ALM 1": compras(["F1"])}, "s")
+    memoria_sesion.poner("m1", compras(["F1"]), "s")
+    estado.ventas_gral_tul_raw, estado.ventas_manuales_raw = None, {"ALM 1": "m1"}  # ventas opcionales que no se subieron
+    assert fuentes_sesion(estado, "s")[5].empty
+
+    estado.ventas_manuales_raw["ALM 2"] = "m2"  # el handle existe pero su base ya no está ni en memoria ni en disco
+    reporte = Reporte(tmp_path)
+    calcular = lambda: reporte() if fuentes_sesion(estado, "s") else None
+    with pytest.raises(BaseFaltante, match="ALM 2"): pedir(calcular)
+    assert reporte.veces == 0
+    memoria_sesion.poner("m2", compras(["F2"]), "s")
+    assert pedir(calcular)[1] is False and reporte.veces == 1
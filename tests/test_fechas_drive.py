@@ -0,0 +1,67 @@
+import warnings
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from cruce_drive import limpiar_fechas
+from referencias import limpiar_fecha_robusta
+
+# --- CORPUS DE FORMATOS VISTOS EN LOS DRIVE DE AMBAS AGENCIAS ---
+CORPUS = [
+    # Texto largo (formato de fecha "largo" de Google Sheets en español)
+    "jueves, 5 de marzo de 2026", "Jueves, 5 de Marzo de 2026", "JUEVES, 05 DE MARZO DE 2026", "lunes, 12 de enero del 2026",
+    "miércoles, 1 de abril de 2026", "miercoles 1 de abril de 2026", "sábado, 31 de enero de 2026", "sabado 31 de enero 2026",
+    "domingo, 15 de septiembre de 2025", "5 de marzo de 2026", "5 de marzo del 2026", "05 de Diciembre, 2025",
+    "martes 3 de febrero de 2026 ", "  viernes,  27  de  noviembre  de 2026", "1 de mayo de 2026 10:30",
+    "jueves, 5 de marzo", "marzo 2026", "5 de marz0 de 2026",
+    # Numérico, día/mes o mes/día según la agencia (con día y mes de un dígito)
+    "05/03/2026", "5/3/2026", "1/2/2026", "9/1/2026", "1/9/2026", "13/03/2026", "03/13/2026", "1/13/2026", "31/12/2025",
+    "12/31/2025", "29/02/2026", "02/29/2024", "05-03-2026", "5-3-2026", "1-2-2026",
+    # Año primero: ambiguo (día y mes <= 12), sin ceros, mes imposible o día > 12
+    "2026-03-05", "2026/03/05", "2026/3/5", "2026/1/2", "2026/12/01", "2026/01/12", "2026-13-05", "2026/05/13", "2026/13/05",
+    # Con hora, a. m. / p. m. y años de 2 dígitos
+    "05/03/2026 10:15:00", "5/3/2026 10:15", "5/3/2026 9:05:07", "2026-03-05 00:00:00", "05/03/2026 10:15:00 a. m.",
+    "05/03/2026 22:15:00 p. m.", "5/3/26", "05/03/26", "13/03/26", "03/13/26", "5/3/75", "5/3/70", "5.3.2026", "5 03 2026",
+    # Basura y vacíos
+    "", " ", "   ", "N/A", "pendiente", "sin fecha", "32/01/2026", "00/00/0000", "45000", "2026", "de", ",", "-",
+    None, np.nan, 45000, 45000.0, 5.0,
+]
+AGENCIAS = pytest.mark.parametrize("es_tulti", [False, True], ids=["cuautitlan", "tultitlan"])
+
+
+def referencia(col, es_tulti):
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore")
+        return col.apply(lambda x: limpiar_fecha_robusta(x, es_tulti=es_tulti))
+
+
+def nueva(col, es_tulti):
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore")
+        return limpiar_fechas(col, es_tulti)
+
+
+@AGENCIAS
+@pytest.mark.parametrize("valor", CORPUS, ids=repr)
+def test_cada_formato_como_la_version_por_celda(valor, es_tulti):
+    esperado = referencia(pd.Series([valor], dtype=object), es_tulti).iloc[0]
+    obtenido = nueva(pd.Series([valor], dtype=object), es_tulti).iloc[0]
+    assert (pd.isna(obtenido) and pd.isna(esperado)) or obtenido == esperado
+
+
+@AGENCIAS
+@pytest.mark.parametrize("orden", [1, -1], ids=["corpus", "invertido"])
+def test_columna_completa(orden, es_tulti):
+    # Con todos los formatos juntos, el orden de aparición no debe cambiar qué formato gana para cada texto
+    col = pd.Series(CORPUS[::orden], index=range(100, 100 + len(CORPUS)), dtype=object)
+    pd.testing.assert_series_equal(nueva(col, es_tulti), referencia(col, es_tulti))
+
+
+@AGENCIAS
+def test_columna_vacia_y_sin_fechas(es_tulti):
+    # Columna vacía: .apply devuelve object (y .dt fallaba); la versión por columna siempre es datetime
+    vacia = nueva(pd.Series([], dtype=object), es_tulti)
+    assert vacia.empty and pd.api.types.is_datetime64_any_dtype(vacia)
+    col = pd.Series([None, "", "N/A"], dtype=object)
+    pd.testing.assert_series_equal(nueva(col, es_tulti), referencia(col, es_tulti))
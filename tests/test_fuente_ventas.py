@@ -0,0 +1,122 @@
+import os
+import urllib.error
+
+import pandas as pd
+import pytest
+
+import cache_parseo
+import ventas_master
+from bench_fuente_ventas import Servidor
+from generador_bpro import escribir_ventas
+from referencias import ventas_original
+from ventas_master import leer_ventas_master
+
+
+# --- SERVIDOR LOCAL QUE IMITA A GOOGLE DRIVE ---
+@pytest.fixture
+def servidor(tmp_path, monkeypatch):
+    monkeypatch.setattr(cache_parseo, "CACHE_DIR", str(tmp_path / "cache"))
+    monkeypatch.setattr(ventas_master, "ESPERA_REINTENTO", 0.01)
+    servidor = Servidor()
+    yield servidor
+    servidor.http.shutdown()
+    servidor.http.server_close()
+
+
+@pytest.fixture
+def ventas(tmp_path):
+    ruta = str(tmp_path / "ventas.csv")
+    escribir_ventas(ruta, 5_000)
+    return ruta
+
+
+def publicar(servidor, ruta, path="/ventas"):
+    with open(ruta, "rb") as f: servidor.archivos[path] = f.read()
+    return servidor.url(path)
+
+
+def estados(informe):
+    return [estado for _, estado in informe["archivos"]]
+
+
+def test_archivo_y_carpeta_locales(tmp_path, servidor, ventas):
+    df, informe = leer_ventas_master(ventas)
+    assert informe["origen"] == "local" and len(df) == len(ventas_original(ventas))
+    assert estados(leer_ventas_master(ventas)[1]) == ["caché"]
+    carpeta = tmp_path / "historia"
+    carpeta.mkdir()
+    for semilla, nombre in enumerate(("2025.csv", "2026.csv"), 1): escribir_ventas(str(carpeta / nombre), 3_000, semilla=semilla)
+    df, informe = leer_ventas_master(str(carpeta))
+    assert [n for n, _ in informe["archivos"]] == ["2025.csv", "2026.csv"]
+    assert len(df) == sum(len(ventas_original(str(carpeta / n))) for n in ("2025.csv", "2026.csv"))
+
+
+def test_etag_revalida_con_304_sin_bajar_ni_parsear(servidor, ventas):
+    url = publicar(servidor, ventas)
+    df, informe = leer_ventas_master(url)
+    assert informe["origen"] == "descargado" and estados(informe) == ["parseado"]
+    antes = servidor.enviados
+    df_304, informe = leer_ventas_master(url)
+    assert informe["origen"] == "sin cambios (304)" and estados(informe) == ["caché"] and informe["bytes_descargados"] == 0
+    assert servidor.peticiones[-1] == 304 and servidor.enviados == antes and len(df_304) == len(df)
+
+
+def test_contenido_nuevo_se_baja_y_se_parsea(servidor, ventas):
+    url = publicar(servidor, ventas)
+    leer_ventas_master(url)
+    escribir_ventas(ventas, 5_000, semilla=5)
+    publicar(servidor, ventas)
+    df, informe = leer_ventas_master(url)
+    assert informe["origen"] == "descargado" and estados(informe) == ["parseado"] and len(df) == len(ventas_original(ventas))
+    assert len(os.listdir(ventas_master.carpeta_descarga(url))) == 2  # meta.json + la copia vigente
+
+
+def test_sin_validadores_se_baja_pero_el_hash_evita_el_parseo(servidor, ventas):
+    servidor.validadores = False
+    url = publicar(servidor, ventas)
+    leer_ventas_master(url)
+    _, informe = leer_ventas_master(url)
+    assert informe["origen"] == "descargado" and informe["bytes_descargados"] > 0 and estados(informe) == ["caché"]
+    assert servidor.peticiones == [200, 200]
+
+
+def test_503_se_reintenta(servidor, ventas):
+    url = publicar(servidor, ventas)
+    servidor.fallas = 2
+    df, informe = leer_ventas_master(url)
+    assert servidor.peticiones == [503, 503, 200] and informe["origen"] == "descargado" and len(df) == len(ventas_original(ventas))
+
+
+def test_503_persistente_falla_al_agotar_reintentos(servidor, ventas):
+    url = publicar(servidor, ventas)
+    servidor.fallas = ventas_master.REINTENTOS
+    with pytest.raises(urllib.error.HTTPError) as error: leer_ventas_master(url)
+    assert error.value.code == 503 and servidor.peticiones == [503] * ventas_master.REINTENTOS
+
+
+def test_404_falla_sin_reintentar(servidor):
+    with pytest.raises(urllib.error.HTTPError) as error: leer_ventas_master(servidor.url("/no-existe"))
+    assert error.value.code == 404 and servidor.peticiones == [404]
+
+
+@pytest.mark.filterwarnings("ignore:Parsing dates in %m/%d/%Y format")
+def test_formato_de_fecha_aunque_el_primer_bloque_no_traiga_fechas(tmp_path, monkeypatch):
+    # mm/dd: el primer valor (03/13) fija el formato; si se adivinara por bloque, 03/05 se leería como 3 de mayo
+    ruta = str(tmp_path / "ventas.csv")
+    fechas = [""] * 6 + ["03/13/2026", "03/05/2026", "12/01/2025", "01/02/2026", "", "11/30/2026"]
+    with open(ruta, "w", encoding="latin1") as f:
+        f.write("FECHA,ALMACEN,NP,CANTIDAD\n" + "".join(f"{fecha},ALM CUAUTITLAN,NP{i},{i}\n" for i, fecha in enumerate(fechas)))
+    monkeypatch.setattr(ventas_master, "FILAS_POR_BLOQUE", 4)
+    df = ventas_master.parsear_ventas(ruta, True, 2026)
+    assert df["FECHA"].tolist() == list(pd.to_datetime(["2026-03-13", "2026-03-05", "2026-01-02", "2026-11-30"]))
+    assert df["FECHA"].tolist() == ventas_original(ruta)["FECHA"].tolist()
+
+
+def test_la_web_solo_acepta_urls_o_la_carpeta_permitida(tmp_path, monkeypatch):
+    assert ventas_master.origen_web_permitido("https://drive.google.com/uc?id=abc")
+    monkeypatch.setattr(ventas_master, "CARPETA_LOCAL_WEB", None)
+    assert not ventas_master.origen_web_permitido("/etc/passwd") and not ventas_master.origen_web_permitido("file:///etc/passwd")
+    monkeypatch.setattr(ventas_master, "CARPETA_LOCAL_WEB", str(tmp_path / "ventas"))
+    assert ventas_master.origen_web_permitido(str(tmp_path / "ventas" / "2026.csv"))
+    assert not ventas_master.origen_web_permitido(str(tmp_path / "ventas" / ".." / "otra.csv"))
+    assert not ventas_master.origen_web_permitido(str(tmp_path / "ventas2" / "2026.csv"))
@@ -0,0 +1,27 @@
+import datetime
+import warnings
+
+import pandas as pd
+import pytest
+
+from parsers_bpro import como_fecha
+
+
+# --- FECHAS DE ENCABEZADO DE BPRO ---
+@pytest.mark.parametrize("orden", [1, -1], ids=["rara-al-inicio", "rara-al-final"])
+def test_como_fecha_no_infiere_el_formato_del_primer_valor(orden):
+    # Un valor con otro formato (o basura) al inicio no debe cambiar cómo se leen los dd/mm/aaaa
+    valores = ["2024-03-06 00:00:00", "05/03/2024", "13/03/2024", "01/02/2024", None, "sin fecha"][::orden]
+    esperado = [None, pd.Timestamp("2024-03-05"), pd.Timestamp("2024-03-13"), pd.Timestamp("2024-02-01"), None, None][::orden]
+    with warnings.catch_warnings(record=True) as avisos:
+        warnings.simplefilter("always")
+        fechas = como_fecha(pd.Series(valores, dtype=object))
+    assert not [a for a in avisos if issubclass(a.category, UserWarning)]
+    assert pd.api.types.is_datetime64_any_dtype(fechas)
+    assert fechas.astype(object).where(fechas.notna(), None).tolist() == esperado
+
+
+def test_como_fecha_respeta_las_fechas_ya_convertidas():
+    fechas = pd.Series(pd.to_datetime(["2024-03-05", None]))
+    assert como_fecha(fechas) is fechas
+    assert como_fecha(pd.Series([datetime.datetime(2024, 1, 2), "05/03/2024"], dtype=object)).tolist() == [pd.Timestamp("2024-01-02"), pd.Timestamp("2024-03-05")]
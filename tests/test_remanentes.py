@@ -0,0 +1,34 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from referencias import generar_df_remanentes_bucle, generar_historia
+from reportes_fifo import generar_df_remanentes
+
+
+# --- PROPIEDAD: CUMSUM AGRUPADO == BUCLE FIFO ORIGINAL ---
+@pytest.mark.parametrize("semilla", range(300))
+def test_remanentes_como_el_bucle_original(semilla):
+    rng = np.random.default_rng(semilla)
+    flotantes = semilla % 5 == 0
+    args = generar_historia(int(rng.integers(1, 40)), int(rng.integers(1, 12)), semilla,
+                            devoluciones=rng.choice([0, 0.1, 0.4]), flotantes=flotantes)
+    pd.testing.assert_frame_equal(generar_df_remanentes(*args), generar_df_remanentes_bucle(*args), check_exact=not flotantes)
+
+
+def test_mes_neto_negativo_de_parte_sin_salidas():
+    # El bucle original tronaba aquí (KeyError): un mes con más devoluciones que compras en una parte sin salidas
+    compras = pd.DataFrame({"ID PART": ["P1", "P1", "P2"], "DESCRIPTION": "PIEZA", "PRODUCT LINE": "LINEA",
+                            "CANTIDAD COMPRADA": [-3, 10, 4], "TOTAL COMPRADO": [-30.0, 100.0, 8.0],
+                            "Fecha": pd.to_datetime(["2024-01-10", "2024-02-10", "2024-01-20"])})
+    ventas = pd.DataFrame({"ID PART": ["P2"], "Cantidad Vendida": [1], "Total Vendido": [5.0], "Fecha": pd.to_datetime(["2024-03-01"])})
+    remanentes = generar_df_remanentes(compras, ventas, {}, {}, pd.DataFrame())
+    # P1: enero neto -3 no deja remanente y, como en el bucle, suma 3 a las salidas que consume febrero (10 - 3).
+    # P2: enero 4 - 1 vendida = 3
+    assert remanentes[["ID PART", "CANTIDAD COMPRADA", "TOTAL COMPRADO"]].values.tolist() == [["P2", 3, 6.0], ["P1", 7, 70.0]]
+    pd.testing.assert_frame_equal(remanentes, generar_df_remanentes_bucle(compras, ventas, {}, {}, pd.DataFrame()))
+
+
+def test_sin_compras_no_hay_remanentes():
+    _, ventas, traspasos, manuales, config = generar_historia(5, 3)
+    assert generar_df_remanentes(pd.DataFrame(), ventas, traspasos, manuales, config).empty
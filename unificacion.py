@@ -0,0 +1,33 @@
+import pandas as pd
+from parsers_bpro import COLUMNAS_RECHAZADOS, ESQUEMA_COMPRAS, ESQUEMA_TRASPASOS, compras_bloque, traspasos_bloque
+from cache_parseo import cache_parseo
+from ejecucion import parsear_archivo
+from rendimiento import medido
+
+# Parsers del unificador de compras y traspasos (todas las hojas del reporte). Los usan app.py y limpiador_cli.
+
+# --- FUNCIÓN 1: LIMPIEZA DE COMPRAS (BPRO) ---
+@cache_parseo(version=4)
+def procesar_compras(file, nombre_agencia, streaming=None):
+    """
+    Limpia el archivo de compras evitando filas basura o subtotales.
+    Procesa todas las hojas manteniendo la continuidad de los encabezados.
+    streaming=True lee en bloques de filas (memoria acotada); None lo decide por tamaño de archivo.
+    """
+    # Una hoja por proceso (o bloques en streaming); los encabezados continúan si se corta el reporte
+    return parsear_archivo(compras_bloque, file, (nombre_agencia,), [ESQUEMA_COMPRAS], streaming)
+
+# --- FUNCIÓN 2: LIMPIEZA DE TRASPASOS (BPRO) ---
+@cache_parseo(version=4)
+def procesar_traspasos(file, nombre_agencia, streaming=None):
+    """
+    Limpia traspasos abarcando todas las variantes de salidas y evita subtotales finales.
+    Procesa todas las hojas manteniendo la continuidad de los encabezados.
+    Devuelve (traspasos, filas apartadas por CANTIDAD o COSTO no numérico).
+    """
+    # Niveles jerárquicos: SALIDA...HACIA -> REFERENCIA/FECHA MOV/USUARIO -> ítems TRAS*
+    return parsear_archivo(traspasos_bloque, file, (nombre_agencia,), [ESQUEMA_TRASPASOS, COLUMNAS_RECHAZADOS], streaming)
+
+@medido()
+def unir_bases(dfs):
+    return pd.concat(dfs, ignore_index=True)
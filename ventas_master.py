@@ -0,0 +1,206 @@
+import hashlib
+import json
+import os
+import tempfile
+import time
+import urllib.error
+import urllib.request
+
+import pandas as pd
+from pandas.tseries.api import guess_datetime_format
+
+import cache_parseo
+from cache_parseo import clave_cache, guardar, leer
+from catalogo_partes import por_codigo
+from lector_excel import motor_excel
+from rendimiento import medido
+
+# --- INGESTA DE VENTAS MASTER ---
+# Ventas Master es la entrada más grande (millones de renglones) y del cruce solo importan cuatro columnas y un
+# año. El CSV se lee en bloques con solo esas columnas y tipos explícitos, y a cada bloque se le aplica el filtro
+# de año antes de juntarlos: en memoria nunca está el archivo completo. La fecha se parsea una vez por texto
+# distinto, con el formato que pandas infiere del primer valor (lo mismo que hacía to_datetime sobre la columna),
+# y la agencia sale de los ALMACEN distintos, no renglón por renglón. El resultado queda en la caché de parseo
+# (Parquet) con el hash del archivo como llave: la siguiente corrida con el mismo archivo no parsea nada.
+COLUMNAS_VENTAS = ['FECHA', 'ALMACEN', 'NP', 'CANTIDAD']
+TIPOS_VENTAS = {'FECHA': str, 'ALMACEN': str, 'NP': str}
+FILAS_POR_BLOQUE = int(os.environ.get("LIMPIADOR_VENTAS_BLOQUE", 250_000))
+VERSION = 2
+
+def agencia_de(almacen):
+    nombre = str(almacen).upper()
+    return 'CUAUTITLAN' if 'CUAUTI' in nombre else ('TULTITLAN' if 'TULTI' in nombre else nombre)
+
+def agencias(almacenes):
+    """AGENCIA categórica: la regla de agencia_de se evalúa una vez por ALMACEN distinto."""
+    codigos, unicos = pd.factorize(almacenes)
+    codigos_agencia, nombres = pd.factorize(pd.Index([agencia_de(a) for a in unicos], dtype=object))
+    return pd.Categorical.from_codes(por_codigo(codigos_agencia, codigos), categories=nombres)
+
+def formato_fecha(fechas):
+    """Formato que pandas usaría para la columna (inferido del primer valor); None si no se reconoce."""
+    primera = fechas.dropna()
+    return guess_datetime_format(str(primera.iloc[0]), dayfirst=True) if len(primera) else None
+
+def parsear_fechas(fechas, formato):
+    if pd.api.types.is_datetime64_any_dtype(fechas): return fechas
+    codigos, unicos = pd.factorize(fechas)
+    if formato: leidas = pd.to_datetime(pd.Index(unicos), format=formato, errors='coerce')
+    else: leidas = pd.to_datetime(pd.Index(unicos), dayfirst=True, errors='coerce')
+    return pd.Series(leidas.take(codigos, allow_fill=True, fill_value=pd.NaT), index=fechas.index)
+
+def limpiar_bloque(bloque, formato, anio):
+    bloque = bloque.assign(FECHA=parsear_fechas(bloque['FECHA'], formato), CANTIDAD=pd.to_numeric(bloque['CANTIDAD'], errors='coerce'))
+    return bloque[(bloque['FECHA'].dt.year == anio).to_numpy()]
+
+def bloques_csv(ruta):
+    return pd.read_csv(ruta, usecols=COLUMNAS_VENTAS, dtype=TIPOS_VENTAS, encoding='latin1', chunksize=FILAS_POR_BLOQUE)
+
+def parsear_ventas(ruta, es_csv, anio):
+    """Ventas de `anio` con FECHA, ALMACEN, NP, CANTIDAD y AGENCIA."""
+    if es_csv: bloques = bloques_csv(ruta)
+    else: bloques = [pd.read_excel(ruta, usecols=COLUMNAS_VENTAS, dtype=TIPOS_VENTAS, engine=motor_excel(ruta))]
+    formato, con_fechas, filtrados = None, False, []
+    for bloque in bloques:
+        # El formato sale del primer valor no nulo del archivo, aunque los primeros bloques no traigan fechas
+        if not con_fechas: formato, con_fechas = formato_fecha(bloque['FECHA']), bloque['FECHA'].notna().any()
+        filtrados.append(limpiar_bloque(bloque, formato, anio))
+    df = pd.concat(filtrados, ignore_index=True) if filtrados else pd.DataFrame(columns=COLUMNAS_VENTAS)
+    df['AGENCIA'] = agencias(df['ALMACEN'])
+    return df
+
+# --- ORIGEN: ARCHIVO, CARPETA O URL ---
+# Una ruta local se lee tal cual (una carpeta aporta todos sus .csv / .xlsx / .xls). Una URL se descarga a
+# <CACHE_DIR>/descargas con su ETag / Last-Modified: la siguiente corrida hace un GET condicional y con un 304 no
+# baja nada. Si el servidor no manda esos encabezados (o el archivo cambió de fecha pero no de contenido), el hash
+# del contenido sigue siendo la llave de la caché de parseo, así que los mismos datos no se parsean dos veces.
+# Las rutas locales son para limpiador_cli: la interfaz web solo acepta URLs, salvo las rutas dentro de
+# LIMPIADOR_VENTAS_DIR (así ningún usuario de la página hace que el servidor lea un archivo cualquiera).
+EXTENSIONES_VENTAS = ('.csv', '.xlsx', '.xls')
+FIRMAS_EXCEL = (b"PK\x03\x04", b"\xd0\xcf\x11\xe0")  # zip (.xlsx) y contenedor OLE (.xls)
+TIEMPO_ESPERA = float(os.environ.get("LIMPIADOR_DESCARGA_TIMEOUT", 60))
+REINTENTOS = 3
+ESPERA_REINTENTO = 1.0
+CARPETA_LOCAL_WEB = os.environ.get("LIMPIADOR_VENTAS_DIR")
+HASHES_LOCALES = {}  # (ruta, tamaño, mtime) -> sha256: un archivo local sin cambios no se vuelve a leer para el hash
+
+def es_url(origen):
+    return str(origen).lower().startswith(("http://", "https://"))
+
+def origen_web_permitido(origen):
+    """Si la interfaz web puede leer este origen: una URL http(s) o una ruta dentro de LIMPIADOR_VENTAS_DIR."""
+    if es_url(origen): return True
+    if not CARPETA_LOCAL_WEB or not str(origen).strip(): return False
+    permitida = os.path.realpath(CARPETA_LOCAL_WEB)
+    return os.path.commonpath([permitida, os.path.realpath(origen)]) == permitida
+
+def es_excel(ruta):
+    with open(ruta, "rb") as f: return f.read(4) in FIRMAS_EXCEL
+
+def archivos_locales(origen):
+    if not os.path.isdir(origen): return [origen]
+    nombres = [n for n in sorted(os.listdir(origen)) if n.lower().endswith(EXTENSIONES_VENTAS) and not n.startswith(('.', '~$'))]
+    if not nombres: raise FileNotFoundError(f"La carpeta {origen} no tiene archivos .csv / .xlsx / .xls de ventas.")
+    return [os.path.join(origen, n) for n in nombres]
+
+def hash_ruta(ruta):
+    h = hashlib.sha256()
+    with open(ruta, "rb") as f:
+        for bloque in iter(lambda: f.read(2**20), b""): h.update(bloque)
+    return h.hexdigest()
+
+def hash_local(ruta):
+    info = os.stat(ruta)
+    llave = (os.path.abspath(ruta), info.st_size, info.st_mtime_ns)
+    if llave not in HASHES_LOCALES: HASHES_LOCALES[llave] = hash_ruta(ruta)
+    return HASHES_LOCALES[llave]
+
+def carpeta_descarga(url):
+    return os.path.join(cache_parseo.CACHE_DIR, "descargas", hashlib.sha256(url.encode("utf-8")).hexdigest()[:32])
+
+def leer_meta(carpeta):
+    try:
+        with open(os.path.join(carpeta, "meta.json"), encoding="utf-8") as f: meta = json.load(f)
+        return meta if os.path.exists(os.path.join(carpeta, meta["archivo"])) else {}
+    except (OSError, ValueError, KeyError):
+        return {}
+
+def pedir(url, meta):
+    """GET condicional con reintentos (errores de red y 5xx). None si el servidor contesta 304."""
+    encabezados = {}
+    if meta.get("etag"): encabezados["If-None-Match"] = meta["etag"]
+    if meta.get("last_modified"): encabezados["If-Modified-Since"] = meta["last_modified"]
+    for intento in range(REINTENTOS):
+        try: return urllib.request.urlopen(urllib.request.Request(url, headers=encabezados), timeout=TIEMPO_ESPERA)
+        except urllib.error.HTTPError as e:
+            if e.code == 304: return None
+            if e.code < 500 or intento == REINTENTOS - 1: raise
+        except (urllib.error.URLError, TimeoutError):
+            if intento == REINTENTOS - 1: raise
+        time.sleep(ESPERA_REINTENTO * 2 ** intento)
+
+def descargar(url):
+    """(ruta local, sha256, bytes descargados). Con un 304 se reutiliza la copia en disco y se bajan 0 bytes."""
+    carpeta = carpeta_descarga(url)
+    cache_parseo.carpeta_privada(carpeta)
+    meta = leer_meta(carpeta)
+    respuesta = pedir(url, meta)
+    if respuesta is None: return os.path.join(carpeta, meta["archivo"]), meta["sha256"], 0
+    h, descargados = hashlib.sha256(), 0
+    with respuesta, tempfile.NamedTemporaryFile(dir=carpeta, prefix=".tmp-", delete=False) as tmp:
+        try:
+            for bloque in iter(lambda: respuesta.read(2**20), b""):
+                h.update(bloque)
+                tmp.write(bloque)
+                descargados += len(bloque)
+        except BaseException:
+            tmp.close()
+            os.remove(tmp.name)
+            raise
+    # El nombre lleva el hash: meta.json siempre apunta a un archivo completo con ese contenido
+    archivo = f"datos-{h.hexdigest()[:16]}"
+    os.replace(tmp.name, os.path.join(carpeta, archivo))
+    nuevo = {"url": url, "archivo": archivo, "sha256": h.hexdigest(), "etag": respuesta.headers.get("ETag"), "last_modified": respuesta.headers.get("Last-Modified")}
+    with open(os.path.join(carpeta, "meta.json"), "w", encoding="utf-8") as f: json.dump(nuevo, f)
+    if meta and meta["archivo"] != archivo:
+        try: os.remove(os.path.join(carpeta, meta["archivo"]))
+        except OSError: pass
+    return os.path.join(carpeta, archivo), h.hexdigest(), descargados
+
+# --- VENTAS MASTER CON CACHÉ DE PARSEO ---
+def ventas_de_archivo(ruta, sha, anio):
+    """(ventas, "caché" | "parseado"): el parseo se guarda con el hash del contenido como llave."""
+    es_csv = not es_excel(ruta)
+    clave = clave_cache(sha, "ventas_master.parsear_ventas", VERSION, [es_csv, anio, COLUMNAS_VENTAS])
+    guardado = leer(clave)
+    if guardado is not None: return guardado[0], "caché"
+    df = parsear_ventas(ruta, es_csv, anio)
+    if not df.empty: guardar(clave, (df,))
+    return df, "parseado"
+
+@medido()
+def leer_ventas_master(origen, anio=2026):
+    """
+    Ventas Master (archivo o carpeta local, o URL de descarga directa) ya filtrado al año del cruce. Devuelve
+    (ventas, informe) con los segundos de obtención (descarga o hash del archivo local) y de parseo por separado.
+    """
+    informe = {"descarga_s": 0.0, "parseo_s": 0.0, "bytes_descargados": 0, "archivos": []}
+    inicio = time.perf_counter()
+    if es_url(origen):
+        ruta, sha, informe["bytes_descargados"] = descargar(origen)
+        archivos = [(ruta, sha)]
+        informe["origen"] = "sin cambios (304)" if informe["bytes_descargados"] == 0 else "descargado"
+    else:
+        archivos = [(ruta, hash_local(ruta)) for ruta in archivos_locales(origen)]
+        informe["origen"] = "local"
+    informe["descarga_s"] = time.perf_counter() - inicio
+
+    inicio, partes = time.perf_counter(), []
+    for ruta, sha in archivos:
+        df, estado = ventas_de_archivo(ruta, sha, anio)
+        partes.append(df)
+        informe["archivos"].append((os.path.basename(ruta), estado))
+    informe["parseo_s"] = time.perf_counter() - inicio
+    ventas = partes[0] if len(partes) == 1 else pd.concat(partes, ignore_index=True)
+    if len(partes) > 1: ventas['AGENCIA'] = ventas['AGENCIA'].astype('category')
+    return ventas, informe